@@ -0,0 +1,247 @@
+"""
+Analytics Export - Ideas, scores and usage as a partitioned columnar dataset
+"""
+
+import csv
+import gzip
+import importlib.util
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from idea_model import IdeaSummary
+from session_payload import opportunity_hash
+
+
+# Column names and types of each table. Per-criterion scores are stored
+# long (one row per idea and criterion) since criteria differ by session.
+TABLE_SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    "sessions": [
+        ("session_id", "string"),
+        ("generated_at", "timestamp"),
+        ("source", "string"),
+        ("provider", "string"),
+        ("model", "string"),
+        ("opportunity_hash", "string"),
+        ("opportunity", "string"),
+        ("idea_count", "int64"),
+        ("input_tokens", "int64"),
+        ("output_tokens", "int64"),
+        ("api_calls", "int64"),
+    ],
+    "ideas": [
+        ("session_id", "string"),
+        ("generated_at", "timestamp"),
+        ("idea_index", "int64"),
+        ("title", "string"),
+        ("score", "float64"),
+        ("rank", "int64"),
+        ("cluster", "int64"),
+        ("content_chars", "int64"),
+    ],
+    "scores": [
+        ("session_id", "string"),
+        ("generated_at", "timestamp"),
+        ("idea_index", "int64"),
+        ("criterion", "string"),
+        ("weight", "float64"),
+        ("score", "float64"),
+    ],
+}
+
+
+def has_pyarrow() -> bool:
+    """Whether the optional pyarrow dependency is installed (without importing it)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def resolve_format(requested: str) -> str:
+    """Pick the file format: Parquet when available (or requested), else gzip CSV."""
+    if requested == "csv":
+        return "csv"
+    if has_pyarrow():
+        return "parquet"
+    if requested == "parquet":
+        print("  Warning: pyarrow is not installed; writing analytics as gzip CSV")
+    return "csv"
+
+
+def _extension(file_format: str) -> str:
+    """File name extension for a format."""
+    return ".parquet" if file_format == "parquet" else ".csv.gz"
+
+
+def _arrow_schema(table: str) -> Any:
+    """The Arrow schema of a table."""
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("s"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in TABLE_SCHEMAS[table]])
+
+
+def _write_parquet(path: str, table: str, rows: List[Dict[str, Any]]):
+    """Write rows as a Parquet file with the table's schema."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_table = pa.Table.from_pylist(rows, schema=_arrow_schema(table))
+    pq.write_table(arrow_table, path, compression="zstd")
+
+
+def _write_csv(path: str, table: str, rows: List[Dict[str, Any]]):
+    """Write rows as a gzip CSV file with the table's columns."""
+    columns = [name for name, _ in TABLE_SCHEMAS[table]]
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in row.items()
+            })
+
+
+def write_rows(root: str, table: str, rows: List[Dict[str, Any]], file_format: str, name: str) -> Optional[str]:
+    """Write rows as one new file in the table's date partition. Returns its path."""
+    if not rows:
+        return None
+
+    partition = os.path.join(root, table, f"date={rows[0]['generated_at']:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"part-{name}{_extension(file_format)}")
+
+    # Readers never see a half-written file
+    tmp_path = path + ".tmp"
+    if file_format == "parquet":
+        _write_parquet(tmp_path, table, rows)
+    else:
+        _write_csv(tmp_path, table, rows)
+    os.replace(tmp_path, path)
+    return path
+
+
+class AnalyticsExporter:
+    """Appends each saved session to the analytics dataset.
+
+    Every table lives under output_dir/analytics/<table>/date=YYYY-MM-DD/
+    (Hive-style partitions) with one small file per session, so writers
+    never rewrite existing files. compact() later merges small files.
+    """
+
+    def __init__(self, config: Any):
+        self.config = config
+        self.root = os.path.join(config.output_dir, "analytics")
+        self.file_format = resolve_format(config.analytics_format)
+
+    def export(
+        self,
+        session_id: str,
+        ideas: List[IdeaSummary],
+        opportunity: Dict[str, Any],
+        criteria: Dict[str, Any],
+        usage: Optional[Dict[str, int]] = None,
+        source: str = "interactive"
+    ):
+        """Append one session's rows to the sessions, ideas and scores tables."""
+        generated_at = datetime.now().replace(microsecond=0)
+        usage = usage or {}
+        provider = self.config.get_model_provider()
+        weights = criteria.get('weights', {})
+
+        sessions = [{
+            "session_id": session_id,
+            "generated_at": generated_at,
+            "source": source,
+            "provider": provider,
+            "model": {"openai": self.config.openai_model, "synthetic": "synthetic"}.get(provider, self.config.model),
+            "opportunity_hash": opportunity_hash(opportunity),
+            "opportunity": opportunity.get('description', ''),
+            "idea_count": len(ideas),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "api_calls": usage.get("calls", 0),
+        }]
+
+        idea_rows = []
+        score_rows = []
+        for index, idea in enumerate(ideas, 1):
+            idea_rows.append({
+                "session_id": session_id,
+                "generated_at": generated_at,
+                "idea_index": index,
+                "title": idea['title'],
+                "score": float(idea['score']),
+                "rank": idea.get('rank'),
+                "cluster": idea.get('cluster'),
+                "content_chars": idea['content_chars'],
+            })
+            for criterion, sub_score in (idea.get('sub_scores') or {}).items():
+                score_rows.append({
+                    "session_id": session_id,
+                    "generated_at": generated_at,
+                    "idea_index": index,
+                    "criterion": criterion,
+                    "weight": float(weights.get(criterion, 0)),
+                    "score": float(sub_score),
+                })
+
+        name = f"{generated_at:%H%M%S}-{session_id}"
+        for table, rows in (("sessions", sessions), ("ideas", idea_rows), ("scores", score_rows)):
+            write_rows(self.root, table, rows, self.file_format, name)
+
+    def compact(self, min_files: int = 2) -> int:
+        """Merge the small files of each partition into one. Returns files merged."""
+        merged = 0
+        if not os.path.isdir(self.root):
+            return merged
+
+        for table in sorted(TABLE_SCHEMAS):
+            table_dir = os.path.join(self.root, table)
+            if not os.path.isdir(table_dir):
+                continue
+            for partition in sorted(os.listdir(table_dir)):
+                partition_dir = os.path.join(table_dir, partition)
+                for file_format in ("parquet", "csv"):
+                    merged += self._compact_partition(table, partition_dir, file_format, min_files)
+        return merged
+
+    def _compact_partition(self, table: str, partition_dir: str, file_format: str, min_files: int) -> int:
+        """Merge one partition's files of one format, then remove the inputs."""
+        extension = _extension(file_format)
+        parts = sorted(
+            os.path.join(partition_dir, name) for name in os.listdir(partition_dir)
+            if name.startswith("part-") and name.endswith(extension)
+        )
+        if len(parts) < min_files:
+            return 0
+
+        path = os.path.join(partition_dir, f"part-compacted-{int(time.time() * 1000)}{extension}")
+        tmp_path = path + ".tmp"
+        if file_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = _arrow_schema(table)
+            tables = [pq.read_table(part).select(schema.names).cast(schema) for part in parts]
+            pq.write_table(pa.concat_tables(tables), tmp_path, compression="zstd")
+        else:
+            columns = [name for name, _ in TABLE_SCHEMAS[table]]
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as out:
+                writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+                writer.writeheader()
+                for part in parts:
+                    with gzip.open(part, 'rt', encoding='utf-8', newline='') as f:
+                        writer.writerows(csv.DictReader(f))
+
+        os.replace(tmp_path, path)
+        for part in parts:
+            os.remove(part)
+
+        print(f"  {table}/{os.path.basename(partition_dir)}: merged {len(parts)} files")
+        return len(parts)
@@ -0,0 +1,418 @@
+"""
+Batch Runner - Bulk offline ideation through the provider's message batch API
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+from config import Config
+from client_pool import get_client
+from opportunity_pack import OpportunityPacker
+from phase6_generation import IdeaGeneration
+from phase7_output import OutputGeneration
+from session_payload import load_session_queue
+from spend_ledger import BudgetExceededError, SpendLedger, model_name
+import tracing
+
+
+STATE_FILENAME = ".batch_state.json"
+
+
+class BatchRunner:
+    """Submits queued sessions as message batches and writes their outputs.
+
+    Progress is checkpointed to a state file in the queue directory after
+    every submission and every saved result, so an interrupted run picks
+    up where it left off when started again. Point ANTHROPIC_BASE_URL at a
+    local stub (tests/batch_stub.py) to exercise the whole flow offline.
+
+    Each request's worst-case cost is reserved against the batch and daily
+    spend budgets at submission; once they are used up the remaining
+    sessions stay queued for a later run.
+
+    With pack, sessions that share their context, criteria and examples
+    are sent several to a request (see opportunity_pack.py). A session
+    whose section of a packed response is missing or unusable is retried
+    on its own request in the same run.
+    """
+
+    def __init__(self, config: Config, poll_interval: Optional[float] = None, pack: bool = False):
+        self.config = config
+        self.poll_interval = poll_interval or config.batch_poll_initial
+        self.generator = IdeaGeneration(config)
+        self.output = OutputGeneration(config)
+        self.packer = OpportunityPacker(self.generator) if pack else None
+        # Charges batch results; the generator's own ledger only sizes each
+        # request against the per-session budget
+        self.ledger = SpendLedger(config, source="batch")
+
+    def run(self, queue_dir: str) -> int:
+        """Run every session in the queue directory. Returns the number saved."""
+        if self.config.get_model_provider() != "anthropic":
+            print("Batch mode requires an Anthropic API key.")
+            return 0
+
+        sessions = load_session_queue(queue_dir)
+        print(f"Loaded {len(sessions)} session(s) from {queue_dir}")
+
+        state_path = os.path.join(queue_dir, STATE_FILENAME)
+        state = self._load_state(state_path)
+        client = get_client(self.config, "anthropic")
+
+        saved = 0
+        # Sessions submitted this run, and those resubmitted alone after a
+        # failed pack section; neither is submitted again until the next run
+        attempted: Set[str] = set()
+        retried: Set[str] = set()
+        while True:
+            self._submit_pending(client, sessions, state, state_path, attempted, retried)
+            open_batches = [batch for batch in state["batches"] if not batch.get("collected")]
+            if not open_batches:
+                break
+            for batch in open_batches:
+                with tracing.span("batch", batch_id=batch["id"], sessions=len(self._batch_sessions(batch))):
+                    with tracing.span("batch.wait"):
+                        self._wait_for_batch(client, batch)
+                    saved += self._collect_results(client, batch, sessions, state, state_path)
+
+        done = len(state["completed"])
+        failed = len(state["failed"])
+        print(f"\n✓ Batch run finished: {saved} saved this run, {done} completed total, {failed} failed")
+        print(self.ledger.summary())
+        return saved
+
+    def _submit_pending(
+        self,
+        client: Any,
+        sessions: Dict[str, Dict[str, Any]],
+        state: Dict[str, Any],
+        state_path: str,
+        attempted: Set[str],
+        retried: Set[str]
+    ):
+        """Submit sessions that are neither completed nor already in a batch.
+
+        Adds the submitted sessions to attempted, and those sent alone
+        after a failed pack section to retried.
+        """
+        submitted = set()
+        for batch in state["batches"]:
+            if not batch.get("collected"):
+                submitted.update(self._batch_sessions(batch))
+
+        unpack = set(state["unpack"])
+        pending = [
+            session_id for session_id in sessions
+            if session_id not in state["completed"] and session_id not in submitted
+            and (session_id not in attempted or (session_id in unpack and session_id not in retried))
+        ]
+        if not pending:
+            return
+
+        model = model_name(self.config)
+        remaining = self._budget_remaining(state)
+        units = self._request_units(pending, sessions, unpack)
+        handled = 0
+        chunk_size = self.config.batch_chunk_size
+        for start in range(0, len(units), chunk_size):
+            chunk = []
+            requests = []
+            packs: Dict[str, List[str]] = {}
+            reserved = 0.0
+            budget_reached = False
+            for custom_id, pack in units[start:start + chunk_size]:
+                session_ids = pack["session_ids"] if pack else [custom_id]
+                try:
+                    if pack:
+                        params, plan = self.packer.params(pack)
+                    else:
+                        params, plan = self.generator._anthropic_request_params(
+                            self._build_prompt(sessions[custom_id])
+                        )
+                except BudgetExceededError as e:
+                    # A pack's sessions fail together; each is retried on the next run
+                    for session_id in session_ids:
+                        state["failed"][session_id] = "over_budget"
+                    attempted.update(session_ids)
+                    print(f"  ✗ {custom_id}: {str(e)}")
+                    handled += len(session_ids)
+                    continue
+
+                cost = self.ledger.estimate(model, plan["prompt_tokens"], plan["max_tokens"], batch=True)
+                if remaining is not None and reserved + cost > remaining:
+                    budget_reached = True
+                    break
+                reserved += cost
+                chunk.append(custom_id)
+                requests.append({"custom_id": custom_id, "params": params})
+                if pack:
+                    packs[custom_id] = session_ids
+                handled += len(session_ids)
+
+            if requests:
+                session_ids = [sid for custom_id in chunk for sid in packs.get(custom_id, [custom_id])]
+                with tracing.span(
+                    "batch.submit", sessions=len(session_ids), requests=len(requests), reserved_usd=reserved
+                ):
+                    batch = client.messages.batches.create(requests=requests)
+                packed = f" in {len(requests)} request(s)" if packs else ""
+                print(
+                    f"Submitted batch {batch.id} with {len(session_ids)} session(s){packed} "
+                    f"(up to ${reserved:.2f})"
+                )
+
+                entry = {
+                    "id": batch.id,
+                    "custom_ids": chunk,
+                    "submitted_at": time.time(),
+                    "collected": False,
+                    "reserved_usd": reserved
+                }
+                if packs:
+                    entry["packs"] = packs
+                state["batches"].append(entry)
+                for session_id in session_ids:
+                    state["failed"].pop(session_id, None)
+                    if session_id in unpack:
+                        retried.add(session_id)
+                attempted.update(session_ids)
+                if remaining is not None:
+                    remaining -= reserved
+            self._save_state(state, state_path)
+
+            if budget_reached:
+                print(
+                    f"Spend budget reached: {len(pending) - handled} session(s) left unsubmitted "
+                    f"(run again when there is budget)"
+                )
+                return
+
+    def _request_units(
+        self,
+        pending: List[str],
+        sessions: Dict[str, Dict[str, Any]],
+        unpack: Set[str]
+    ) -> List[Any]:
+        """The requests to send for pending sessions, as (custom_id, pack or None) pairs.
+
+        Without packing, or for sessions retried after a failed pack
+        section, each session is its own request.
+        """
+        if self.packer is None:
+            return [(session_id, None) for session_id in pending]
+
+        units: List[Any] = []
+        for pack in self.packer.pack([sid for sid in pending if sid not in unpack], sessions):
+            if len(pack["session_ids"]) > 1:
+                units.append((pack["custom_id"], pack))
+            else:
+                units.append((pack["session_ids"][0], None))
+        units.extend((session_id, None) for session_id in pending if session_id in unpack)
+        return units
+
+    def _batch_sessions(self, batch: Dict[str, Any]) -> List[str]:
+        """The session IDs a batch covers, with packs expanded."""
+        packs = batch.get("packs", {})
+        return [sid for custom_id in batch["custom_ids"] for sid in packs.get(custom_id, [custom_id])]
+
+    def _budget_remaining(self, state: Dict[str, Any]) -> Optional[float]:
+        """USD left under the batch and daily budgets (None when unlimited).
+
+        Batches not yet collected count at their reserved worst case, since
+        their results are not in the spend ledger yet.
+        """
+        limits = []
+        in_flight = sum(batch.get("reserved_usd", 0.0) for batch in state["batches"] if not batch.get("collected"))
+        if self.config.batch_budget_usd > 0:
+            spent = sum(
+                batch.get("cost_usd", 0.0) if batch.get("collected") else batch.get("reserved_usd", 0.0)
+                for batch in state["batches"]
+            )
+            limits.append(self.config.batch_budget_usd - spent)
+        if self.config.daily_budget_usd > 0:
+            limits.append(self.config.daily_budget_usd - self.ledger.day_spent() - in_flight)
+        return min(limits) if limits else None
+
+    def _wait_for_batch(self, client: Any, batch: Dict[str, Any]):
+        """Poll a batch with exponential backoff until it has ended."""
+        delay = self.poll_interval
+        while True:
+            status = client.messages.batches.retrieve(batch["id"])
+            if status.processing_status == "ended":
+                return
+
+            counts = status.request_counts
+            print(
+                f"  Batch {batch['id']}: {counts.processing} processing, "
+                f"{counts.succeeded} succeeded, {counts.errored} errored - "
+                f"checking again in {delay:.0f}s"
+            )
+            time.sleep(delay)
+            delay = min(delay * 1.5, self.config.batch_poll_max)
+
+    def _collect_results(
+        self,
+        client: Any,
+        batch: Dict[str, Any],
+        sessions: Dict[str, Dict[str, Any]],
+        state: Dict[str, Any],
+        state_path: str
+    ) -> int:
+        """Download, parse and save the results of an ended batch."""
+        saved = 0
+        packs = batch.get("packs", {})
+        for entry in client.messages.batches.results(batch["id"]):
+            if entry.custom_id in packs:
+                saved += self._collect_pack(entry, packs[entry.custom_id], batch, sessions, state, state_path)
+                continue
+
+            session_id = entry.custom_id
+            if session_id in state["completed"]:
+                continue
+
+            session = sessions.get(session_id)
+            if session is None:
+                print(f"  Warning: No queued session for result {session_id}")
+                continue
+
+            if entry.result.type != "succeeded":
+                state["failed"][session_id] = entry.result.type
+                print(f"  ✗ {session_id}: {entry.result.type}")
+                continue
+
+            usage = self._usage_totals(entry.result.message.usage)
+            cost = self.ledger.record(
+                entry.result.message.usage, model_name(self.config), "anthropic", "generation",
+                batch=True, session_id=session_id
+            )
+            batch["cost_usd"] = batch.get("cost_usd", 0.0) + cost
+            with tracing.span("batch.result", session_id=session_id, cost_usd=cost, **usage):
+                response_text = "".join(
+                    block.text for block in entry.result.message.content if block.type == "text"
+                )
+
+                # Ideas are parsed, scored and written one at a time
+                filepath = self.output.save(
+                    self.generator.iter_ideas(response_text, session["criteria"]),
+                    session["opportunity"],
+                    session["context"],
+                    session["criteria"],
+                    session_id=session_id,
+                    usage=usage
+                )
+            if filepath:
+                self._complete(session_id, filepath, state)
+                saved += 1
+                self._save_state(state, state_path)
+
+        batch["collected"] = True
+        self._save_state(state, state_path)
+        return saved
+
+    def _collect_pack(
+        self,
+        entry: Any,
+        session_ids: List[str],
+        batch: Dict[str, Any],
+        sessions: Dict[str, Dict[str, Any]],
+        state: Dict[str, Any],
+        state_path: str
+    ) -> int:
+        """Split a packed result and save each session's section.
+
+        Sessions whose section is missing, cut off or has no parseable
+        ideas are queued to be retried on their own.
+        """
+        pending = [sid for sid in session_ids if sid not in state["completed"] and sid in sessions]
+        if entry.result.type != "succeeded":
+            for session_id in pending:
+                state["failed"][session_id] = entry.result.type
+            print(f"  ✗ {entry.custom_id} ({len(pending)} sessions): {entry.result.type}")
+            return 0
+
+        message = entry.result.message
+        cost = self.ledger.record(
+            message.usage, model_name(self.config), "anthropic", "generation",
+            batch=True, session_id=entry.custom_id
+        )
+        batch["cost_usd"] = batch.get("cost_usd", 0.0) + cost
+        # Each session's analytics carry an equal share of the pack's usage
+        totals = self._usage_totals(message.usage)
+        share = {
+            "input_tokens": totals["input_tokens"] // len(session_ids),
+            "output_tokens": totals["output_tokens"] // len(session_ids),
+            "calls": 1
+        }
+
+        saved = 0
+        with tracing.span("batch.pack", custom_id=entry.custom_id, sessions=len(session_ids), cost_usd=cost):
+            response_text = "".join(block.text for block in message.content if block.type == "text")
+            sections = self.packer.split(session_ids, response_text, message.stop_reason == "max_tokens")
+            for session_id in pending:
+                session = sessions[session_id]
+                section = sections[session_id]
+                ideas = self.generator._parse_ideas_from_response(section, session["criteria"]) if section else []
+                if not ideas:
+                    state["failed"][session_id] = "pack_section"
+                    if session_id not in state["unpack"]:
+                        state["unpack"].append(session_id)
+                    print(f"  ✗ {session_id}: no usable section in {entry.custom_id} - retrying on its own")
+                    continue
+
+                filepath = self.output.save(
+                    ideas,
+                    session["opportunity"],
+                    session["context"],
+                    session["criteria"],
+                    session_id=session_id,
+                    usage=share
+                )
+                if filepath:
+                    self._complete(session_id, filepath, state)
+                    saved += 1
+        self._save_state(state, state_path)
+        return saved
+
+    def _complete(self, session_id: str, filepath: str, state: Dict[str, Any]):
+        """Record a saved session in the checkpoint."""
+        state["completed"][session_id] = filepath
+        state["failed"].pop(session_id, None)
+        if session_id in state["unpack"]:
+            state["unpack"].remove(session_id)
+
+    def _usage_totals(self, usage: Any) -> Dict[str, int]:
+        """Token usage of one batch result, in the analytics export's shape."""
+        return {
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "calls": 1
+        }
+
+    def _build_prompt(self, session: Dict[str, Any]) -> str:
+        """Build the generation prompt for a queued session."""
+        return self.generator._build_generation_prompt(
+            session["opportunity"],
+            session["context"],
+            session["criteria"],
+            session["competitive_insights"],
+            session["example_ideas"]
+        )
+
+    def _load_state(self, state_path: str) -> Dict[str, Any]:
+        """Load the checkpoint for a queue, or start a fresh one."""
+        state = {"batches": [], "completed": {}, "failed": {}, "unpack": []}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state.update(json.load(f))
+            print(f"Resuming from {state_path}")
+        except FileNotFoundError:
+            pass
+        return state
+
+    def _save_state(self, state: Dict[str, Any], state_path: str):
+        """Write the checkpoint atomically."""
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, state_path)
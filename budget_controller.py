@@ -0,0 +1,199 @@
+"""
+Budget Controller - Adaptive thinking budget and max_tokens per request
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+
+# Anthropic rejects thinking budgets below this
+MIN_THINKING_BUDGET = 1024
+
+# Starting estimates, replaced by learned values as usage is recorded
+DEFAULT_STATS = {
+    "text_tokens_per_idea": 450.0,  # Output tokens for one fully written idea
+    "ranking_tokens": 300.0,  # Output tokens for the top 3 ranking section
+    "thinking_per_prompt_token": 2.0,  # Thinking used per prompt token
+    "tokens_per_second": 60.0,  # Observed output throughput
+    "safety_margin": 1.25,  # Headroom on top of the expected output
+    "samples": 0,
+}
+
+LEARNING_RATE = 0.3  # Weight of the newest observation in the moving averages
+THINKING_GROWTH = 1.25  # Step up in thinking per prompt token after a short response
+MAX_THINKING_PER_PROMPT_TOKEN = 10.0
+# Thinking within this fraction of its budget may have been cut off by it
+CAPPED_THINKING_FRACTION = 0.9
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for English text."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def thinking_params(plan: Dict[str, int], temperature: float) -> Dict[str, Any]:
+    """Messages API temperature and thinking parameters for a plan.
+
+    A plan with no thinking budget runs without thinking at the given
+    temperature; thinking requires a temperature of 1.0.
+    """
+    if not plan["thinking_budget"]:
+        return {"temperature": temperature}
+    return {
+        "temperature": 1.0,
+        "thinking": {"type": "enabled", "budget_tokens": plan["thinking_budget"]},
+    }
+
+
+class BudgetController:
+    """Picks the thinking budget and output cap for each generation request.
+
+    The plan is derived from the prompt length, the number of ideas
+    requested and the latency SLO, using per-idea and throughput figures
+    learned from the usage reported by previous responses.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.history_path = os.path.join(config.output_dir, ".usage_history.json")
+        self._lock = threading.Lock()
+        self.stats = self._load()
+
+    def plan(self, prompt: str, idea_count: int, max_tokens: Optional[int] = None) -> Dict[str, int]:
+        """Choose thinking budget and max_tokens for a request.
+
+        max_tokens overrides the configured output cap (packed requests
+        need more room than a single session).
+        """
+        with self._lock:
+            stats = dict(self.stats)
+
+        prompt_tokens = estimate_tokens(prompt)
+        text_tokens = idea_count * stats["text_tokens_per_idea"] + stats["ranking_tokens"]
+        thinking = prompt_tokens * stats["thinking_per_prompt_token"]
+
+        # Output tokens we can afford within the latency SLO
+        slo_tokens = self.config.latency_slo_seconds * stats["tokens_per_second"]
+        if thinking + text_tokens > slo_tokens:
+            # Give up thinking before giving up ideas
+            thinking = slo_tokens - text_tokens
+
+        # The API requires max_tokens > thinking budget, so thinking gives
+        # way to keep room for text under the output cap
+        cap = max_tokens or self.config.max_tokens
+        expected_output = max(text_tokens * stats["safety_margin"], MIN_THINKING_BUDGET)
+        if cap < 2 * MIN_THINKING_BUDGET:
+            # No room for the smallest thinking budget and the text: run without thinking
+            thinking_budget = 0
+        else:
+            thinking_budget = int(max(
+                min(thinking, self.config.max_thinking_budget, cap - MIN_THINKING_BUDGET),
+                MIN_THINKING_BUDGET
+            ))
+        max_tokens = int(min(thinking_budget + expected_output, cap))
+
+        return {
+            "thinking_budget": thinking_budget,
+            "max_tokens": max_tokens,
+            "prompt_tokens": prompt_tokens,
+            "idea_count": idea_count,
+        }
+
+    def record(
+        self,
+        plan: Dict[str, int],
+        usage: Any,
+        stop_reason: Optional[str],
+        elapsed_seconds: float,
+        response_text: str,
+        ideas_parsed: Optional[int] = None
+    ):
+        """Learn from the usage reported for a completed request.
+
+        ideas_parsed is the number of ideas parsed from the response. A
+        response with fewer ideas than the plan asked for raises the
+        thinking estimate, and thinking that used up its budget is never
+        taken as evidence that less would do. A plan with no thinking
+        budget (structured output) leaves the thinking estimate alone.
+        """
+        output_tokens = getattr(usage, "output_tokens", None)
+        if not output_tokens:
+            return
+
+        idea_count = response_text.count("### IDEA") if ideas_parsed is None else ideas_parsed
+        text_tokens = estimate_tokens(response_text)
+        thinking_used = max(output_tokens - text_tokens, 0)
+        thinks = plan.get("thinking_budget", 0) > 0
+        short = idea_count < plan.get("idea_count", 0)
+        thinking_capped = thinking_used >= plan.get("thinking_budget", 0) * CAPPED_THINKING_FRACTION
+
+        with self._lock:
+            stats = self.stats
+
+            if stop_reason == "max_tokens":
+                # Truncated output is unusable: widen the margin right away
+                stats["safety_margin"] = min(stats["safety_margin"] * 1.25, 2.0)
+            else:
+                stats["safety_margin"] = max(stats["safety_margin"] * 0.97, 1.1)
+
+                if idea_count:
+                    per_idea = text_tokens / (idea_count + 0.5)
+                    stats["text_tokens_per_idea"] = self._blend(stats["text_tokens_per_idea"], per_idea)
+
+            if thinks and short:
+                # Short or unparseable output: the request needed more thinking
+                stats["thinking_per_prompt_token"] = min(
+                    stats["thinking_per_prompt_token"] * THINKING_GROWTH, MAX_THINKING_PER_PROMPT_TOKEN
+                )
+            elif thinks and plan.get("prompt_tokens") and stop_reason != "max_tokens":
+                ratio = thinking_used / plan["prompt_tokens"]
+                if not thinking_capped or ratio > stats["thinking_per_prompt_token"]:
+                    stats["thinking_per_prompt_token"] = self._blend(stats["thinking_per_prompt_token"], ratio)
+
+            if elapsed_seconds > 0:
+                stats["tokens_per_second"] = self._blend(
+                    stats["tokens_per_second"], output_tokens / elapsed_seconds
+                )
+
+            stats["samples"] = stats.get("samples", 0) + 1
+            self._save()
+
+    def _blend(self, current: float, observed: float) -> float:
+        """Exponential moving average step."""
+        return (1 - LEARNING_RATE) * current + LEARNING_RATE * observed
+
+    def _load(self) -> Dict[str, Any]:
+        """Load learned statistics, falling back to defaults."""
+        stats = dict(DEFAULT_STATS)
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            for key in stats:
+                if isinstance(saved.get(key), (int, float)):
+                    stats[key] = saved[key]
+        except (OSError, ValueError):
+            pass
+        return stats
+
+    def _save(self):
+        """Persist learned statistics atomically.
+
+        Each save writes its own temporary file, so processes sharing the
+        output directory never write into each other's.
+        """
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.history_path) or ".", prefix=".usage_history.", suffix=".tmp"
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, indent=2)
+            os.replace(tmp_path, self.history_path)
+        except OSError:
+            # Learning is best-effort; never fail a session over it
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
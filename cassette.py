@@ -0,0 +1,214 @@
+"""
+Cassette - Record provider HTTP traffic and replay it offline
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+# Response headers that are never written to a cassette
+DROPPED_RESPONSE_HEADERS = {"set-cookie", "content-length", "transfer-encoding", "connection"}
+
+
+def body_hash(body: bytes) -> str:
+    """Hash of a request body, used to match replayed requests."""
+    return hashlib.sha256(body).hexdigest()
+
+
+def cassette_provider(path: str) -> Optional[str]:
+    """The provider a cassette was recorded against, from its header line."""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError, EOFError):
+        return None
+    return header.get("provider") if header.get("type") == "cassette" else None
+
+
+def load_interactions(path: str) -> List[Dict[str, Any]]:
+    """Read every recorded interaction from a cassette."""
+    interactions = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A recording cut short by a crash ends in a partial line
+                break
+            if record.get("type") == "interaction":
+                interactions.append(record)
+    return interactions
+
+
+class CassetteRecorder:
+    """Appends recorded interactions to a gzip JSONL cassette.
+
+    The first line is a header naming the provider; every completed
+    response adds one line with its request (method, path, body and body
+    hash), status, headers and body chunks with their arrival times.
+    Request headers, including credentials, are never stored.
+    """
+
+    def __init__(self, path: str, provider: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps({"type": "cassette", "provider": provider, "created": time.time()}) + "\n")
+
+    def add(self, record: Dict[str, Any]):
+        """Append one interaction (gzip members can be appended independently)."""
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line)
+
+
+def _request_record(request: Any) -> Dict[str, Any]:
+    """The parts of a request stored in, and matched against, a cassette."""
+    body = request.read()
+    return {
+        "method": request.method,
+        "path": request.url.raw_path.decode("ascii"),
+        "body_sha256": body_hash(body),
+        "body": body.decode("utf-8", errors="replace"),
+    }
+
+
+def recording_transport(httpx: Any, inner: Any, recorder: CassetteRecorder) -> Any:
+    """Wrap an httpx transport so every API response is recorded as it streams.
+
+    httpx is the HTTP library module the provider SDK uses.
+    """
+
+    class RecordingStream(httpx.SyncByteStream):
+        """Passes body chunks through, timestamping each one."""
+
+        def __init__(self, stream: Any, record: Dict[str, Any], start: float):
+            self.stream = stream
+            self.record = record
+            self.start = start
+
+        def __iter__(self) -> Iterator[bytes]:
+            chunks = self.record["response"]["chunks"]
+            for chunk in self.stream:
+                chunks.append([time.monotonic() - self.start, base64.b64encode(chunk).decode("ascii")])
+                yield chunk
+
+        def close(self):
+            try:
+                self.stream.close()
+            finally:
+                recorder.add(self.record)
+
+    class RecordingTransport(httpx.BaseTransport):
+        """Sends requests through the inner transport and records the replies."""
+
+        def handle_request(self, request: Any) -> Any:
+            if request.method == "HEAD":
+                # Connection warm-ups are not part of the conversation
+                return inner.handle_request(request)
+
+            start = time.monotonic()
+            record = {"type": "interaction", "request": _request_record(request)}
+            response = inner.handle_request(request)
+            record["response"] = {
+                "status": response.status_code,
+                "headers": [
+                    [name, value] for name, value in response.headers.multi_items()
+                    if name.lower() not in DROPPED_RESPONSE_HEADERS
+                ],
+                "headers_at": time.monotonic() - start,
+                "chunks": [],
+            }
+            return httpx.Response(
+                status_code=response.status_code,
+                headers=response.headers,
+                stream=RecordingStream(response.stream, record, start),
+                extensions=response.extensions
+            )
+
+        def close(self):
+            inner.close()
+
+    return RecordingTransport()
+
+
+def replay_transport(httpx: Any, path: str, speed: float = 1.0) -> Any:
+    """An httpx transport that serves responses from a cassette.
+
+    Requests are matched by method, path and body hash, falling back to
+    recording order for the same method and path. Headers and chunks are
+    delivered at the recorded times divided by speed (0 means no delays).
+    Unmatched requests get a 404 naming the request.
+    """
+    exact: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+    by_path: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+    for interaction in load_interactions(path):
+        request = interaction["request"]
+        exact[(request["method"], request["path"], request["body_sha256"])].append(interaction)
+        by_path[(request["method"], request["path"])].append(interaction)
+    lock = threading.Lock()
+
+    def wait(seconds: float):
+        """Sleep for a recorded gap, scaled by the replay speed."""
+        if speed > 0 and seconds > 0:
+            time.sleep(seconds / speed)
+
+    class ReplayStream(httpx.SyncByteStream):
+        """Yields recorded chunks with their recorded spacing."""
+
+        def __init__(self, chunks: List[List[Any]], headers_at: float):
+            self.chunks = chunks
+            self.headers_at = headers_at
+
+        def __iter__(self) -> Iterator[bytes]:
+            previous = self.headers_at
+            for at, data in self.chunks:
+                wait(at - previous)
+                previous = at
+                yield base64.b64decode(data)
+
+    class ReplayTransport(httpx.BaseTransport):
+        """Answers requests from the cassette without touching the network."""
+
+        def handle_request(self, request: Any) -> Any:
+            if request.method == "HEAD":
+                return httpx.Response(200)
+
+            record = _request_record(request)
+            with lock:
+                interaction = self._take(record)
+            if interaction is None:
+                message = f"No recorded interaction for {record['method']} {record['path']}"
+                return httpx.Response(
+                    404,
+                    json={"type": "error", "error": {"type": "not_found_error", "message": message}}
+                )
+
+            response = interaction["response"]
+            wait(response["headers_at"])
+            return httpx.Response(
+                status_code=response["status"],
+                headers=response["headers"],
+                stream=ReplayStream(response["chunks"], response["headers_at"])
+            )
+
+        def _take(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            """Pop the best matching interaction, each one served once."""
+            queue = exact.get((record["method"], record["path"], record["body_sha256"]))
+            if not queue:
+                queue = by_path.get((record["method"], record["path"]))
+            while queue:
+                interaction = queue.popleft()
+                if not interaction.get("served"):
+                    interaction["served"] = True
+                    return interaction
+            return None
+
+    return ReplayTransport()
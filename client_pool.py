@@ -0,0 +1,163 @@
+"""
+Client Pool - Shared, pooled API clients for the model providers
+"""
+
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+from config import Config
+
+
+class ClientPool:
+    """Process-wide registry of provider clients.
+
+    Each client is created lazily on first use and then reused, so the
+    underlying HTTP connection pool and TLS sessions survive across calls
+    and sessions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._http_clients: Dict[Tuple[str, str], Any] = {}
+
+    def get_client(self, config: Config, provider: str) -> Any:
+        """Get the shared client for a provider, creating it if needed."""
+        key = self._key(config, provider)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client, http_client = self._create_client(config, provider)
+                self._http_clients[key] = http_client
+                self._clients[key] = client
+
+        return client
+
+    def prewarm(self, config: Config, provider: Optional[str] = None) -> Optional[threading.Thread]:
+        """Create the provider client and open a connection in the background.
+
+        Returns the background thread, or None if there is nothing to warm.
+        """
+        provider = provider or config.get_model_provider()
+        if provider not in ("anthropic", "openai"):
+            return None
+
+        thread = threading.Thread(
+            target=self._warm,
+            args=(config, provider),
+            name=f"prewarm-{provider}",
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def close_all(self):
+        """Close every pooled client and forget it."""
+        with self._lock:
+            for http_client in self._http_clients.values():
+                try:
+                    http_client.close()
+                except Exception:
+                    pass
+            self._clients.clear()
+            self._http_clients.clear()
+
+    def _warm(self, config: Config, provider: str):
+        """Open a keep-alive connection so the first real call skips TLS setup."""
+        try:
+            client = self.get_client(config, provider)
+            http_client = self._http_clients.get(self._key(config, provider))
+            if http_client is not None:
+                # Any response (even 404) leaves a live connection in the pool
+                http_client.head(str(client.base_url))
+        except Exception:
+            # Warming is best-effort; the real call will surface any problem
+            pass
+
+    def _key(self, config: Config, provider: str) -> Tuple[str, str]:
+        """Build the registry key for a provider and its credentials."""
+        if provider == "anthropic":
+            api_key = config.anthropic_api_key or ""
+        else:
+            api_key = config.openai_api_key or ""
+        return (provider, api_key)
+
+    def _create_client(self, config: Config, provider: str) -> Tuple[Any, Any]:
+        """Create the SDK client for a provider and its pooled HTTP client."""
+        if provider == "anthropic":
+            import anthropic as sdk
+            client_class = sdk.Anthropic
+            api_key = config.anthropic_api_key
+        elif provider == "openai":
+            import openai as sdk
+            client_class = sdk.OpenAI
+            api_key = config.openai_api_key
+        else:
+            raise ValueError(f"Unknown model provider: {provider}")
+
+        http_client = self._create_http_client(config, sdk, provider)
+        client = client_class(
+            api_key=api_key,
+            max_retries=config.max_retries,
+            http_client=http_client
+        )
+        return client, http_client
+
+    def _create_http_client(self, config: Config, sdk: Any, provider: str) -> Any:
+        """Create the SDK's HTTP client with keep-alive limits and timeouts from Config."""
+        # Build Limits from the SDK's own HTTP library so the types always match
+        limits_class = type(sdk.DEFAULT_CONNECTION_LIMITS)
+        limits = limits_class(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry
+        )
+
+        extra_params = {}
+        if config.cassette_path:
+            extra_params["transport"] = self._cassette_transport(config, sdk, provider, limits)
+
+        return sdk.DefaultHttpxClient(
+            limits=limits,
+            timeout=sdk.Timeout(
+                config.http_timeout,
+                connect=config.http_connect_timeout
+            ),
+            **extra_params
+        )
+
+    def _cassette_transport(self, config: Config, sdk: Any, provider: str, limits: Any) -> Any:
+        """Build a recording or replaying transport for the cassette in Config."""
+        import cassette
+
+        httpx = sys.modules[limits.__class__.__module__.split(".")[0]]
+        if config.cassette_mode == "record":
+            print(f"  (Recording provider traffic to {config.cassette_path})")
+            recorder = cassette.CassetteRecorder(config.cassette_path, provider)
+            return cassette.recording_transport(httpx, httpx.HTTPTransport(limits=limits), recorder)
+
+        print(f"  (Replaying provider traffic from {config.cassette_path} at {config.replay_speed}x)")
+        return cassette.replay_transport(httpx, config.cassette_path, config.replay_speed)
+
+
+# Process-wide pool shared by all sessions
+_pool = ClientPool()
+
+
+def get_client(config: Config, provider: str) -> Any:
+    """Get the shared client for a provider."""
+    return _pool.get_client(config, provider)
+
+
+def prewarm(config: Config, provider: Optional[str] = None) -> Optional[threading.Thread]:
+    """Warm the shared client for a provider in the background."""
+    return _pool.prewarm(config, provider)
+
+
+def close_all():
+    """Close all shared clients."""
+    _pool.close_all()
@@ -2,11 +2,15 @@
 Configuration management for the Ideation Agent
 """
 
+import json
 import os
-from pathlib import Path
 from typing import Optional
 
 
+# Set once the .env file has been read, so it is parsed once per process
+_env_file_loaded = False
+
+
 class Config:
     """Configuration class for managing API keys and settings."""
 
@@ -23,9 +27,110 @@ class Config:
 
         # Default generation settings
         self.model = "claude-sonnet-4-5-20250929"
-        self.max_tokens = 20000  # Increased for thinking + output
+        self.openai_model = "gpt-5.2"
+        self.max_tokens = 20000  # Upper bound for thinking + output
+        self.max_thinking_budget = 10000  # Upper bound for the adaptive thinking budget
+        self.latency_slo_seconds = float(os.getenv("IDEATION_LATENCY_SLO", "180"))
         self.temperature = 0.7
 
+        # Output format requested from the model:
+        #   "markdown"   - free-form markdown parsed heuristically
+        #   "structured" - tool-use / JSON schema output with validation and repair
+        self.output_mode = os.getenv("IDEATION_OUTPUT_MODE", "markdown")
+        self.structured_repair_attempts = 1
+
+        # Early stop: stream generation and stop once this many ideas pass the
+        # quality gate (complete sections, no duplicate title, minimum score).
+        # 0 generates the full set.
+        self.target_ideas = int(os.getenv("IDEATION_TARGET_IDEAS", "0"))
+        self.min_idea_score = float(os.getenv("IDEATION_MIN_IDEA_SCORE", "0"))
+
+        # Batch mode settings
+        self.batch_chunk_size = 1000  # Sessions per submitted message batch
+        self.batch_poll_initial = 10.0  # Seconds before the first status check
+        self.batch_poll_max = 300.0  # Longest wait between status checks
+
+        # Packed batch requests (batch --pack): sessions with the same shared
+        # inputs are sent several to a request, under an output token budget
+        self.pack_max_opportunities = int(os.getenv("IDEATION_PACK_MAX_OPPORTUNITIES", "20"))
+        self.pack_ideas_per_opportunity = int(os.getenv("IDEATION_PACK_IDEAS", "5"))
+        self.pack_max_tokens = int(os.getenv("IDEATION_PACK_MAX_TOKENS", "32000"))  # Thinking + output per pack
+
+        # Lazy expansion: generate many short outlines first and write up in
+        # full only the top ideas and the ones the user saves
+        self.lazy_expansion = os.getenv("IDEATION_LAZY_EXPANSION", "0") == "1"
+        self.outline_count = 15
+        self.expand_top_k = 3
+        self.expansion_workers = 4
+
+        # Incremental reruns: start from the newest saved session for the same
+        # opportunity and regenerate only ideas invalidated by changed inputs
+        self.incremental = os.getenv("IDEATION_INCREMENTAL", "0") == "1"
+
+        # LLM-as-judge scoring against the evaluation criteria
+        self.judge_ideas = os.getenv("IDEATION_JUDGE", "0") == "1"
+        self.judge_batch_size = 10  # Ideas per judging call
+        self.judge_batch_chars = 30000  # Idea text per judging call
+        self.judge_max_calls = 5  # Judging calls allowed per session
+        self.judge_workers = 4  # Concurrent judging calls
+
+        # Best-of-N: draw N samples in parallel and keep a diverse slate
+        self.best_of_n = int(os.getenv("IDEATION_BEST_OF_N", "1"))
+        self.slate_size = 10
+        self.mmr_relevance_weight = 0.7  # 1.0 = score only, 0.0 = diversity only
+
+        # Queued sessions (--queue): opportunities generated at the same time
+        self.queue_workers = 3
+
+        # Idea sets larger than this are shown as a paged table (TTY only)
+        self.display_full_limit = 10
+
+        # Analytics export: ideas, scores and usage as a partitioned columnar dataset
+        self.analytics_export = os.getenv("IDEATION_ANALYTICS", "1") == "1"
+        self.analytics_format = os.getenv("IDEATION_ANALYTICS_FORMAT", "auto")  # auto, parquet or csv
+
+        # Record/replay of provider traffic (gzip JSONL cassette)
+        self.cassette_path = os.getenv("IDEATION_CASSETTE")
+        self.cassette_mode = os.getenv("IDEATION_CASSETTE_MODE", "replay")  # record or replay
+        self.replay_speed = float(os.getenv("IDEATION_REPLAY_SPEED", "1.0"))  # 0 = no delays
+        if self.cassette_path and self.cassette_mode == "replay" and not self.has_api_key():
+            self._use_cassette_provider()
+
+        # Synthetic provider for load tests: no network, deterministic
+        # responses in the markdown idea format (IDEATION_PROVIDER=synthetic)
+        self.provider = os.getenv("IDEATION_PROVIDER", "auto")  # auto or synthetic
+        self.synthetic_ideas = int(os.getenv("IDEATION_SYNTHETIC_IDEAS", "50"))
+        self.synthetic_words = int(os.getenv("IDEATION_SYNTHETIC_WORDS", "150"))  # Mean words per idea
+        self.synthetic_malformed_rate = float(os.getenv("IDEATION_SYNTHETIC_MALFORMED_RATE", "0"))
+        self.synthetic_duplicate_rate = float(os.getenv("IDEATION_SYNTHETIC_DUPLICATE_RATE", "0"))
+        self.synthetic_latency_ms = float(os.getenv("IDEATION_SYNTHETIC_LATENCY_MS", "0"))  # Before first chunk
+        self.synthetic_chars_per_second = float(os.getenv("IDEATION_SYNTHETIC_CHARS_PER_SECOND", "0"))  # 0 = instant
+        self.synthetic_seed = int(os.getenv("IDEATION_SYNTHETIC_SEED", "0"))
+
+        # Span tracing of phases and LLM calls (also enabled with --trace)
+        self.trace_enabled = os.getenv("IDEATION_TRACE", "0") == "1"
+        self.trace_format = os.getenv("IDEATION_TRACE_FORMAT", "jsonl")  # jsonl or otlp
+
+        # Spend budgets in USD (0 = no limit). A call whose worst case would
+        # go over is cut down ("degrade": smaller thinking budget, then fewer
+        # ideas) or not made at all ("refuse"). Every charge is appended to
+        # the spend ledger in the output directory.
+        self.session_budget_usd = float(os.getenv("IDEATION_SESSION_BUDGET_USD", "0"))
+        self.batch_budget_usd = float(os.getenv("IDEATION_BATCH_BUDGET_USD", "0"))  # Per batch queue
+        self.daily_budget_usd = float(os.getenv("IDEATION_DAILY_BUDGET_USD", "0"))
+        self.budget_action = os.getenv("IDEATION_BUDGET_ACTION", "degrade")  # degrade or refuse
+        self.ledger_enabled = os.getenv("IDEATION_LEDGER", "1") == "1"
+        # Extra or corrected prices, e.g. {"my-model": [input, output, cache_write, cache_read]}
+        self.price_overrides = json.loads(os.getenv("IDEATION_PRICES", "{}"))
+
+        # HTTP connection settings for the shared provider clients
+        self.http_timeout = 600.0  # Generation with thinking can take minutes
+        self.http_connect_timeout = 10.0
+        self.http_max_connections = 20
+        self.http_max_keepalive_connections = 10
+        self.http_keepalive_expiry = 120.0
+        self.max_retries = 2
+
         # Default evaluation criteria
         self.default_criteria = [
             "Impact on #1 product metric",
@@ -39,10 +144,15 @@ class Config:
         self.ensure_output_dir()
 
     def _load_env_file(self):
-        """Load environment variables from .env file if it exists."""
-        env_path = Path(__file__).parent / ".env"
+        """Load environment variables from .env file if it exists (once per process)."""
+        global _env_file_loaded
+        if _env_file_loaded:
+            return
+        _env_file_loaded = True
 
-        if not env_path.exists():
+        env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+
+        if not os.path.exists(env_path):
             return
 
         try:
@@ -76,6 +186,15 @@ class Config:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+    def _use_cassette_provider(self):
+        """Replay needs no real key: use a placeholder for the recorded provider."""
+        from cassette import cassette_provider
+
+        if cassette_provider(self.cassette_path) == "openai":
+            self.openai_api_key = "cassette-replay"
+        else:
+            self.anthropic_api_key = "cassette-replay"
+
     def has_api_key(self) -> bool:
         """Check if any API key is configured."""
         return bool(self.anthropic_api_key or self.openai_api_key)
@@ -86,6 +205,8 @@ class Config:
 
     def get_model_provider(self) -> str:
         """Determine which model provider to use."""
+        if self.provider == "synthetic":
+            return "synthetic"
         if self.anthropic_api_key:
             return "anthropic"
         elif self.openai_api_key:
@@ -0,0 +1,132 @@
+"""
+Diversity - Compact idea vectors, clustering and MMR slate selection
+"""
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+
+from idea_stream import normalize_title
+
+
+VECTOR_DIMS = 256
+# Characters of each idea's content used for its vector
+VECTOR_TEXT_CHARS = 600
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _word_hash(word: str) -> int:
+    """Stable hash of a word (the built-in hash() is salted per process)."""
+    return zlib.crc32(word.encode("utf-8"))
+
+
+def hash_vectors(texts: List[str], dims: int = VECTOR_DIMS) -> Any:
+    """Embed texts as L2-normalized hashed bag-of-words vectors (unigrams + bigrams)."""
+    import numpy as np
+
+    row_ids = []
+    hashes = []
+    for row, text in enumerate(texts):
+        words = _WORD_PATTERN.findall(text.lower())
+        unigrams = np.fromiter(map(_word_hash, words), dtype=np.int64, count=len(words))
+        # Bigram hashes are combined numerically instead of hashing joined strings
+        bigrams = unigrams[:-1] * 1000003 + unigrams[1:]
+        hashes.append(unigrams)
+        hashes.append(bigrams)
+        row_ids.append(np.full(len(unigrams) + len(bigrams), row, dtype=np.intp))
+
+    if hashes:
+        all_hashes = np.concatenate(hashes)
+        # The low bits pick the column, a higher bit picks the sign
+        signs = np.where((all_hashes >> 20) & 1, 1.0, -1.0)
+        cells = np.concatenate(row_ids) * dims + all_hashes % dims
+        vectors = np.bincount(cells, weights=signs, minlength=len(texts) * dims)
+        vectors = vectors.reshape(len(texts), dims).astype(np.float32)
+    else:
+        vectors = np.zeros((0, dims), dtype=np.float32)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def kmeans(vectors: Any, k: int, iterations: int = 10, seed: int = 0) -> Any:
+    """Cluster unit vectors with spherical k-means. Returns a label per row."""
+    import numpy as np
+
+    n = len(vectors)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(n, size=k, replace=False)]
+
+    labels = np.zeros(n, dtype=np.intp)
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(k):
+            members = vectors[labels == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+                norm = np.linalg.norm(centroid)
+                centroids[cluster] = centroid / norm if norm else centroid
+    return labels
+
+
+def mmr_select(vectors: Any, scores: Any, k: int, relevance_weight: float = 0.7) -> List[int]:
+    """Pick k rows by maximal marginal relevance over score and similarity."""
+    import numpy as np
+
+    n = len(vectors)
+    if n == 0:
+        return []
+
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread else np.ones(n)
+
+    selected: List[int] = []
+    max_similarity = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    for _ in range(min(k, n)):
+        mmr = relevance_weight * relevance - (1 - relevance_weight) * max_similarity
+        mmr[~available] = -np.inf
+        pick = int(np.argmax(mmr))
+        selected.append(pick)
+        available[pick] = False
+        max_similarity = np.maximum(max_similarity, vectors @ vectors[pick])
+    return selected
+
+
+def select_diverse_slate(
+    ideas: List[Dict[str, Any]],
+    slate_size: int,
+    relevance_weight: float = 0.7,
+    clusters: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Choose a high-scoring, diverse slate from a pool of candidate ideas.
+
+    Exact duplicate titles are dropped first. Every idea is tagged with
+    its cluster so the slate can be inspected by theme.
+    """
+    import numpy as np
+
+    unique: List[Dict[str, Any]] = []
+    seen = set()
+    for idea in ideas:
+        key = normalize_title(idea["title"])
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(idea)
+
+    if len(unique) <= 1:
+        return unique
+
+    vectors = hash_vectors([
+        idea["title"] + "\n" + idea["content"][:VECTOR_TEXT_CHARS] for idea in unique
+    ])
+    labels = kmeans(vectors, clusters or slate_size)
+    for idea, label in zip(unique, labels):
+        idea["cluster"] = int(label)
+
+    scores = np.array([float(idea["score"]) for idea in unique])
+    picks = mmr_select(vectors, scores, slate_size, relevance_weight)
+    return [unique[i] for i in picks]
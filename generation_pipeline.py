@@ -0,0 +1,173 @@
+"""
+Generation Pipeline - Background generation for a queue of related opportunities
+"""
+
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from phase6_generation import IdeaGeneration
+from phase7_output import OutputGeneration
+from spend_ledger import SpendLedger
+import tracing
+
+
+# Lines of a failed opportunity's log shown with its error
+LOG_TAIL_LINES = 15
+
+# The log a background job's console output goes to (None: the terminal)
+_capture: contextvars.ContextVar = contextvars.ContextVar("ideation_output_capture", default=None)
+
+
+class _RoutedStream:
+    """Stands in for sys.stdout or sys.stderr, sending a background job's output to its own log."""
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        return (_capture.get() or self.stream).write(text)
+
+    def flush(self):
+        (_capture.get() or self.stream).flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+class GenerationPipeline:
+    """Generates and saves ideas for queued opportunities in the background.
+
+    The opportunities share the context, criteria, competitive insights and
+    example ideas, so their prompts start with one prefix, built once, that
+    the provider can cache. Each opportunity's ideas are saved as soon as
+    they are generated. Console output from generation goes to a per-job
+    log instead of the terminal, where the user is entering the next
+    opportunity. Used as a context manager.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]],
+        use_mock: bool = False
+    ):
+        self.config = config
+        self.context = context
+        self.criteria = criteria
+        self.competitive_insights = competitive_insights
+        self.example_ideas = example_ideas
+        self.use_mock = use_mock
+        # One ledger for the queue, so the session budget covers all of it
+        self.ledger = SpendLedger(config)
+        self.jobs: List[Dict[str, Any]] = []
+        self.shared_prefix = IdeaGeneration(config, use_mock).build_shared_prefix(
+            context, criteria, competitive_insights, example_ideas
+        )
+        self._executor = ThreadPoolExecutor(max_workers=config.queue_workers, thread_name_prefix="queue")
+        self._streams: Optional[Any] = None
+
+    def __enter__(self) -> "GenerationPipeline":
+        # Errors and tracebacks belong in the job's log too
+        self._streams = (sys.stdout, sys.stderr)
+        sys.stdout = _RoutedStream(sys.stdout)
+        sys.stderr = _RoutedStream(sys.stderr)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        # On an interrupt, drop queued opportunities instead of waiting
+        self._executor.shutdown(wait=exc_type is None, cancel_futures=exc_type is not None)
+        sys.stdout, sys.stderr = self._streams
+        return False
+
+    def submit(self, opportunity: Dict[str, Any]):
+        """Start generating ideas for an opportunity in the background."""
+        job = {
+            "number": len(self.jobs) + 1,
+            "opportunity": opportunity,
+            "log": io.StringIO(),
+            "ideas": [],
+            "filepath": None,
+            "reported": False,
+        }
+        job["future"] = self._executor.submit(tracing.wrap(self._run), job)
+        self.jobs.append(job)
+        print(f"✓ Opportunity {job['number']} queued - generating in the background")
+
+    def report(self, wait: bool = False):
+        """Print the outcome of each opportunity finished since the last report.
+
+        With wait, blocks until every queued opportunity has finished,
+        reporting each one as it completes.
+        """
+        pending = [job for job in self.jobs if not job["reported"]]
+        if wait:
+            by_future = {job["future"]: job for job in pending}
+            finished = (by_future[future] for future in as_completed(by_future))
+        else:
+            finished = (job for job in pending if job["future"].done())
+        for job in finished:
+            job["reported"] = True
+            self._report(job)
+
+    def all_ideas(self) -> List[Dict[str, Any]]:
+        """The ideas of every finished opportunity, in queue order."""
+        return [idea for job in self.jobs for idea in job["ideas"]]
+
+    def _run(self, job: Dict[str, Any]):
+        """Generate and save one opportunity's ideas (on a pool thread)."""
+        _capture.set(job["log"])
+        with tracing.span("queue.opportunity", number=job["number"]) as job_span:
+            generator = IdeaGeneration(self.config, use_mock=self.use_mock)
+            generator.shared_prefix = self.shared_prefix
+            generator.ledger = self.ledger
+
+            try:
+                ideas = generator.execute(
+                    job["opportunity"],
+                    self.context,
+                    self.criteria,
+                    self.competitive_insights,
+                    self.example_ideas
+                )
+
+                output = OutputGeneration(
+                    self.config, expander=generator.expander, usage=generator.usage, fingerprint=generator.fingerprint
+                )
+                output._expand_outlines(ideas)
+                job["filepath"] = output.save(
+                    ideas,
+                    job["opportunity"],
+                    self.context,
+                    self.criteria,
+                    session_id=f"q{job['number']}",
+                    source="queue"
+                )
+            finally:
+                generator.close()
+            job["ideas"] = ideas
+            job_span.set_attribute("ideas", len(ideas))
+
+    def _report(self, job: Dict[str, Any]):
+        """Print one finished opportunity's outcome."""
+        description = job["opportunity"].get("description", "")
+        error = job["future"].exception()
+        if error is not None or not job["filepath"]:
+            reason = f"{type(error).__name__}: {str(error)}" if error is not None else "ideas could not be saved"
+            print(f"\n✗ Opportunity {job['number']} ({description[:60]}) failed: {reason}")
+            tail = job["log"].getvalue().strip().splitlines()[-LOG_TAIL_LINES:]
+            for line in tail:
+                print(f"    {line}")
+            return
+
+        ideas = job["ideas"]
+        print(f"\n✓ Opportunity {job['number']} ({description[:60]}): {len(ideas)} ideas saved to {job['filepath']}")
+        ranked = sorted(ideas, key=lambda idea: (idea.get("rank") or len(ideas) + 1, -idea["score"]))
+        for idea in ranked[:3]:
+            print(f"    - {idea['title']} ({idea['score']:.1f})")
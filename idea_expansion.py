@@ -0,0 +1,191 @@
+"""
+Idea Expansion - Turn cheap idea outlines into full write-ups on demand
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import tracing
+
+
+OUTLINE_INSTRUCTIONS = """
+Generate {count} distinct solution ideas as SHORT OUTLINES only. Do not write full descriptions yet.
+
+Format each idea as follows:
+
+---
+### IDEA [NUMBER]: [TITLE]
+
+**Outline:**
+[One or two sentences on what the solution is and why it helps]
+
+---
+
+After all ideas, provide:
+
+## TOP 3 FORCE RANKED IDEAS
+
+1. **[Idea Title]** - [One-sentence reasoning]
+2. **[Idea Title]** - [One-sentence reasoning]
+3. **[Idea Title]** - [One-sentence reasoning]
+"""
+
+EXPANSION_INSTRUCTIONS = """
+Write up the following idea in full.
+
+Title: {title}
+Outline: {outline}
+
+Use exactly this format (no title line, no extra sections):
+
+**Description:**
+[Detailed description, 2-4 paragraphs]
+
+**How it addresses the opportunity:**
+[Explanation]
+
+**Expected impact:**
+[Impact analysis]
+
+**Implementation considerations:**
+[Key considerations]
+"""
+
+# Output cap for a single idea write-up
+EXPANSION_MAX_TOKENS = 2000
+
+# Write-ups kept in the disk cache; the least recently used go first
+MAX_CACHED_EXPANSIONS = 500
+
+
+class IdeaExpander:
+    """Expands outline ideas into full write-ups, concurrently and cached.
+
+    Expansions are keyed by a hash of the shared prompt context and the
+    outline, cached in memory and under the output directory, and run on a
+    small thread pool so several selected ideas expand at once. Call
+    shutdown() when the session is done with it.
+    """
+
+    def __init__(self, generator: Any, context_prompt: str, criteria: Dict[str, Any]):
+        self.generator = generator
+        self.config = generator.config
+        self.context_prompt = context_prompt
+        self.criteria = criteria
+
+        self.cache_dir = os.path.join(self.config.output_dir, ".expansion_cache")
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.expansion_workers,
+            thread_name_prefix="expand"
+        )
+
+    def prefetch(self, ideas: List[Dict[str, Any]]):
+        """Start expanding ideas in the background without waiting."""
+        for idea in ideas:
+            if not idea.get("expanded"):
+                self._submit(idea)
+
+    def expand(self, ideas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Expand ideas in place, waiting for all write-ups. Returns the same list."""
+        pending = [(idea, self._submit(idea)) for idea in ideas if not idea.get("expanded")]
+        if pending:
+            print(f"Expanding {len(pending)} idea(s) into full write-ups...")
+
+        for idea, future in pending:
+            try:
+                content = future.result()
+            except Exception as e:
+                print(f"  ✗ Could not expand '{idea['title']}': {type(e).__name__}: {str(e)}")
+                continue
+
+            idea["content"] = content
+            # A judged score stands; only the length heuristic depends on the text
+            if not idea.get("sub_scores"):
+                idea["score"] = self.generator._calculate_idea_score(content, self.criteria)
+            idea["expanded"] = True
+
+        # Without a ranking from the model, ranks follow the updated scores
+        if pending and not any(idea.get("rank") for idea in ideas):
+            self.generator._apply_score_ranking(ideas)
+
+        return ideas
+
+    def shutdown(self):
+        """Stop the worker pool and trim the disk cache (pending expansions still finish)."""
+        self._executor.shutdown(wait=False)
+        self._prune_cache()
+
+    def _submit(self, idea: Dict[str, Any]) -> Future:
+        """Get the future for an idea's expansion, starting it if needed."""
+        key = self._cache_key(idea)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(tracing.wrap(self._expand_one), key, idea["title"], idea.get("outline", idea["content"]))
+                self._futures[key] = future
+        return future
+
+    def _expand_one(self, key: str, title: str, outline: str) -> str:
+        """Produce one write-up, from the disk cache when possible."""
+        with tracing.span("idea.expand", title=title) as expand_span:
+            content = self._read_cached(key)
+            expand_span.set_attribute("cached", content is not None)
+            if content is None:
+                content = self._generate(key, title, outline)
+            expand_span.set_attribute("chars", len(content))
+            return content
+
+    def _read_cached(self, key: str) -> Optional[str]:
+        """A write-up from the disk cache, or None."""
+        cache_path = os.path.join(self.cache_dir, f"{key}.md")
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            # Mark it as recently used, so pruning keeps it
+            os.utime(cache_path)
+            return content
+        except OSError:
+            return None
+
+    def _prune_cache(self):
+        """Delete the least recently used write-ups beyond MAX_CACHED_EXPANSIONS."""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".md")]
+            entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+            for entry in entries[MAX_CACHED_EXPANSIONS:]:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _generate(self, key: str, title: str, outline: str) -> str:
+        """Write up one outline with the model and cache the result on disk."""
+        cache_path = os.path.join(self.cache_dir, f"{key}.md")
+        prompt = self.context_prompt + "\n\n## TASK\n" + EXPANSION_INSTRUCTIONS.format(
+            title=title, outline=outline
+        )
+        content = self.generator._complete_text(prompt, EXPANSION_MAX_TOKENS, "expansion").strip()
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+        return content
+
+    def _cache_key(self, idea: Dict[str, Any]) -> str:
+        """Hash of the shared context plus the idea's outline."""
+        digest = hashlib.sha256()
+        digest.update(self.context_prompt.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(idea["title"].encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(idea.get("outline", idea["content"]).encode("utf-8"))
+        return digest.hexdigest()[:32]
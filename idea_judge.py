@@ -0,0 +1,253 @@
+"""
+Idea Judge - Score ideas against the user's criteria with batched LLM calls
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from structured_output import parse_json_payload
+import tracing
+
+
+JUDGE_INSTRUCTIONS = """
+You are judging product ideas. Score EVERY idea below against EVERY criterion
+on a scale from 1 (poor) to 5 (excellent). Judge each idea on its own merits.
+
+## CRITERIA
+{criteria}
+
+## IDEAS
+{ideas}
+
+Respond with JSON only, in exactly this shape:
+{{"scores": [{{"id": 1, "scores": {{"<criterion>": 3}}}}]}}
+"""
+
+# Characters of idea content sent to the judge per idea
+MAX_IDEA_CHARS = 3000
+
+# Judgements kept in the cache; the oldest go first
+MAX_CACHED_JUDGEMENTS = 5000
+
+# Open caches by file path, so each is read once per process
+_caches: Dict[str, "JudgeCache"] = {}
+_caches_lock = threading.Lock()
+
+
+class JudgeCache:
+    """Judgements by key, shared by every judge in the process.
+
+    New judgements are appended to a JSONL file. Once the file holds twice
+    MAX_CACHED_JUDGEMENTS lines, it is rewritten atomically with only the
+    newest MAX_CACHED_JUDGEMENTS entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lines = 0
+        self._load()
+        if self._lines > MAX_CACHED_JUDGEMENTS:
+            self._compact()
+
+    @classmethod
+    def for_path(cls, path: str) -> "JudgeCache":
+        """The process's cache for a file, loading it on first use."""
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                cache = _caches[path] = cls(path)
+            return cache
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        """A cached judgement, or None."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, sub_scores: Dict[str, float]):
+        """Cache a judgement in memory and append it to the file."""
+        with self._lock:
+            self._add(key, sub_scores)
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "scores": sub_scores}) + "\n")
+                self._lines += 1
+            except OSError:
+                return
+            if self._lines >= 2 * MAX_CACHED_JUDGEMENTS:
+                self._compact()
+
+    def _add(self, key: str, sub_scores: Dict[str, float]):
+        """Insert as the newest entry, dropping the oldest beyond the cap (lock held)."""
+        self._entries[key] = sub_scores
+        self._entries.move_to_end(key)
+        while len(self._entries) > MAX_CACHED_JUDGEMENTS:
+            self._entries.popitem(last=False)
+
+    def _load(self):
+        """Read judgements saved by previous sessions, oldest first."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._lines += 1
+                    try:
+                        entry = json.loads(line)
+                        self._add(entry["key"], entry["scores"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            pass
+
+    def _compact(self):
+        """Rewrite the file with only the entries held in memory."""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for key, sub_scores in self._entries.items():
+                    f.write(json.dumps({"key": key, "scores": sub_scores}) + "\n")
+            os.replace(tmp_path, self.path)
+            self._lines = len(self._entries)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class IdeaJudge:
+    """Scores ideas against all criteria in as few calls as possible.
+
+    Ideas are packed into batches that are judged concurrently, capped at
+    a per-session call budget. Judgements are cached by idea and criteria,
+    so repeated ideas are never judged twice. Per-criterion scores are
+    combined with the criteria weights in one vectorized step.
+    """
+
+    def __init__(self, generator: Any, criteria: Dict[str, Any]):
+        self.generator = generator
+        self.config = generator.config
+        self.weights = criteria['weights']
+        self.criteria_names = list(self.weights.keys())
+
+        self._cache = JudgeCache.for_path(os.path.join(self.config.output_dir, ".judge_cache.jsonl"))
+
+    def score(self, ideas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Judge ideas and replace their scores in place. Returns the same list."""
+        keys = [self._cache_key(idea) for idea in ideas]
+        uncached = [i for i, key in enumerate(keys) if key not in self._cache]
+
+        batches = self._pack(uncached, ideas)
+        budget = self.config.judge_max_calls
+        if len(batches) > budget:
+            print(f"  Judging budget allows {budget} of {len(batches)} batches; the rest keep heuristic scores")
+            batches = batches[:budget]
+
+        if batches:
+            print(f"  Judging {sum(len(b) for b in batches)} idea(s) against {len(self.criteria_names)} criteria "
+                  f"in {len(batches)} call(s)...")
+            with ThreadPoolExecutor(max_workers=self.config.judge_workers) as executor:
+                for judged in executor.map(tracing.wrap(lambda batch: self._judge_batch(batch, ideas)), batches):
+                    for position, sub_scores in judged.items():
+                        self._cache.put(keys[position], sub_scores)
+
+        judged_scores = [self._cache.get(key) for key in keys]
+        self._aggregate(ideas, judged_scores)
+        return ideas
+
+    def _pack(self, positions: List[int], ideas: List[Dict[str, Any]]) -> List[List[int]]:
+        """Pack idea positions into batches by count and prompt size."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_chars = 0
+        for position in positions:
+            size = min(len(ideas[position]["content"]), MAX_IDEA_CHARS) + len(ideas[position]["title"])
+            if current and (
+                len(current) >= self.config.judge_batch_size
+                or current_chars + size > self.config.judge_batch_chars
+            ):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(position)
+            current_chars += size
+        if current:
+            batches.append(current)
+        return batches
+
+    def _judge_batch(self, positions: List[int], ideas: List[Dict[str, Any]]) -> Dict[int, Dict[str, float]]:
+        """Judge one packed batch. Returns sub-scores by idea position."""
+        idea_lines = []
+        for batch_id, position in enumerate(positions, 1):
+            idea = ideas[position]
+            idea_lines.append(f"### Idea {batch_id}: {idea['title']}\n{idea['content'][:MAX_IDEA_CHARS]}\n")
+
+        prompt = JUDGE_INSTRUCTIONS.format(
+            criteria="\n".join(f"- {name}" for name in self.criteria_names),
+            ideas="\n".join(idea_lines)
+        )
+        max_tokens = 200 + len(positions) * (40 + 20 * len(self.criteria_names))
+
+        with tracing.span("judge.batch", ideas=len(positions)):
+            try:
+                payload = parse_json_payload(self.generator._complete_text(prompt, max_tokens, "judge"))
+            except Exception as e:
+                print(f"  ✗ Judging call failed: {type(e).__name__}: {str(e)}")
+                return {}
+
+        judged = {}
+        for entry in (payload.get("scores") or []) if isinstance(payload, dict) else []:
+            if not isinstance(entry, dict) or not isinstance(entry.get("id"), int):
+                continue
+            if not 1 <= entry["id"] <= len(positions):
+                continue
+            raw = entry.get("scores") or {}
+            sub_scores = {}
+            for name in self.criteria_names:
+                value = raw.get(name)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    sub_scores[name] = float(min(max(value, 1), 5))
+            if sub_scores:
+                judged[positions[entry["id"] - 1]] = sub_scores
+        return judged
+
+    def _aggregate(self, ideas: List[Dict[str, Any]], judged_scores: List[Optional[Dict[str, float]]]):
+        """Combine per-criterion scores into 0-100 scores with the criteria weights."""
+        import numpy as np
+
+        matrix = np.full((len(ideas), len(self.criteria_names)), np.nan)
+        for row, sub_scores in enumerate(judged_scores):
+            if sub_scores:
+                for column, name in enumerate(self.criteria_names):
+                    if name in sub_scores:
+                        matrix[row, column] = sub_scores[name]
+
+        weights = np.array([self.weights[name] for name in self.criteria_names], dtype=float)
+        present = ~np.isnan(matrix)
+        weighted_sum = np.where(present, matrix, 0.0) @ weights
+        max_possible = (present @ weights) * 5
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = np.round(weighted_sum / max_possible * 100, 1)
+
+        for row, idea in enumerate(ideas):
+            if max_possible[row] > 0:
+                idea["score"] = float(scores[row])
+                idea["sub_scores"] = judged_scores[row]
+
+    def _cache_key(self, idea: Dict[str, Any]) -> str:
+        """Hash of the criteria and the idea text."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self.criteria_names).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(idea["title"].encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(idea["content"].encode("utf-8"))
+        return digest.hexdigest()[:32]
@@ -0,0 +1,235 @@
+"""
+Idea Model - Compact slotted records for ideas and session state
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple
+
+
+# Strings at least this long are shared through the blob store
+BLOB_MIN_CHARS = 256
+# Shared strings kept for reuse; older ones are forgotten (but stay alive
+# for as long as something still references them)
+BLOB_STORE_MAX_CHARS = 64_000_000
+
+_MISSING = object()
+
+
+class SlottedRecord(MutableMapping):
+    """A record whose fields live in __slots__ but that reads like a dict.
+
+    Ideas and session state used to be plain dicts, and the phases still
+    index them by key, so records keep that interface: record["title"],
+    get(), "in", iteration, ** unpacking and json-friendly to_dict(). A
+    field that was never set is absent, as a missing dict key would be.
+    Keys outside FIELDS are kept in a small overflow dict, created only
+    when first needed.
+    """
+
+    __slots__ = ("_extra",)
+    FIELDS: Tuple[str, ...] = ()
+    _field_set: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def __init__(self, **fields: Any):
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._field_set and getattr(self, key, _MISSING) is not _MISSING:
+            delattr(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.FIELDS:
+            if getattr(self, name, _MISSING) is not _MISSING:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def copy(self) -> "SlottedRecord":
+        """A shallow copy (field values are shared, not copied)."""
+        return type(self)(**self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The set fields as a plain dict."""
+        return {key: self[key] for key in self}
+
+
+class Idea(SlottedRecord):
+    """One generated idea.
+
+    title, content, score and rank are always set; the other fields are
+    added by later stages (judge, diversity, lazy expansion, refinement).
+    """
+
+    FIELDS = ("title", "content", "score", "rank", "sub_scores", "cluster", "outline", "expanded", "refined")
+    __slots__ = FIELDS
+
+    def summary(self) -> "IdeaSummary":
+        """Everything about the idea except its text, for indexes and analytics."""
+        summary = IdeaSummary(content_chars=len(self["content"]))
+        for key in IdeaSummary.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                summary[key] = value
+        return summary
+
+
+class IdeaSummary(SlottedRecord):
+    """An idea without its text, kept after the text has been written out."""
+
+    FIELDS = ("title", "score", "rank", "cluster", "sub_scores", "content_chars")
+    __slots__ = FIELDS
+
+
+class SessionState(SlottedRecord):
+    """The inputs and results of an interactive session.
+
+    Large strings in the phase inputs are shared through the blob store, and
+    criterion names are interned, so many sessions held at once (batch and
+    server modes) keep one copy of a shared product context or criteria set.
+    """
+
+    FIELDS = (
+        "opportunity",
+        "context",
+        "criteria",
+        "competitive_insights",
+        "example_ideas",
+        "generated_ideas",
+        "phase",
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, **fields: Any):
+        super().__init__(
+            opportunity={},
+            context={},
+            criteria={},
+            competitive_insights=[],
+            example_ideas=[],
+            generated_ideas=[],
+            phase=1
+        )
+        for key, value in fields.items():
+            self[key] = value
+
+    def __setitem__(self, key: str, value: Any):
+        if key == "criteria":
+            value = intern_criteria(value)
+        elif key in ("opportunity", "context", "competitive_insights", "example_ideas"):
+            value = share_strings(value)
+        super().__setitem__(key, value)
+
+
+def blob_hash(text: str) -> str:
+    """Content hash identifying a shared string."""
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class BlobStore:
+    """Content-addressed strings, so equal large texts share one object.
+
+    Sessions built from the same files (a product context used by a whole
+    batch queue, say) hand their copies to share() and get back the one
+    instance already held, letting the duplicates be freed.
+    """
+
+    def __init__(self, max_chars: int = BLOB_STORE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._blobs: "OrderedDict[str, str]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def share(self, text: str) -> str:
+        """The stored instance equal to text (storing text if it is new)."""
+        if len(text) < BLOB_MIN_CHARS:
+            return text
+        digest = blob_hash(text)
+        with self._lock:
+            existing = self._blobs.get(digest)
+            if existing is not None:
+                self._blobs.move_to_end(digest)
+                return existing
+            self._blobs[digest] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars and len(self._blobs) > 1:
+                _, evicted = self._blobs.popitem(last=False)
+                self._chars -= len(evicted)
+        return text
+
+    def get(self, digest: str) -> Optional[str]:
+        """A stored string by its hash, if it is still held."""
+        with self._lock:
+            return self._blobs.get(digest)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+# Process-wide store shared by all sessions
+_store = BlobStore()
+
+
+def share_text(text: str) -> str:
+    """Share a string through the process-wide blob store."""
+    return _store.share(text)
+
+
+def share_strings(value: Any) -> Any:
+    """Share every large string inside nested dicts and lists, in place where possible."""
+    if isinstance(value, str):
+        return _store.share(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            value[key] = share_strings(item)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            value[i] = share_strings(item)
+    return value
+
+
+def intern_criteria(criteria: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern criterion names, so every sub-score dict keyed by them shares the key strings."""
+    weights = criteria.get("weights")
+    if isinstance(weights, dict):
+        criteria["weights"] = {sys.intern(name): weight for name, weight in weights.items()}
+    names = criteria.get("criteria_list")
+    if isinstance(names, list):
+        criteria["criteria_list"] = [sys.intern(name) for name in names]
+    return criteria
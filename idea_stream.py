@@ -0,0 +1,184 @@
+"""
+Idea Stream - Accept ideas incrementally from a streamed generation
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+
+IDEA_MARKER = "### IDEA"
+RANKING_MARKERS = ("TOP 3 FORCE RANKED", "FORCE RANKED IDEAS")
+
+# How far to look back so markers split across chunks are still found
+MARKER_LOOKBACK = max(len(marker) for marker in (IDEA_MARKER,) + RANKING_MARKERS)
+
+REQUIRED_SECTIONS = [
+    "**Description:**",
+    "**How it addresses the opportunity:**",
+    "**Expected impact:**",
+    "**Implementation considerations:**",
+]
+
+
+def normalize_title(title: str) -> str:
+    """Normalize an idea title for duplicate detection."""
+    return re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+
+
+def iter_idea_sections(response_text: str) -> Iterator[str]:
+    """Yield the text after each idea marker, one section at a time.
+
+    Gives the same sections as response_text.split(IDEA_MARKER)[1:] without
+    building the whole list, so only one section is alive at a time.
+    """
+    start = response_text.find(IDEA_MARKER)
+    while start >= 0:
+        start += len(IDEA_MARKER)
+        end = response_text.find(IDEA_MARKER, start)
+        yield response_text[start:end if end >= 0 else len(response_text)]
+        start = end
+
+
+def count_idea_sections(response_text: str) -> int:
+    """Number of idea sections that have both a title and a body."""
+    count = 0
+    for section in iter_idea_sections(response_text):
+        title, _, body = section.strip().partition("\n")
+        if title.strip() and body.strip():
+            count += 1
+    return count
+
+
+def is_complete(content: str) -> bool:
+    """Check that every required section is present and non-empty."""
+    positions = []
+    for heading in REQUIRED_SECTIONS:
+        position = content.find(heading)
+        if position < 0:
+            return False
+        positions.append((position, heading))
+
+    positions.sort()
+    for i, (position, heading) in enumerate(positions):
+        end = positions[i + 1][0] if i + 1 < len(positions) else len(content)
+        body = content[position + len(heading):end].strip().strip("-").strip()
+        if not body:
+            return False
+
+    return True
+
+
+class StreamingIdeaCollector:
+    """Collects ideas from streamed markdown as each idea block completes.
+
+    A block is complete once the next idea marker (or the ranking section)
+    has arrived. Each complete block passes a quality gate - section
+    completeness, title dedupe and a minimum score - before it is accepted.
+    """
+
+    def __init__(
+        self,
+        parse_section: Callable[[str], Dict[str, Any]],
+        target: int,
+        min_score: float = 0.0
+    ):
+        self.parse_section = parse_section
+        self.target = target
+        self.min_score = min_score
+
+        self.accepted: List[Dict[str, Any]] = []
+        self.rejected = 0
+
+        self._buffer = ""
+        self._ranking_start: Optional[int] = None
+        self._block_start: Optional[int] = None
+        self._scan_from = 0
+        self._seen_titles: Set[str] = set()
+
+    @property
+    def done(self) -> bool:
+        """True once the target number of ideas has been accepted."""
+        return len(self.accepted) >= self.target
+
+    @property
+    def ranking_text(self) -> Optional[str]:
+        """The ranking section received so far, if it has started."""
+        if self._ranking_start is None:
+            return None
+        return self._buffer[self._ranking_start:]
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text. Returns True when the target has been met."""
+        self._buffer += chunk
+
+        while not self.done and self._ranking_start is None:
+            search_from = max(self._scan_from - MARKER_LOOKBACK, 0)
+            if self._block_start is not None:
+                search_from = max(search_from, self._block_start + len(IDEA_MARKER))
+
+            next_marker = self._buffer.find(IDEA_MARKER, search_from)
+            ranking_at = self._find_ranking(search_from)
+
+            if ranking_at >= 0 and (next_marker < 0 or ranking_at < next_marker):
+                if self._block_start is not None:
+                    self._accept_block(self._buffer[self._block_start:ranking_at])
+                    self._block_start = None
+                self._ranking_start = ranking_at
+                break
+
+            if next_marker < 0:
+                self._scan_from = len(self._buffer)
+                break
+
+            if self._block_start is not None:
+                self._accept_block(self._buffer[self._block_start:next_marker])
+            self._block_start = next_marker
+            self._scan_from = next_marker + len(IDEA_MARKER)
+
+        self._discard_consumed()
+        return self.done
+
+    def finish(self, stopped_early: bool) -> List[Dict[str, Any]]:
+        """Flush the trailing block when the stream ended on its own."""
+        if not stopped_early and not self.done and self._block_start is not None:
+            self._accept_block(self._buffer[self._block_start:])
+            self._block_start = None
+        return self.accepted[:self.target] if self.target else self.accepted
+
+    def _discard_consumed(self):
+        """Drop text before the current block so appending chunks stays cheap."""
+        if self._ranking_start is not None or not self._block_start:
+            return
+        cut = self._block_start
+        self._buffer = self._buffer[cut:]
+        self._block_start = 0
+        self._scan_from -= cut
+
+    def _find_ranking(self, start: int) -> int:
+        """Find the start of the ranking section's heading line."""
+        positions = [self._buffer.find(marker, start) for marker in RANKING_MARKERS]
+        positions = [p for p in positions if p >= 0]
+        if not positions:
+            return -1
+        position = min(positions)
+        line_start = self._buffer.rfind("\n", 0, position)
+        return line_start + 1 if line_start >= 0 else position
+
+    def _accept_block(self, block: str):
+        """Run a complete idea block through the quality gate."""
+        section = block[len(IDEA_MARKER):].strip()
+        section = section.rstrip("-").rstrip()
+        idea = self.parse_section(section)
+
+        title_key = normalize_title(idea["title"])
+        if (
+            not title_key
+            or title_key in self._seen_titles
+            or not is_complete(idea["content"])
+            or idea["score"] < self.min_score
+        ):
+            self.rejected += 1
+            return
+
+        self._seen_titles.add(title_key)
+        self.accepted.append(idea)
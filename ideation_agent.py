@@ -4,24 +4,259 @@ Ideation Agent - Interactive CLI for generating solution ideas
 Main entry point for the application
 """
 
+import argparse
 import sys
-from typing import Optional
+from typing import List, Optional
 from session_manager import SessionManager
 from config import Config
+import tracing
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        description="Generate innovative solutions for customer opportunities"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile CPU and memory per phase and write the results to the output directory"
+    )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Ideate on several opportunities that share context, criteria and examples, "
+             "generating each in the background while you enter the next"
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record nested spans for phases and LLM calls to the output directory"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser(
+        "batch",
+        help="Run queued session payloads through the message batch API"
+    )
+    batch.add_argument("queue_dir", help="Directory of session payload *.json files")
+    batch.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="Seconds before the first batch status check"
+    )
+    batch.add_argument(
+        "--pack",
+        action="store_true",
+        help="Send sessions that share their context, criteria and examples several to a request"
+    )
+
+    list_parser = subparsers.add_parser(
+        "list",
+        help="List saved sessions, newest first"
+    )
+    list_parser.add_argument("--limit", type=int, default=20, help="Number of sessions to show")
+    list_parser.add_argument("--opportunity", help="Only sessions with this opportunity hash (or prefix)")
+
+    show = subparsers.add_parser(
+        "show",
+        help="Show a saved session"
+    )
+    show.add_argument("session_id", nargs="?", help="Session ID or prefix (default: most recent)")
+    show.add_argument("--opportunity", help="Most recent session with this opportunity hash (or prefix)")
+    show.add_argument("--idea", type=int, help="Print this idea in full")
+
+    compact = subparsers.add_parser(
+        "compact",
+        help="Merge the small files of the analytics dataset"
+    )
+    compact.add_argument(
+        "--min-files",
+        type=int,
+        default=2,
+        help="Only compact partitions with at least this many files"
+    )
+
+    spend = subparsers.add_parser(
+        "spend",
+        help="Summarize recorded token usage and cost by day and purpose"
+    )
+    spend.add_argument("--days", type=int, default=7, help="Number of days to include, ending today")
+
+    daemon = subparsers.add_parser(
+        "daemon",
+        help="Keep the agent loaded and serve session payloads from ideation_client.py"
+    )
+    daemon.add_argument("--socket", default=None, help="Socket path (default: IDEATION_DAEMON_SOCKET)")
+
+    return parser
+
+
+def run_batch(config: Config, args: argparse.Namespace):
+    """Run a queue of sessions in batch mode."""
+    from batch_runner import BatchRunner
+
+    runner = BatchRunner(config, poll_interval=args.poll_interval, pack=args.pack)
+    runner.run(args.queue_dir)
+
+
+def run_compact(config: Config, args: argparse.Namespace):
+    """Compact the analytics dataset."""
+    from analytics_export import AnalyticsExporter
+
+    exporter = AnalyticsExporter(config)
+    print(f"Compacting {exporter.root}...")
+    merged = exporter.compact(min_files=args.min_files)
+    print(f"✓ Merged {merged} file(s)")
+
+
+def run_spend(config: Config, args: argparse.Namespace):
+    """Summarize the spend ledger."""
+    from datetime import date
+    from spend_ledger import read_ledger
+
+    entries = read_ledger(config.output_dir, args.days)
+    if not entries:
+        print("No recorded spend.")
+        return
+
+    days = {}
+    for entry in entries:
+        day = days.setdefault(entry.get("time", "")[:10], {})
+        for key in ("", entry.get("purpose", "unknown")):
+            totals = day.setdefault(key, {"cost_usd": 0.0, "calls": 0, "input_tokens": 0,
+                                          "output_tokens": 0, "cached_tokens": 0})
+            totals["cost_usd"] += entry.get("cost_usd", 0.0)
+            totals["calls"] += 1
+            totals["input_tokens"] += entry.get("input_tokens", 0)
+            totals["output_tokens"] += entry.get("output_tokens", 0)
+            totals["cached_tokens"] += entry.get("cache_read_tokens", 0) + entry.get("cache_write_tokens", 0)
+
+    for day, purposes in days.items():
+        for purpose, totals in purposes.items():
+            label = day if not purpose else f"  {purpose}"
+            print(
+                f"{label:<12} ${totals['cost_usd']:>9.4f}  {totals['calls']:>5} call(s)  "
+                f"{totals['input_tokens']:>10,} in  {totals['output_tokens']:>10,} out  "
+                f"{totals['cached_tokens']:>10,} cached"
+            )
+
+    if config.daily_budget_usd > 0:
+        today = days.get(date.today().isoformat(), {}).get("", {}).get("cost_usd", 0.0)
+        print(f"\nDaily budget: ${today:.4f} of ${config.daily_budget_usd:.2f} used today")
+
+
+def run_daemon(config: Config, args: argparse.Namespace):
+    """Serve sessions from a warm daemon until stopped."""
+    from warm_daemon import WarmDaemon
+
+    sys.exit(WarmDaemon(config, socket_path=args.socket).serve())
+
+
+def run_list(config: Config, args: argparse.Namespace):
+    """List sessions from the output manifest."""
+    from output_manifest import OutputManifest
+
+    entries = OutputManifest(config.output_dir).recent(args.limit, args.opportunity)
+    if not entries:
+        print("No saved sessions found.")
+        return
+
+    for entry in entries:
+        print(f"{entry['timestamp']}  {entry['session_id']}")
+        print(f"  {entry['idea_count']} idea(s) | opportunity {entry['opportunity_hash']}: {entry['opportunity']}")
+        if entry.get('top_titles'):
+            print(f"  Top: {'; '.join(entry['top_titles'])}")
+
+
+def run_show(config: Config, args: argparse.Namespace):
+    """Show one session from the output manifest."""
+    from output_manifest import OutputManifest
+    from output_writer import read_idea
+
+    manifest = OutputManifest(config.output_dir)
+    if args.session_id:
+        entry = manifest.find(args.session_id)
+    else:
+        found = manifest.recent(1, args.opportunity)
+        entry = found[0] if found else None
+
+    if entry is None:
+        print("No matching session found.")
+        return
+
+    if args.idea:
+        offsets = entry.get('offsets') or []
+        if not 1 <= args.idea <= len(offsets):
+            print(f"Session {entry['session_id']} has ideas 1-{len(offsets)}.")
+            return
+        offset, length = offsets[args.idea - 1]
+        text = read_idea(manifest.resolve(entry), offset, length)
+        print(text if text is not None else "Could not read the idea from the session file.")
+        return
+
+    print(f"Session:     {entry['session_id']}")
+    print(f"Saved:       {entry['timestamp']}")
+    print(f"File:        {manifest.resolve(entry)}")
+    print(f"Opportunity: {entry['opportunity']} ({entry['opportunity_hash']})")
+    print(f"\n{entry['idea_count']} idea(s):")
+    for i, title in enumerate(entry.get('titles') or [], 1):
+        print(f"  {i}. {title}")
+    print("\nUse --idea N to print an idea in full.")
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the ideation agent CLI."""
+    args = build_parser().parse_args(argv)
+
+    # Initialize configuration
+    config = Config()
+
+    if args.trace or config.trace_enabled:
+        trace_path = tracing.configure(config.output_dir, config.trace_format)
+        print(f"Tracing to: {trace_path}")
+
+    if args.command == "batch":
+        try:
+            run_batch(config, args)
+        except KeyboardInterrupt:
+            print("\n\nBatch run interrupted. Run the same command again to resume.")
+            sys.exit(0)
+        return
+
+    if args.command == "list":
+        run_list(config, args)
+        return
+
+    if args.command == "show":
+        run_show(config, args)
+        return
+
+    if args.command == "compact":
+        run_compact(config, args)
+        return
+
+    if args.command == "spend":
+        run_spend(config, args)
+        return
+
+    if args.command == "daemon":
+        run_daemon(config, args)
+        return
+
     print("\n" + "="*60)
     print("  IDEATION AGENT")
     print("  Generate innovative solutions for customer opportunities")
     print("="*60 + "\n")
 
-    # Initialize configuration
-    config = Config()
+    profiler = None
+    if args.profile:
+        from phase_profiler import PhaseProfiler
+        profiler = PhaseProfiler(config.output_dir)
 
     # Create session manager
-    session = SessionManager(config)
+    session = SessionManager(config, profiler=profiler, queue=args.queue)
 
     try:
         # Run the ideation session
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Ideation Client - Thin client for the warm daemon
+
+Sends session payloads to a running daemon (ideation_agent.py daemon) and
+streams its output back. It uses only the standard library and never loads
+the configuration, the phases or a provider SDK, so an invocation costs
+little more than a bare interpreter start:
+  python3 ideation_client.py run queue/session1.json queue/session2.json
+  python3 ideation_client.py status
+  python3 ideation_client.py stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Exit status when no daemon is listening
+EXIT_NO_DAEMON = 2
+
+
+def default_socket_path() -> str:
+    """The daemon's socket: IDEATION_DAEMON_SOCKET, else a per-user path."""
+    path = os.environ.get("IDEATION_DAEMON_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"ideation-agent-{os.getuid()}.sock")
+
+
+class DaemonUnavailableError(Exception):
+    """No daemon is listening on the socket."""
+
+
+def send_request(socket_path: str, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Send one request to the daemon and yield its reply events as they arrive.
+
+    Raises:
+        DaemonUnavailableError: if nothing is listening on socket_path
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        sock.close()
+        raise DaemonUnavailableError(f"No daemon at {socket_path} ({e.strerror})")
+
+    with sock, sock.makefile("rb") as replies:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        for line in replies:
+            yield json.loads(line)
+
+
+def run_payloads(socket_path: str, paths: List[str], as_json: bool) -> int:
+    """Run each payload file through the daemon in turn. Returns the exit status."""
+    status = 0
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"✗ {path}: {str(e)}", file=sys.stderr)
+            status = 1
+            continue
+
+        request = {"command": "run", "name": os.path.basename(path), "payload": payload}
+        result = None
+        for event in send_request(socket_path, request):
+            if event["event"] == "output":
+                if not as_json:
+                    sys.stdout.write(event["text"])
+                    sys.stdout.flush()
+            else:
+                result = event
+
+        if as_json:
+            print(json.dumps(result))
+        if result is None or result["event"] != "result":
+            message = result["message"] if result else "the daemon closed the connection"
+            print(f"✗ {path}: {message}", file=sys.stderr)
+            status = 1
+    return status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(description="Send work to a running ideation daemon")
+    parser.add_argument("--socket", default=None, help="Daemon socket path (default: IDEATION_DAEMON_SOCKET)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Generate and save ideas for session payload files")
+    run.add_argument("payloads", nargs="+", help="Session payload *.json files")
+    run.add_argument("--json", action="store_true", help="Print one JSON result per payload instead of the output")
+
+    subparsers.add_parser("status", help="Show whether the daemon is running and what it has done")
+    subparsers.add_parser("stop", help="Stop the daemon once running sessions finish")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point for the thin client."""
+    args = build_parser().parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+
+    try:
+        if args.command == "run":
+            return run_payloads(socket_path, args.payloads, args.json)
+
+        for event in send_request(socket_path, {"command": args.command}):
+            if event["event"] == "status":
+                print(
+                    f"Daemon {event['pid']} on {socket_path}: up {event['uptime_seconds']:.0f}s, "
+                    f"provider {event['provider']}, {event['sessions_run']} session(s) run, "
+                    f"{event['active']} running"
+                )
+            elif event["event"] == "stopping":
+                print(f"Daemon {event['pid']} stopping")
+            else:
+                print(f"✗ {event.get('message', event)}", file=sys.stderr)
+                return 1
+        return 0
+    except DaemonUnavailableError as e:
+        print(f"{str(e)}. Start one with: python3 ideation_agent.py daemon", file=sys.stderr)
+        return EXIT_NO_DAEMON
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,7 @@ Input helper functions for CLI interaction
 
 import os
 from typing import Optional, List
+import tracing
 
 
 def get_user_input(prompt: str, required: bool = True, multiline: bool = False) -> str:
@@ -122,6 +123,14 @@ def read_file_content(file_path: str) -> Optional[str]:
     Returns:
         File content as string, or None if error
     """
+    with tracing.span("file.read", path=file_path) as read_span:
+        content = _read_file_content(file_path)
+        read_span.set_attribute("chars", len(content) if content else 0)
+        return content
+
+
+def _read_file_content(file_path: str) -> Optional[str]:
+    """Read a file, or the .txt/.md files in a directory, printing any error."""
     try:
         # Expand user home directory
         expanded_path = os.path.expanduser(file_path)
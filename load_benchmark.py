@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Load Benchmark - Throughput and memory of phases 6-7 at high idea counts
+
+Uses the synthetic provider, so no API key or network is needed:
+  python3 load_benchmark.py --ideas 1000 10000 --malformed-rate 0.02 --duplicate-rate 0.01
+
+For each idea count it times parsing (with heuristic scoring), ranking,
+the streaming quality gate (section checks and title dedupe), rendering
+the idea list, saving the output files, and the streaming parse-to-save
+pipeline batch mode uses, then reports each stage's median time, ideas
+per second and peak traced memory.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+
+SAMPLE_CRITERIA = {
+    "criteria": ["Impact", "Confidence", "Effort", "Innovation"],
+    "weights": {"Impact": 5, "Confidence": 4, "Effort": 3, "Innovation": 3},
+}
+SAMPLE_OPPORTUNITY = {"description": "Load test opportunity", "evidence": "Synthetic"}
+SAMPLE_CONTEXT = {"product_context": "Load test product"}
+
+
+def build_stages(config: Any, response_text: str) -> Tuple[List[Tuple[str, Callable[[], Any]]], Dict[str, Any]]:
+    """The stages to measure, in pipeline order, and the dict they share results through."""
+    from idea_stream import StreamingIdeaCollector
+    from phase6_generation import IdeaGeneration
+    from phase7_output import OutputGeneration
+    from terminal_render import OutputBuffer, add_idea_details, add_idea_table
+
+    generator = IdeaGeneration(config)
+    output = OutputGeneration(config)
+    chunk_size = generator.synthetic.chunk_chars
+    parsed: Dict[str, Any] = {}
+
+    def parse():
+        parsed["ideas"] = generator._parse_ideas_from_response(response_text, SAMPLE_CRITERIA)
+
+    def rank():
+        generator._apply_score_ranking(parsed["ideas"])
+
+    def gate():
+        collector = StreamingIdeaCollector(
+            lambda section: generator._parse_idea_section(section, SAMPLE_CRITERIA),
+            len(parsed["ideas"]) + 1
+        )
+        for start in range(0, len(response_text), chunk_size):
+            collector.feed(response_text[start:start + chunk_size])
+        collector.finish(False)
+        parsed["accepted"] = collector.accepted
+
+    def render():
+        out = OutputBuffer()
+        ideas = parsed["ideas"]
+        add_idea_table(out, ideas)
+        add_idea_details(out, ideas, list(range(1, len(ideas) + 1)))
+        return out.text()
+
+    def save():
+        with contextlib.redirect_stdout(io.StringIO()):
+            output._save_ideas_to_file(parsed["ideas"], SAMPLE_OPPORTUNITY, SAMPLE_CONTEXT, SAMPLE_CRITERIA)
+
+    def pipeline():
+        # Parse, score, rank and write one idea at a time, as batch mode does
+        with contextlib.redirect_stdout(io.StringIO()):
+            output._save_ideas_to_file(
+                generator.iter_ideas(response_text, SAMPLE_CRITERIA),
+                SAMPLE_OPPORTUNITY, SAMPLE_CONTEXT, SAMPLE_CRITERIA
+            )
+
+    stages = [
+        ("parse", parse), ("rank", rank), ("gate", gate), ("render", render), ("save", save),
+        ("pipeline", pipeline),
+    ]
+    return stages, parsed
+
+
+def measure(idea_count: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every stage for one idea count. Returns timings, peaks and counts."""
+    from config import Config
+    from synthetic_provider import SyntheticProvider
+
+    config = Config()
+    config.provider = "synthetic"
+    config.synthetic_ideas = idea_count
+    config.synthetic_words = args.words
+    config.synthetic_malformed_rate = args.malformed_rate
+    config.synthetic_duplicate_rate = args.duplicate_rate
+    config.synthetic_latency_ms = 0
+    config.synthetic_chars_per_second = 0
+    config.analytics_export = args.analytics
+
+    start = time.perf_counter()
+    response_text = SyntheticProvider.from_config(config).response()
+    synth_seconds = time.perf_counter() - start
+
+    timings: Dict[str, List[float]] = {}
+    peaks: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for run in range(args.runs + 1):
+        # The last pass runs under tracemalloc for peak memory only, since
+        # tracing allocations slows everything down
+        traced = run == args.runs
+        config.output_dir = tempfile.mkdtemp(prefix="ideation_load_")
+        stages, parsed = build_stages(config, response_text)
+        for name, stage in stages:
+            if traced:
+                tracemalloc.start()
+                stage()
+                peaks[name] = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+            else:
+                start = time.perf_counter()
+                stage()
+                timings.setdefault(name, []).append(time.perf_counter() - start)
+        counts = {"parsed": len(parsed["ideas"]), "accepted": len(parsed["accepted"])}
+        shutil.rmtree(config.output_dir, ignore_errors=True)
+
+    return {
+        "response_mb": len(response_text) / 1e6,
+        "synth_seconds": synth_seconds,
+        "timings": timings,
+        "peaks": peaks,
+        "counts": counts,
+    }
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Load-test phases 6-7 with the synthetic provider")
+    parser.add_argument("--ideas", type=int, nargs="+", default=[1000, 10000], help="Idea counts to test")
+    parser.add_argument("--words", type=int, default=150, help="Mean words per idea")
+    parser.add_argument("--malformed-rate", type=float, default=0.02, help="Share of malformed idea blocks")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01, help="Share of duplicate titles")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per idea count")
+    parser.add_argument("--analytics", action="store_true", help="Include the analytics export in the save stage")
+    args = parser.parse_args()
+
+    # Keep the benchmark self-contained: no provider or cassette settings apply
+    os.environ["IDEATION_PROVIDER"] = "synthetic"
+    os.environ.pop("IDEATION_CASSETTE", None)
+
+    for idea_count in args.ideas:
+        result = measure(idea_count, args)
+        counts = result["counts"]
+        print(
+            f"\n{idea_count} ideas ({result['response_mb']:.1f} MB response, "
+            f"synthesized in {result['synth_seconds'] * 1000:.0f} ms): "
+            f"{counts['parsed']} parsed, {counts['accepted']} passed the quality gate"
+        )
+        print(f"  {'Stage':<9}{'Median ms':>11}{'Ideas/s':>12}{'Peak MB':>10}")
+        for stage, samples in result["timings"].items():
+            median = statistics.median(samples)
+            rate = idea_count / median if median > 0 else float("inf")
+            print(f"  {stage:<9}{median * 1000:>11.1f}{rate:>12,.0f}{result['peaks'][stage]:>10.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Opportunity Pack - Several opportunities with shared inputs in one generation request
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from budget_controller import thinking_params
+
+
+PACK_INTRO = (
+    "You are an expert product strategist and innovation consultant. "
+    "Your task is to generate innovative solution ideas for each of several customer "
+    "opportunities that share the product context below."
+)
+
+PACK_INSTRUCTIONS = """
+Generate {count} innovative solution ideas for EACH opportunity above.
+
+Answer every opportunity in its own section, in the order given. Start each
+section with the opportunity's marker line, exactly as shown above (for
+example "=== OPPORTUNITY O1 ==="), and do not write anything else on it.
+
+Inside a section, format each idea as follows:
+
+---
+### IDEA [NUMBER]: [TITLE]
+
+**Description:**
+[Detailed description]
+
+**How it addresses the opportunity:**
+[Explanation]
+
+**Expected impact:**
+[Impact analysis]
+
+**Implementation considerations:**
+[Key considerations]
+
+---
+
+End each section with its own ranking:
+
+## TOP 3 FORCE RANKED IDEAS
+
+1. **[Idea Title]** - [Reasoning]
+2. **[Idea Title]** - [Reasoning]
+3. **[Idea Title]** - [Reasoning]
+"""
+
+SECTION_MARKER = "=== OPPORTUNITY {label} ==="
+_SECTION_PATTERN = re.compile(r"^[ \t#*]*=== OPPORTUNITY (O\d+) ===[ \t*]*$", re.MULTILINE)
+
+
+def pack_label(index: int) -> str:
+    """The short label the model uses for the index-th opportunity of a pack."""
+    return f"O{index + 1}"
+
+
+def pack_custom_id(session_ids: List[str]) -> str:
+    """A batch custom ID for a pack (stable for the same sessions)."""
+    digest = hashlib.sha256("\n".join(session_ids).encode("utf-8")).hexdigest()[:20]
+    return f"pack-{digest}"
+
+
+def split_pack_response(response_text: str, labels: List[str]) -> Dict[str, str]:
+    """Split a packed response into the section text of each label.
+
+    Labels whose marker is missing are left out; if a label appears more
+    than once, its first section is kept.
+    """
+    markers = list(_SECTION_PATTERN.finditer(response_text))
+    wanted = set(labels)
+    sections: Dict[str, str] = {}
+    for i, marker in enumerate(markers):
+        label = marker.group(1)
+        if label not in wanted or label in sections:
+            continue
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(response_text)
+        sections[label] = response_text[marker.end():end]
+    return sections
+
+
+class OpportunityPacker:
+    """Groups queued sessions into packed generation requests.
+
+    Sessions are packed only with others that have exactly the same
+    context, criteria, competitive insights and example ideas, so each
+    pack sends that shared text once. A pack closes when it reaches the
+    opportunity limit or when the output it is expected to need (from
+    the budget controller's learned per-idea figures) would exceed the
+    pack output budget.
+    """
+
+    def __init__(self, generator: Any):
+        self.generator = generator
+        self.config = generator.config
+
+    def pack(self, session_ids: List[str], sessions: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Packs for the given sessions, in queue order of their first session.
+
+        Each pack is a dict with its custom_id, session_ids, labels and prompt.
+        """
+        groups: Dict[str, List[str]] = {}
+        for session_id in session_ids:
+            groups.setdefault(self._shared_text(sessions[session_id]), []).append(session_id)
+
+        per_opportunity = self._output_tokens_per_opportunity()
+        output_budget = self.config.pack_max_tokens - self.config.max_thinking_budget
+        capacity = max(1, min(self.config.pack_max_opportunities, int(output_budget // per_opportunity)))
+
+        packs = []
+        for shared_text, members in groups.items():
+            for start in range(0, len(members), capacity):
+                chunk = members[start:start + capacity]
+                packs.append(self._build_pack(shared_text, chunk, sessions))
+        return packs
+
+    def params(self, pack: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Messages API parameters for a pack, and the budget plan they were sized from."""
+        ideas = len(pack["session_ids"]) * self.config.pack_ideas_per_opportunity
+        plan = self.generator.budget.plan(pack["prompt"], ideas, max_tokens=self.config.pack_max_tokens)
+        params = {
+            "model": self.config.model,
+            "max_tokens": plan["max_tokens"],
+            **thinking_params(plan, self.config.temperature),
+            "messages": [{
+                "role": "user",
+                # Packs of the same group share this prefix, so it is cached
+                "content": [
+                    {"type": "text", "text": pack["shared_text"], "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": pack["prompt"][len(pack["shared_text"]):]},
+                ]
+            }]
+        }
+        return params, plan
+
+    def split(self, session_ids: List[str], response_text: str, truncated: bool) -> Dict[str, Optional[str]]:
+        """Each packed session's section of a response (None where it is missing or cut off)."""
+        labels = [pack_label(i) for i in range(len(session_ids))]
+        sections = split_pack_response(response_text, labels)
+        result: Dict[str, Optional[str]] = {
+            session_id: sections.get(label) for label, session_id in zip(labels, session_ids)
+        }
+
+        if truncated:
+            # The last section written was cut off by the output limit
+            present = [i for i, label in enumerate(labels) if label in sections]
+            if present:
+                result[session_ids[present[-1]]] = None
+        return result
+
+    def _build_pack(
+        self,
+        shared_text: str,
+        session_ids: List[str],
+        sessions: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """One pack: the shared text, then every opportunity under its marker, then instructions."""
+        labels = [pack_label(i) for i in range(len(session_ids))]
+        parts = [shared_text, "\n## OPPORTUNITIES"]
+        for label, session_id in zip(labels, session_ids):
+            parts.append("\n" + SECTION_MARKER.format(label=label))
+            # Drop the single-opportunity heading; the marker replaces it
+            parts.extend(self.generator._build_opportunity_parts(sessions[session_id]["opportunity"])[1:])
+        parts.append("\n## INSTRUCTIONS")
+        parts.append(PACK_INSTRUCTIONS.format(count=self.config.pack_ideas_per_opportunity))
+
+        return {
+            "custom_id": pack_custom_id(session_ids),
+            "session_ids": session_ids,
+            "labels": labels,
+            "shared_text": shared_text,
+            "prompt": "\n".join(parts),
+        }
+
+    def _shared_text(self, session: Dict[str, Any]) -> str:
+        """The prompt text a session shares with others that have the same inputs."""
+        return "\n".join([PACK_INTRO] + self.generator._build_shared_parts(
+            session["context"],
+            session["criteria"],
+            session["competitive_insights"],
+            session["example_ideas"]
+        ))
+
+    def _output_tokens_per_opportunity(self) -> float:
+        """Expected output tokens for one opportunity's section."""
+        stats = self.generator.budget.stats
+        return (
+            self.config.pack_ideas_per_opportunity * stats["text_tokens_per_idea"] + stats["ranking_tokens"]
+        ) * stats["safety_margin"]
@@ -0,0 +1,110 @@
+"""
+Output Manifest - Append-only index of saved sessions in the output directory
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still single writes
+    fcntl = None
+
+
+MANIFEST_FILENAME = "manifest.jsonl"
+# Bytes read per step when scanning the manifest from its end
+READ_BLOCK_SIZE = 64 * 1024
+# Characters of the opportunity description kept in each entry
+OPPORTUNITY_PREVIEW_CHARS = 120
+
+
+def top_titles(ideas: List[Dict[str, Any]], count: int = 3) -> List[str]:
+    """Titles of the force-ranked ideas, or the highest scoring ones."""
+    ranked = sorted((idea for idea in ideas if idea.get('rank')), key=lambda x: x['rank'])
+    if not ranked:
+        ranked = sorted(ideas, key=lambda x: x['score'], reverse=True)
+    return [idea['title'] for idea in ranked[:count]]
+
+
+class OutputManifest:
+    """One JSON line per saved session, newest last.
+
+    Each entry is appended with a single write under an exclusive lock and
+    fsynced, so concurrent sessions never interleave and a crash never
+    leaves a torn line. Readers walk the file backwards from its end, so
+    recent sessions are found without reading the whole manifest and
+    without listing or opening the output files.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+
+    def append(self, entry: Dict[str, Any]):
+        """Durably append one entry."""
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Yield entries newest first, reading the manifest from its end."""
+        for line in self._lines_reversed():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                yield entry
+
+    def recent(self, limit: int, opportunity_hash: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The newest entries, optionally only those for one opportunity."""
+        found = []
+        for entry in self.entries():
+            if opportunity_hash and not entry.get("opportunity_hash", "").startswith(opportunity_hash):
+                continue
+            found.append(entry)
+            if len(found) >= limit:
+                break
+        return found
+
+    def find(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The newest entry whose session ID equals or starts with session_id."""
+        for entry in self.entries():
+            if entry.get("session_id", "").startswith(session_id):
+                return entry
+        return None
+
+    def resolve(self, entry: Dict[str, Any], key: str = "path") -> str:
+        """Absolute path of an entry's file (paths are stored relative to the output directory)."""
+        return os.path.join(self.output_dir, entry[key])
+
+    def _lines_reversed(self) -> Iterator[bytes]:
+        """Yield the manifest's lines from last to first."""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+
+        with f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+            while position > 0:
+                step = min(READ_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                block = f.read(step) + remainder
+                lines = block.split(b"\n")
+                # The first piece may be the end of a line that starts in an earlier block
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line
+            if remainder.strip():
+                yield remainder
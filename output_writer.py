@@ -0,0 +1,232 @@
+"""
+Output Writer - Incremental, crash-safe markdown and JSONL session output
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+PARTIAL_SUFFIX = ".partial"
+
+
+def sidecar_path(markdown_path: str) -> str:
+    """Path of the JSONL sidecar written next to a markdown output file."""
+    return os.path.splitext(markdown_path)[0] + ".jsonl"
+
+
+def reserve_output_path(directory: str, stem: str) -> str:
+    """Claim a new markdown output path: stem.md, else stem_2.md, stem_3.md...
+
+    The path is claimed by creating it empty and exclusively, so saves in
+    the same second never share a name. finish() replaces the empty file.
+    """
+    number = 1
+    while True:
+        name = stem if number == 1 else f"{stem}_{number}"
+        path = os.path.join(directory, name + ".md")
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return path
+        except FileExistsError:
+            number += 1
+
+
+def read_idea(filepath: str, offset: int, length: int) -> Optional[str]:
+    """Read one idea's markdown section using its recorded offset."""
+    try:
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            return f.read(length).decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _fsync_dir(path: str):
+    """Persist a rename by syncing the containing directory, where supported."""
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class IdeaOutputWriter:
+    """Writes a session's markdown and JSONL sidecar in one incremental pass.
+
+    Both files are written as ".partial" files next to their final paths.
+    Every record is flushed and fsynced as soon as it is written, so after
+    a crash the partial files hold every idea written so far and nothing
+    torn. finish() adds the ranking summary and renames both files into
+    place. Each idea's byte offset and length in the markdown file are
+    recorded in the sidecar so a single idea can be read back directly.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.jsonl_path = sidecar_path(filepath)
+        self.idea_count = 0
+        self.offsets: List[Dict[str, Any]] = []
+        self._ranked: List[Dict[str, Any]] = []
+        self._md = None
+        self._jsonl = None
+
+    def open(
+        self,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        complete: bool = False
+    ) -> "IdeaOutputWriter":
+        """Create the partial files and write the session header.
+
+        complete records whether the ideas about to be written are every
+        idea the session generated, rather than a selection.
+        """
+        self._md = open(self.filepath + PARTIAL_SUFFIX, 'wb')
+        self._jsonl = open(self.jsonl_path + PARTIAL_SUFFIX, 'wb')
+
+        generated = datetime.now()
+        self._write_markdown(self._header(opportunity, context, criteria, generated))
+        self._write_record({
+            "type": "session",
+            "generated": generated.isoformat(timespec="seconds"),
+            "opportunity": opportunity,
+            "context": context,
+            "criteria": criteria,
+            "complete": complete
+        })
+        self._sync()
+        return self
+
+    def add_idea(self, idea: Dict[str, Any]):
+        """Append one idea to both files and make it durable."""
+        self.idea_count += 1
+        section = f"\n### Idea {self.idea_count}: {idea['title']}\n\n**Score:** {idea['score']}/100"
+        if idea.get('rank'):
+            section += f" | **Rank:** #{idea['rank']}"
+        section += f"\n\n{idea['content']}\n"
+
+        offset, length = self._write_markdown(section)
+        self.offsets.append({"offset": offset, "length": length})
+        self._write_record({
+            "type": "idea",
+            "index": self.idea_count,
+            **idea,
+            "offset": offset,
+            "length": length
+        })
+        self._sync()
+
+        if idea.get('rank'):
+            self._ranked.append(idea)
+
+    def finish(self) -> str:
+        """Write the ranking summary and footer, then move both files into place."""
+        ranked = sorted(self._ranked, key=lambda x: x['rank'])[:3]
+        parts = []
+        if ranked:
+            parts.append("\n---\n\n## Top 3 Force Ranked Ideas\n")
+            for idea in ranked:
+                parts.append(f"\n{idea['rank']}. **{idea['title']}** (Score: {idea['score']}/100)")
+            parts.append("\n")
+        parts.append("\n---\n\n*Generated by Ideation Agent*\n")
+
+        self._write_markdown("".join(parts))
+        self._write_record({
+            "type": "ranking",
+            "top_ranked": [{"rank": idea['rank'], "title": idea['title']} for idea in ranked],
+            "idea_count": self.idea_count
+        })
+        self._sync()
+        self._close()
+
+        os.replace(self.jsonl_path + PARTIAL_SUFFIX, self.jsonl_path)
+        os.replace(self.filepath + PARTIAL_SUFFIX, self.filepath)
+        _fsync_dir(self.filepath)
+        return self.filepath
+
+    def abort(self):
+        """Close the files, leaving the partial output for inspection."""
+        self._close()
+
+    def __enter__(self) -> "IdeaOutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+
+    def _header(
+        self,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        generated: datetime
+    ) -> str:
+        """Markdown for everything before the ideas."""
+        parts = [
+            "# Ideation Session Output",
+            f"\n*Generated: {generated.strftime('%Y-%m-%d %H:%M:%S')}*",
+            "\n---\n",
+            "## Opportunity",
+            f"\n**Problem/Desire:** {opportunity.get('description', 'N/A')}",
+        ]
+
+        if opportunity.get('who'):
+            parts.append(f"\n**Who:** {opportunity['who']}")
+        if opportunity.get('context'):
+            parts.append(f"\n**Context:** {opportunity['context']}")
+
+        parts.append("\n---\n")
+        parts.append("## Context")
+
+        if context.get('icp'):
+            parts.append(f"\n### Target Audience\n{context['icp']}")
+        if context.get('primary_metric'):
+            parts.append(f"\n### Primary Metric\n{context['primary_metric']}")
+
+        parts.append("\n---\n")
+        parts.append("## Evaluation Criteria\n")
+
+        sorted_criteria = sorted(
+            criteria['weights'].items(),
+            key=lambda x: x[1],
+            reverse=True
+        )
+        for criterion, weight in sorted_criteria:
+            parts.append(f"- {criterion}: {weight}/5")
+
+        parts.append("\n---\n")
+        parts.append("## Generated Ideas\n")
+        return "\n".join(parts)
+
+    def _write_markdown(self, text: str) -> Tuple[int, int]:
+        """Append text to the markdown file. Returns its byte offset and length."""
+        data = text.encode("utf-8")
+        offset = self._md.tell()
+        self._md.write(data)
+        return offset, len(data)
+
+    def _write_record(self, record: Dict[str, Any]):
+        """Append one JSON line to the sidecar."""
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        self._jsonl.write(line.encode("utf-8"))
+
+    def _sync(self):
+        """Flush both files through to disk."""
+        for f in (self._md, self._jsonl):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _close(self):
+        """Close whichever files are still open."""
+        for f in (self._md, self._jsonl):
+            if f is not None and not f.closed:
+                f.close()
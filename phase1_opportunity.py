@@ -5,6 +5,7 @@ Guides user through understanding the opportunity they want to solve
 
 from typing import Dict, Any
 from input_helpers import get_user_input, confirm
+from terminal_render import OutputBuffer
 
 
 class OpportunityDiscovery:
@@ -71,22 +72,25 @@ class OpportunityDiscovery:
 
     def _display_summary(self):
         """Display a formatted summary of the opportunity."""
-        print(f"\nOpportunity: {self.opportunity['description']}")
+        out = OutputBuffer()
+        out.line(f"\nOpportunity: {self.opportunity['description']}")
 
         if self.opportunity.get("who"):
-            print(f"\nWho: {self.opportunity['who']}")
+            out.line(f"\nWho: {self.opportunity['who']}")
 
         if self.opportunity.get("context"):
-            print(f"\nContext: {self.opportunity['context']}")
+            out.line(f"\nContext: {self.opportunity['context']}")
 
         if self.opportunity.get("frequency"):
-            print(f"\nFrequency: {self.opportunity['frequency']}")
+            out.line(f"\nFrequency: {self.opportunity['frequency']}")
 
         if self.opportunity.get("impact"):
-            print(f"\nImpact: {self.opportunity['impact']}")
+            out.line(f"\nImpact: {self.opportunity['impact']}")
 
         if self.opportunity.get("current_solutions"):
-            print(f"\nCurrent Solutions: {self.opportunity['current_solutions']}")
+            out.line(f"\nCurrent Solutions: {self.opportunity['current_solutions']}")
 
         if self.opportunity.get("additional_notes"):
-            print(f"\nAdditional Notes: {self.opportunity['additional_notes']}")
+            out.line(f"\nAdditional Notes: {self.opportunity['additional_notes']}")
+
+        out.flush()
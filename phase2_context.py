@@ -5,6 +5,7 @@ Collects product and business context from the user
 
 from typing import Dict, Any
 from input_helpers import get_input_with_file_option
+from terminal_render import OutputBuffer
 
 
 class ContextGathering:
@@ -70,30 +71,33 @@ class ContextGathering:
 
     def _display_summary(self):
         """Display a summary of gathered context."""
-        print("\n" + "-" * 60)
-        print("CONTEXT SUMMARY")
-        print("-" * 60)
+        out = OutputBuffer()
+        out.line("\n" + "-" * 60)
+        out.line("CONTEXT SUMMARY")
+        out.line("-" * 60)
 
         items_provided = 0
 
         if self.context.get("icp"):
             items_provided += 1
-            print(f"\n✓ ICP/Target Audience: Provided ({len(self.context['icp'])} chars)")
+            out.line(f"\n✓ ICP/Target Audience: Provided ({len(self.context['icp'])} chars)")
 
         if self.context.get("vision"):
             items_provided += 1
-            print(f"✓ Product Vision: Provided ({len(self.context['vision'])} chars)")
+            out.line(f"✓ Product Vision: Provided ({len(self.context['vision'])} chars)")
 
         if self.context.get("product_description"):
             items_provided += 1
-            print(f"✓ Product Description: Provided ({len(self.context['product_description'])} chars)")
+            out.line(f"✓ Product Description: Provided ({len(self.context['product_description'])} chars)")
 
         if self.context.get("primary_metric"):
             items_provided += 1
-            print(f"✓ Primary Metric: Provided ({len(self.context['primary_metric'])} chars)")
+            out.line(f"✓ Primary Metric: Provided ({len(self.context['primary_metric'])} chars)")
 
         if self.context.get("constraints"):
             items_provided += 1
-            print(f"✓ Constraints: Provided ({len(self.context['constraints'])} chars)")
+            out.line(f"✓ Constraints: Provided ({len(self.context['constraints'])} chars)")
+
+        out.line(f"\nTotal context items provided: {items_provided}/5")
 
-        print(f"\nTotal context items provided: {items_provided}/5")
+        out.flush()
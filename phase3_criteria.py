@@ -6,6 +6,7 @@ Define and weight criteria for evaluating ideas
 from typing import Dict, Any, List
 from config import Config
 from input_helpers import get_user_input, confirm, get_rating
+from terminal_render import OutputBuffer
 
 
 class CriteriaSetup:
@@ -81,13 +82,14 @@ class CriteriaSetup:
 
     def _display_summary(self):
         """Display a summary of criteria and weights."""
-        print("\n" + "-" * 60)
-        print("EVALUATION CRITERIA SUMMARY")
-        print("-" * 60 + "\n")
+        out = OutputBuffer()
+        out.line("\n" + "-" * 60)
+        out.line("EVALUATION CRITERIA SUMMARY")
+        out.line("-" * 60 + "\n")
 
         max_weight = max(self.criteria["weights"].values())
 
-        print("Criteria (sorted by importance):\n")
+        out.line("Criteria (sorted by importance):\n")
         sorted_criteria = sorted(
             self.criteria["weights"].items(),
             key=lambda x: x[1],
@@ -97,5 +99,7 @@ class CriteriaSetup:
         for criterion, weight in sorted_criteria:
             bars = "█" * weight + "░" * (5 - weight)
             star = " ⭐" if weight == max_weight else ""
-            print(f"  {criterion}")
-            print(f"    {bars} {weight}/5{star}\n")
+            out.line(f"  {criterion}")
+            out.line(f"    {bars} {weight}/5{star}\n")
+
+        out.flush()
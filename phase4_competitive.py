@@ -5,6 +5,7 @@ Gather insights from competitors or alternative solutions
 
 from typing import List, Dict, Any
 from input_helpers import get_user_input, confirm
+from terminal_render import OutputBuffer
 
 
 class CompetitiveAnalysis:
@@ -74,15 +75,18 @@ class CompetitiveAnalysis:
 
     def _display_summary(self):
         """Display a summary of competitive insights."""
-        print("\n" + "-" * 60)
-        print("COMPETITIVE INSIGHTS SUMMARY")
-        print("-" * 60 + "\n")
+        out = OutputBuffer()
+        out.line("\n" + "-" * 60)
+        out.line("COMPETITIVE INSIGHTS SUMMARY")
+        out.line("-" * 60 + "\n")
 
         for i, insight in enumerate(self.insights, 1):
-            print(f"{i}. {insight['url']}")
+            out.line(f"{i}. {insight['url']}")
             if insight['notes']:
                 # Show first 100 chars of notes
                 preview = insight['notes'][:100]
                 if len(insight['notes']) > 100:
                     preview += "..."
-                print(f"   Notes: {preview}\n")
+                out.line(f"   Notes: {preview}\n")
+
+        out.flush()
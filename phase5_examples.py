@@ -5,6 +5,7 @@ Collect seed ideas from the user to understand their expectations
 
 from typing import List, Dict, Any
 from input_helpers import get_user_input
+from terminal_render import OutputBuffer
 
 
 class ExampleCollection:
@@ -69,22 +70,25 @@ class ExampleCollection:
 
     def _display_summary(self):
         """Display a summary of collected examples."""
-        print("\n" + "-" * 60)
-        print("EXAMPLE IDEAS SUMMARY")
-        print("-" * 60 + "\n")
-
-        print(f"✓ Collected {len(self.examples)} example ideas")
-        print(f"\nPattern Analysis:")
-        print(f"  • Average length: {self.pattern_analysis['avg_length']} characters")
-        print(f"  • Average words: {self.pattern_analysis['avg_word_count']} words")
-        print(f"  • Detail level: {self.pattern_analysis['detail_level']}")
-
-        print("\nExample ideas preview:")
+        out = OutputBuffer()
+        out.line("\n" + "-" * 60)
+        out.line("EXAMPLE IDEAS SUMMARY")
+        out.line("-" * 60 + "\n")
+
+        out.line(f"✓ Collected {len(self.examples)} example ideas")
+        out.line(f"\nPattern Analysis:")
+        out.line(f"  • Average length: {self.pattern_analysis['avg_length']} characters")
+        out.line(f"  • Average words: {self.pattern_analysis['avg_word_count']} words")
+        out.line(f"  • Detail level: {self.pattern_analysis['detail_level']}")
+
+        out.line("\nExample ideas preview:")
         for i, example in enumerate(self.examples, 1):
             preview = example["description"][:80]
             if len(example["description"]) > 80:
                 preview += "..."
-            print(f"  {i}. {preview}")
+            out.line(f"  {i}. {preview}")
+
+        out.flush()
 
     def get_pattern_analysis(self) -> Dict[str, Any]:
         """Get the pattern analysis results."""
@@ -4,8 +4,101 @@ Use AI to generate innovative solution ideas
 """
 
 import json
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from config import Config
+from client_pool import get_client
+import single_flight
+import tracing
+from idea_stream import StreamingIdeaCollector, count_idea_sections, iter_idea_sections
+from idea_model import Idea
+from synthetic_provider import SyntheticProvider
+from budget_controller import CHARS_PER_TOKEN, BudgetController, estimate_tokens, thinking_params
+from spend_ledger import BudgetExceededError, SpendLedger, model_name
+from idea_expansion import IdeaExpander, OUTLINE_INSTRUCTIONS
+from idea_judge import IdeaJudge
+from diversity import select_diverse_slate
+from regeneration import IncrementalRegeneration, input_fingerprint
+from structured_output import (
+    IDEAS_TOOL_NAME,
+    build_ideas_schema,
+    build_ideas_tool,
+    build_repair_message,
+    ideas_from_payload,
+    merge_repaired_items,
+    parse_json_payload,
+    structured_instructions,
+    validate_ideas_payload,
+)
+
+
+MARKDOWN_INSTRUCTIONS = """
+Generate 7-10 innovative solution ideas. For each idea, provide:
+
+1. **Title**: A clear, compelling title (5-10 words)
+2. **Description**: A detailed explanation of the solution (2-4 paragraphs)
+3. **How it addresses the opportunity**: Specific connection to the problem/desire
+4. **Expected impact**: How it drives the primary metric
+5. **Implementation considerations**: Key aspects to consider
+
+Format each idea as follows:
+
+---
+### IDEA [NUMBER]: [TITLE]
+
+**Description:**
+[Detailed description]
+
+**How it addresses the opportunity:**
+[Explanation]
+
+**Expected impact:**
+[Impact analysis]
+
+**Implementation considerations:**
+[Key considerations]
+
+---
+
+After all ideas, provide:
+
+## TOP 3 FORCE RANKED IDEAS
+
+Rank the top 3 ideas and explain your reasoning based on the evaluation criteria.
+
+1. **[Idea Title]** - [Reasoning]
+2. **[Idea Title]** - [Reasoning]
+3. **[Idea Title]** - [Reasoning]
+"""
+
+
+# Upper end of the "7-10 ideas" the prompt asks for
+IDEAS_REQUESTED = 10
+
+# Focus hints that push independent samples toward different themes
+SAMPLE_FOCUSES = [
+    "Favour practical ideas that could ship within a quarter.",
+    "Favour bold, unconventional ideas.",
+    "Favour ideas that change user behaviour or habits.",
+    "Favour ideas built on data, automation or AI.",
+    "Favour ideas that use partnerships, community or the wider ecosystem.",
+]
+
+EARLY_STOP_HINT = """
+Present your strongest ideas first.
+"""
+
+BUDGET_HINT = """
+Generate only {count} ideas.
+"""
+
+PROMPT_INTRO = (
+    "You are an expert product strategist and innovation consultant. "
+    "Your task is to generate 7-10 innovative solution ideas for a specific customer opportunity."
+)
 
 
 class IdeaGeneration:
@@ -14,6 +107,29 @@ class IdeaGeneration:
     def __init__(self, config: Config, use_mock: bool = False):
         self.config = config
         self.use_mock = use_mock
+        self.budget = BudgetController(config)
+        # Set when ideas are generated as outlines (lazy expansion mode)
+        self.expander: Optional[IdeaExpander] = None
+        # Prompt and raw markdown of the last plain generation call, reused
+        # as the cached conversation prefix by refinement rounds
+        self.last_prompt: Optional[str] = None
+        self.last_response_text: Optional[str] = None
+        # Tokens used by every call this generator made, for analytics
+        self.usage: Dict[str, int] = {"input_tokens": 0, "output_tokens": 0, "calls": 0}
+        self._usage_lock = threading.Lock()
+        # Cost accounting and spend budgets for this session's calls
+        self.ledger = SpendLedger(config)
+        # Set for queued opportunities that share all their other inputs:
+        # prompts then start with this prefix, which the provider can cache
+        self.shared_prefix: Optional[str] = None
+        # Set to ask for a specific number of ideas (incremental replacements)
+        self.idea_count: Optional[int] = None
+        # Hash of each input section of the last execute(), saved with the ideas
+        self.fingerprint: Optional[Dict[str, str]] = None
+        # Stands in for the model when IDEATION_PROVIDER=synthetic
+        self.synthetic: Optional[SyntheticProvider] = None
+        if config.get_model_provider() == "synthetic":
+            self.synthetic = SyntheticProvider.from_config(config)
 
     def execute(
         self,
@@ -25,36 +141,62 @@ class IdeaGeneration:
     ) -> List[Dict[str, Any]]:
         """Execute the idea generation phase."""
 
-        print(f"DEBUG: use_mock = {self.use_mock}")
-        print(f"DEBUG: provider = {self.config.get_model_provider()}")
+        self.fingerprint = input_fingerprint(opportunity, context, criteria, competitive_insights, example_ideas)
 
         if self.use_mock:
-            print("DEBUG: Using mock mode (use_mock=True)")
             return self._generate_mock_ideas(opportunity, criteria)
 
+        if self.config.incremental:
+            try:
+                ideas = IncrementalRegeneration(self).execute(
+                    self.fingerprint, opportunity, context, criteria, competitive_insights, example_ideas
+                )
+                if ideas is not None:
+                    return ideas
+            except Exception as e:
+                print(f"  Incremental regeneration skipped: {type(e).__name__}: {str(e)}")
+
         # Use real AI generation
         print("Generating ideas using AI...")
         print("This may take a moment...\n")
 
         try:
             provider = self.config.get_model_provider()
-            print(f"DEBUG: Attempting to use provider: {provider}")
 
-            if provider == "anthropic":
-                print("DEBUG: Calling _generate_with_anthropic()")
-                return self._generate_with_anthropic(
+            if provider == "synthetic":
+                ideas = self._generate_with_synthetic(
+                    opportunity, context, criteria, competitive_insights, example_ideas
+                )
+            elif provider in ("anthropic", "openai") and self.config.lazy_expansion:
+                ideas = self._generate_outlines(
+                    provider, opportunity, context, criteria, competitive_insights, example_ideas
+                )
+            elif provider in ("anthropic", "openai") and self.config.output_mode == "structured":
+                ideas = self._generate_structured(
+                    provider, opportunity, context, criteria, competitive_insights, example_ideas
+                )
+            elif provider in ("anthropic", "openai") and self.config.best_of_n > 1:
+                ideas = self._generate_best_of_n(
+                    provider, opportunity, context, criteria, competitive_insights, example_ideas
+                )
+            elif provider == "anthropic":
+                ideas = self._generate_with_anthropic(
                     opportunity, context, criteria, competitive_insights, example_ideas
                 )
             elif provider == "openai":
-                print("DEBUG: Calling _generate_with_openai()")
-                return self._generate_with_openai(
+                ideas = self._generate_with_openai(
                     opportunity, context, criteria, competitive_insights, example_ideas
                 )
             else:
-                print(f"DEBUG: Provider is '{provider}' - using mock generation")
                 print("No API key configured. Using mock generation.")
                 return self._generate_mock_ideas(opportunity, criteria)
 
+            return self._judge_ideas(ideas, criteria)
+
+        except BudgetExceededError as e:
+            print(f"✗ Spend budget reached: {str(e)}")
+            print("Falling back to mock generation (no API calls)...\n")
+            return self._generate_mock_ideas(opportunity, criteria)
         except Exception as e:
             print(f"ERROR during AI generation: {type(e).__name__}: {str(e)}")
             import traceback
@@ -62,6 +204,11 @@ class IdeaGeneration:
             print("Falling back to mock generation...\n")
             return self._generate_mock_ideas(opportunity, criteria)
 
+    def close(self):
+        """Stop background work that outlives execute(): the expander's worker pool."""
+        if self.expander is not None:
+            self.expander.shutdown()
+
     def _generate_with_anthropic(
         self,
         opportunity: Dict[str, Any],
@@ -71,54 +218,210 @@ class IdeaGeneration:
         example_ideas: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Generate ideas using Anthropic's Claude API."""
-        from anthropic import Anthropic
-
         print(f"  Using model: {self.config.model}")
         print(f"  API key configured: {'Yes' if self.config.anthropic_api_key else 'No'}")
 
-        client = Anthropic(api_key=self.config.anthropic_api_key)
-
         # Build the prompt
         prompt = self._build_generation_prompt(
             opportunity, context, criteria, competitive_insights, example_ideas
         )
         print(f"  Prompt length: {len(prompt)} characters")
+        self.last_prompt = prompt
+
+        if self.config.target_ideas > 0:
+            return self._generate_streaming("anthropic", prompt, criteria)
+
+        # Identical concurrent requests share a single API call
+        sent_prompt, plan = self._plan_request(prompt)
+        response_text, shared = single_flight.do(
+            self._flight_key("anthropic", sent_prompt, plan["max_tokens"], plan["thinking_budget"]),
+            lambda: self._call_anthropic(sent_prompt, plan)
+        )
+        if shared:
+            print("  (Joined an identical request already in flight)")
+
+        print(f"  Response length: {len(response_text)} characters")
+        self.last_response_text = response_text
+
+        ideas = self._parse_ideas_from_response(response_text, criteria)
+
+        print(f"✓ Generated {len(ideas)} ideas\n")
+        return ideas
+
+    def _call_anthropic(self, prompt: str, plan: Optional[Dict[str, int]] = None) -> str:
+        """Send a prompt to Claude and return the response text.
+
+        plan is the request's budget plan when the caller already sized it.
+        """
+        client = get_client(self.config, "anthropic")
 
         # Call API with extended thinking for better quality
+        params, plan = self._anthropic_request_params(prompt, plan)
+        self._announce_plan(plan)
+        start = time.monotonic()
+        with self._reserve(plan), \
+                tracing.span("llm.call", provider="anthropic", model=self.config.model,
+                             max_tokens=plan["max_tokens"], prompt_chars=len(prompt)) as call_span:
+            message = client.messages.create(**params)
+
+            # Parse response - handle both thinking and text content blocks
+            response_text = ""
+            for block in message.content:
+                if block.type == "text":
+                    response_text += block.text
+
+            self.budget.record(
+                plan, message.usage, message.stop_reason, time.monotonic() - start, response_text,
+                ideas_parsed=count_idea_sections(response_text)
+            )
+            self._track_usage(message.usage)
+            call_span.set_attribute("response_chars", len(response_text))
+
+        return response_text
+
+    def _anthropic_request_params(
+        self,
+        prompt: str,
+        plan: Optional[Dict[str, int]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """Build the Messages API parameters for a generation prompt.
+
+        Returns the parameters and the budget plan they were sized from.
+        A plan passed in is used as is, with prompt already carrying its hint.
+        """
         # Note: When using thinking:
         #   - temperature MUST be 1.0 (API enforced, despite docs)
         #   - max_tokens must be > thinking.budget_tokens
-        # Recommended: 16k+ thinking budget for complex tasks
-        print("  (Using extended thinking for higher quality ideas...)")
-        thinking_budget = 10000  # 10k tokens for thorough analysis
-        message = client.messages.create(
-            model=self.config.model,
-            max_tokens=self.config.max_tokens,  # 20000 > 10000
-            temperature=1.0,  # REQUIRED by API when thinking is enabled
-            thinking={
-                "type": "enabled",
-                "budget_tokens": thinking_budget
-            },
-            messages=[{
+        if plan is None:
+            prompt, plan = self._plan_request(prompt)
+        params = {
+            "model": self.config.model,
+            "max_tokens": plan["max_tokens"],
+            **thinking_params(plan, self.config.temperature),
+            "messages": [{
                 "role": "user",
-                "content": prompt
+                "content": self._prompt_content(prompt)
             }]
+        }
+        return params, plan
+
+    def _announce_plan(self, plan: Dict[str, int]):
+        """Print how a generation request was sized."""
+        if plan["thinking_budget"]:
+            print(
+                f"  (Using extended thinking: {plan['thinking_budget']} token budget, "
+                f"max {plan['max_tokens']} tokens)"
+            )
+        else:
+            print(f"  (Output cap too small for extended thinking: max {plan['max_tokens']} tokens)")
+
+    def _prompt_content(self, prompt: str) -> Any:
+        """Message content for a prompt, with the shared prefix marked as a cache breakpoint."""
+        if not self.shared_prefix or not prompt.startswith(self.shared_prefix):
+            return prompt
+        return [
+            {"type": "text", "text": self.shared_prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt[len(self.shared_prefix):]},
+        ]
+
+    def _plan_request(self, prompt: str) -> Tuple[str, Dict[str, int]]:
+        """Size a generation request and return the prompt to send with its plan.
+
+        The budget controller sizes the request from the prompt, the number
+        of ideas requested and the latency SLO; the spend budgets may then
+        cut it down, in which case the prompt asks for fewer ideas.
+        """
+        plan = self._fit_to_budget(self.budget.plan(prompt, self._requested_idea_count()))
+        if plan.get("degraded"):
+            prompt = prompt + BUDGET_HINT.format(count=plan["idea_count"])
+        return prompt, plan
+
+    def _flight_key(
+        self,
+        provider: str,
+        prompt: str,
+        max_tokens: Optional[int],
+        thinking_budget: int = 0,
+        **params: Any
+    ) -> str:
+        """Single-flight key for a request, from the parameters it is sent with."""
+        if provider == "anthropic":
+            model = self.config.model
+            # Thinking pins the temperature at 1.0
+            temperature = 1.0 if thinking_budget else self.config.temperature
+        elif provider == "openai":
+            model, temperature = self.config.openai_model, None
+        else:
+            model, temperature = None, None
+        return single_flight.request_key(
+            provider, model, prompt, max_tokens, thinking_budget, temperature, **params
         )
 
-        # Parse response - handle both thinking and text content blocks
-        response_text = ""
-        for block in message.content:
-            if block.type == "text":
-                response_text += block.text
+    def _fit_to_budget(self, plan: Dict[str, int]) -> Dict[str, int]:
+        """Cut a generation plan down to what the spend budgets allow."""
+        fitted = self.ledger.fit(plan, model_name(self.config))
+        if fitted.get("degraded"):
+            print(
+                f"  (Spend budget: thinking cut to {fitted['thinking_budget']} tokens, "
+                f"{fitted['idea_count']} ideas, max {fitted['max_tokens']} tokens)"
+            )
+        return fitted
+
+    def _reserve(self, plan: Dict[str, int]) -> Any:
+        """Hold a planned call's worst-case cost against the spend budgets."""
+        cost = self.ledger.estimate(model_name(self.config), plan["prompt_tokens"], plan["max_tokens"])
+        return self.ledger.reserve(cost, plan["prompt_tokens"])
+
+    def _reserve_prompt(self, prompt: str, max_output_tokens: int) -> Any:
+        """Hold the worst-case cost of a prompt with an output cap."""
+        return self._reserve({"prompt_tokens": estimate_tokens(prompt), "max_tokens": max_output_tokens})
+
+    def _requested_idea_count(self) -> int:
+        """Number of ideas the output budget has to cover."""
+        if self.idea_count is not None:
+            return self.idea_count
+        if self.config.target_ideas > 0:
+            # A little headroom for ideas rejected by the quality gate
+            return min(self.config.target_ideas + 2, IDEAS_REQUESTED)
+        return IDEAS_REQUESTED
 
-        print(f"  Response length: {len(response_text)} characters")
+    def _generate_with_openai(
+        self,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Generate ideas using OpenAI's API."""
+        # Build the prompt
+        prompt = self._build_generation_prompt(
+            opportunity, context, criteria, competitive_insights, example_ideas
+        )
+
+        self.last_prompt = prompt
+
+        if self.config.target_ideas > 0:
+            return self._generate_streaming("openai", prompt, criteria)
 
+        # Identical concurrent requests share a single API call
+        sent_prompt, plan = self._plan_request(prompt)
+        response_text, shared = single_flight.do(
+            self._flight_key("openai", sent_prompt, plan["max_tokens"]),
+            lambda: self._call_openai(sent_prompt, plan=plan)
+        )
+        if shared:
+            print("  (Joined an identical request already in flight)")
+
+        self.last_response_text = response_text
+
+        # Parse response
         ideas = self._parse_ideas_from_response(response_text, criteria)
 
         print(f"✓ Generated {len(ideas)} ideas\n")
         return ideas
 
-    def _generate_with_openai(
+    def _generate_with_synthetic(
         self,
         opportunity: Dict[str, Any],
         context: Dict[str, Any],
@@ -126,32 +429,555 @@ class IdeaGeneration:
         competitive_insights: List[Dict[str, Any]],
         example_ideas: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Generate ideas using OpenAI's API."""
-        from openai import OpenAI
+        """Generate ideas with the synthetic provider (load testing, no API calls)."""
+        print(f"  Using synthetic provider: {self.synthetic.idea_count} ideas per response")
 
-        client = OpenAI(api_key=self.config.openai_api_key)
-
-        # Build the prompt
         prompt = self._build_generation_prompt(
             opportunity, context, criteria, competitive_insights, example_ideas
         )
+        self.last_prompt = prompt
+
+        if self.config.target_ideas > 0:
+            return self._generate_streaming("synthetic", prompt, criteria)
+
+        response_text = self._call_synthetic(prompt)
+        print(f"  Response length: {len(response_text)} characters")
+        self.last_response_text = response_text
+
+        ideas = self._parse_ideas_from_response(response_text, criteria)
+
+        print(f"✓ Generated {len(ideas)} ideas\n")
+        return ideas
+
+    def _call_synthetic(self, prompt: str, purpose: str = "generation") -> str:
+        """Get a synthetic response for a prompt."""
+        with tracing.span("llm.call", provider="synthetic", prompt_chars=len(prompt)) as call_span:
+            response_text = self.synthetic.complete(prompt)
+            self._track_usage(self.synthetic.usage(prompt, response_text), purpose)
+            call_span.set_attribute("response_chars", len(response_text))
+        return response_text
+
+    def _call_openai(
+        self,
+        prompt: str,
+        seed: Optional[int] = None,
+        plan: Optional[Dict[str, int]] = None
+    ) -> str:
+        """Send a prompt to OpenAI and return the response text.
+
+        plan is the request's budget plan when the caller already sized it.
+        """
+        client = get_client(self.config, "openai")
+
+        extra_params = {"seed": seed} if seed is not None else {}
+
+        # Output is capped at the plan, so spend never exceeds the reservation
+        if plan is None:
+            prompt, plan = self._plan_request(prompt)
+        extra_params["max_completion_tokens"] = plan["max_tokens"]
 
         # Call API
-        response = client.chat.completions.create(
-            model="gpt-5.2",
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
+        with self._reserve(plan), \
+                tracing.span("llm.call", provider="openai", model=self.config.openai_model,
+                             prompt_chars=len(prompt)) as call_span:
+            response = client.chat.completions.create(
+                model=self.config.openai_model,
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }],
+                **extra_params
+            )
+            self._track_usage(response.usage)
+            call_span.set_attribute("response_chars", len(response.choices[0].message.content or ""))
+
+        return response.choices[0].message.content
+
+    def _track_usage(self, usage: Any, purpose: str = "generation", estimated: bool = False):
+        """Add a response's token usage to the running totals and the spend ledger (either provider)."""
+        if usage is None:
+            return
+        self.ledger.record(
+            usage, model_name(self.config), self.config.get_model_provider(), purpose, estimated=estimated
         )
+        input_tokens = getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", None) or getattr(usage, "completion_tokens", 0) or 0
+        with self._usage_lock:
+            self.usage["input_tokens"] += input_tokens
+            self.usage["output_tokens"] += output_tokens
+            self.usage["calls"] += 1
+
+        call_span = tracing.current_span()
+        call_span.set_attribute("input_tokens", input_tokens)
+        call_span.set_attribute("output_tokens", output_tokens)
+
+    def _judge_ideas(self, ideas: List[Dict[str, Any]], criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Score ideas against the user's criteria with the LLM judge."""
+        # Synthetic ideas have no model to judge them and keep heuristic scores
+        if not self.config.judge_ideas or self.synthetic is not None:
+            return ideas
+
+        # Structured output already carries per-criterion scores from the model
+        unjudged = [idea for idea in ideas if not idea.get("sub_scores")]
+        if not unjudged:
+            return ideas
+
+        with tracing.span("ideas.judge", ideas=len(unjudged)):
+            try:
+                IdeaJudge(self, criteria).score(unjudged)
+            except Exception as e:
+                print(f"  Judging skipped: {type(e).__name__}: {str(e)}")
+
+        return ideas
+
+    def _generate_best_of_n(
+        self,
+        provider: str,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Draw N samples in parallel and pick a high-scoring, diverse slate."""
+        n = self.config.best_of_n
+        base_prompt = self._build_generation_prompt(
+            opportunity, context, criteria, competitive_insights, example_ideas
+        )
+        print(f"  Drawing {n} independent samples in parallel...")
+
+        def sample(index: int) -> List[Dict[str, Any]]:
+            # Thinking pins Claude's temperature at 1.0, so samples are
+            # varied through a focus hint (and a seed for OpenAI)
+            prompt = base_prompt + f"\n## SAMPLE FOCUS\n{SAMPLE_FOCUSES[index % len(SAMPLE_FOCUSES)]}\n"
+            if provider == "anthropic":
+                response_text = self._call_anthropic(prompt)
+            else:
+                response_text = self._call_openai(prompt, seed=index)
+            return self._parse_ideas_from_response(response_text, criteria)
+
+        pool: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            futures = [executor.submit(tracing.wrap(sample), index) for index in range(n)]
+            for future in futures:
+                try:
+                    pool.extend(future.result())
+                except Exception as e:
+                    print(f"  ✗ Sample failed: {type(e).__name__}: {str(e)}")
+
+        if not pool:
+            raise RuntimeError("All samples failed")
+
+        # Per-sample rankings are meaningless across the pooled candidates
+        for idea in pool:
+            idea["rank"] = None
+        self._judge_ideas(pool, criteria)
+
+        start = time.perf_counter()
+        slate = select_diverse_slate(pool, self.config.slate_size, self.config.mmr_relevance_weight)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        themes = len({idea.get("cluster") for idea in slate})
+        print(f"  Selected {len(slate)} of {len(pool)} candidates across {themes} themes ({elapsed_ms:.0f} ms)")
+
+        self._apply_score_ranking(slate)
+        print(f"✓ Generated {len(slate)} ideas\n")
+        return slate
+
+    def _generate_outlines(
+        self,
+        provider: str,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Generate short outlines for many ideas; full write-ups come later.
+
+        The top-ranked outlines start expanding in the background right away;
+        any other idea is expanded only if the user selects it in phase 7.
+        """
+        context_prompt = "\n".join(self._build_context_parts(
+            opportunity, context, criteria, competitive_insights, example_ideas
+        ))
+        count = self.config.outline_count
+        prompt = context_prompt + "\n\n## INSTRUCTIONS" + OUTLINE_INSTRUCTIONS.format(count=count)
+        print(f"  Generating {count} idea outlines (full write-ups on demand)...")
+
+        max_tokens = count * 150 + 500
+        response_text, shared = single_flight.do(
+            self._flight_key(provider, prompt, max_tokens),
+            lambda: self._complete_text(prompt, max_tokens, "outline")
+        )
+        if shared:
+            print("  (Joined an identical request already in flight)")
 
-        # Parse response
-        response_text = response.choices[0].message.content
         ideas = self._parse_ideas_from_response(response_text, criteria)
+        for idea in ideas:
+            idea["outline"] = self._outline_text(idea["content"])
+            idea["content"] = f"**Outline:**\n{idea['outline']}"
+            idea["expanded"] = False
+
+        self.close()
+        self.expander = IdeaExpander(self, context_prompt, criteria)
+        top_ideas = sorted(ideas, key=lambda idea: (idea["rank"] or IDEAS_REQUESTED, -idea["score"]))
+        self.expander.prefetch(top_ideas[:self.config.expand_top_k])
+
+        print(f"✓ Generated {len(ideas)} idea outlines\n")
+        return ideas
+
+    def _outline_text(self, content: str) -> str:
+        """Extract the outline sentence(s) from a parsed outline idea."""
+        text = content.split("**Outline:**", 1)[-1]
+        text = text.split("\n---", 1)[0]
+        return text.strip()
+
+    def _complete_text(self, prompt: str, max_tokens: int, purpose: str = "auxiliary") -> str:
+        """Plain completion without extended thinking, for small auxiliary calls."""
+        provider = self.config.get_model_provider()
+        client = get_client(self.config, provider)
+
+        with self._reserve_prompt(prompt, max_tokens), \
+                tracing.span("llm.call", provider=provider, purpose=purpose, max_tokens=max_tokens,
+                             prompt_chars=len(prompt)) as call_span:
+            if provider == "anthropic":
+                message = client.messages.create(
+                    model=self.config.model,
+                    max_tokens=max_tokens,
+                    temperature=self.config.temperature,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                )
+                self._track_usage(message.usage, purpose)
+                text = "".join(block.text for block in message.content if block.type == "text")
+            else:
+                response = client.chat.completions.create(
+                    model=self.config.openai_model,
+                    max_completion_tokens=max_tokens,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                )
+                self._track_usage(response.usage, purpose)
+                text = response.choices[0].message.content or ""
+            call_span.set_attribute("response_chars", len(text))
+        return text
+
+    def _generate_streaming(
+        self,
+        provider: str,
+        prompt: str,
+        criteria: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Stream generation and cancel it once enough quality ideas are in."""
+        target = self.config.target_ideas
+        min_score = self.config.min_idea_score
+        stream = {
+            "anthropic": self._stream_anthropic,
+            "openai": self._stream_openai,
+            "synthetic": self._stream_synthetic,
+        }[provider]
+        prompt = prompt + EARLY_STOP_HINT
+        plan: Optional[Dict[str, int]] = None
+        if provider != "synthetic":
+            prompt, plan = self._plan_request(prompt)
+
+        print(f"  (Streaming - will stop after {target} accepted ideas)")
+
+        def run():
+            collector = StreamingIdeaCollector(
+                lambda section: self._parse_idea_section(section, criteria),
+                target,
+                min_score
+            )
+            stopped_early = stream(prompt, collector, plan)
+            accepted = collector.finish(stopped_early)
+            return accepted, collector.ranking_text, stopped_early, collector.rejected
+
+        (accepted, ranking_text, stopped_early, rejected), shared = single_flight.do(
+            self._flight_key(
+                provider, prompt,
+                plan["max_tokens"] if plan else None,
+                plan["thinking_budget"] if plan and provider == "anthropic" else 0,
+                stream=True, target=target, min_score=min_score
+            ),
+            run
+        )
+        if shared:
+            print("  (Joined an identical request already in flight)")
+
+        # Copy so callers sharing a result never share idea dictionaries
+        ideas = [idea.copy() for idea in accepted]
+
+        if ranking_text:
+            self._apply_force_ranking(ideas, ranking_text)
+        else:
+            self._apply_score_ranking(ideas)
+
+        if stopped_early:
+            print(f"  Target reached - generation stopped early ({rejected} idea(s) rejected)")
+        print(f"✓ Generated {len(ideas)} ideas\n")
+        return ideas
+
+    def _stream_anthropic(
+        self,
+        prompt: str,
+        collector: StreamingIdeaCollector,
+        plan: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """Stream a Claude response into the collector. Returns True if stopped early."""
+        client = get_client(self.config, "anthropic")
+
+        params, plan = self._anthropic_request_params(prompt, plan)
+        self._announce_plan(plan)
+        start = time.monotonic()
+        received = 0
+        with self._reserve(plan), \
+                tracing.span("llm.stream", provider="anthropic", model=self.config.model,
+                             max_tokens=plan["max_tokens"], prompt_chars=len(prompt)) as stream_span:
+            with client.messages.stream(**params) as stream:
+                for text in stream.text_stream:
+                    stream_span.add_event("chunk", chars=len(text))
+                    received += len(text)
+                    if collector.feed(text):
+                        # Leaving the context manager closes the connection,
+                        # which cancels the rest of the generation
+                        stream_span.set_attribute("stopped_early", True)
+                        # Thinking came first, so count all of it as spent
+                        self._track_cancelled_stream(prompt, received, plan["thinking_budget"])
+                        return True
+
+                # Only complete responses are representative enough to learn from
+                message = stream.get_final_message()
+
+            response_text = "".join(block.text for block in message.content if block.type == "text")
+            self.budget.record(
+                plan, message.usage, message.stop_reason, time.monotonic() - start, response_text,
+                ideas_parsed=count_idea_sections(response_text)
+            )
+            self._track_usage(message.usage)
+            stream_span.set_attribute("response_chars", len(response_text))
+
+        return False
+
+    def _stream_openai(
+        self,
+        prompt: str,
+        collector: StreamingIdeaCollector,
+        plan: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """Stream an OpenAI response into the collector. Returns True if stopped early."""
+        client = get_client(self.config, "openai")
+
+        if plan is None:
+            prompt, plan = self._plan_request(prompt)
+
+        received = 0
+        with self._reserve(plan), \
+                tracing.span("llm.stream", provider="openai", model=self.config.openai_model,
+                             prompt_chars=len(prompt)) as stream_span:
+            stream = client.chat.completions.create(
+                model=self.config.openai_model,
+                stream=True,
+                # The final chunk then carries the token usage
+                stream_options={"include_usage": True},
+                max_completion_tokens=plan["max_tokens"],
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }]
+            )
+            try:
+                for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        self._track_usage(chunk.usage)
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        stream_span.add_event("chunk", chars=len(text))
+                        received += len(text)
+                    if text and collector.feed(text):
+                        stream_span.set_attribute("stopped_early", True)
+                        self._track_cancelled_stream(prompt, received)
+                        return True
+            finally:
+                stream.close()
+
+        return False
+
+    def _stream_synthetic(
+        self,
+        prompt: str,
+        collector: StreamingIdeaCollector,
+        plan: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """Stream a synthetic response into the collector. Returns True if stopped early.
+
+        plan is unused: synthetic responses cost nothing to budget for.
+        """
+        received = []
+        with tracing.span("llm.stream", provider="synthetic", prompt_chars=len(prompt)) as stream_span:
+            for text in self.synthetic.stream(prompt):
+                stream_span.add_event("chunk", chars=len(text))
+                received.append(text)
+                if collector.feed(text):
+                    stream_span.set_attribute("stopped_early", True)
+                    self._track_usage(self.synthetic.usage(prompt, "".join(received)), estimated=True)
+                    return True
+
+            self._track_usage(self.synthetic.usage(prompt, "".join(received)))
+
+        return False
+
+    def _track_cancelled_stream(self, prompt: str, received_chars: int, thinking_tokens: int = 0):
+        """Charge a stream cancelled before the provider reported its usage, from estimates."""
+        usage = SimpleNamespace(
+            input_tokens=estimate_tokens(prompt),
+            output_tokens=thinking_tokens + received_chars // CHARS_PER_TOKEN
+        )
+        self._track_usage(usage, estimated=True)
+
+    def _generate_structured(
+        self,
+        provider: str,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Generate ideas as schema-validated structured output.
+
+        Invalid items are regenerated individually with a targeted repair
+        request instead of regenerating the whole batch.
+        """
+        criteria_names = list(criteria['weights'].keys())
+        call = self._call_anthropic_structured if provider == "anthropic" else self._call_openai_structured
+        model = self.config.model if provider == "anthropic" else self.config.openai_model
+
+        prompt = self._build_structured_prompt(
+            opportunity, context, criteria, competitive_insights, example_ideas
+        )
+        # Structured calls have no thinking budget, but are sized and
+        # degraded by the same plan as every other generation request
+        prompt, plan = self._plan_request(prompt)
+        plan = dict(plan, thinking_budget=0)
+        print(f"  Using model: {model} (structured output)")
+        print(f"  Prompt length: {len(prompt)} characters")
+
+        payload, shared = single_flight.do(
+            self._flight_key(provider, prompt, plan["max_tokens"], structured=True),
+            lambda: call(prompt, criteria_names, plan)
+        )
+        if shared:
+            print("  (Joined an identical request already in flight)")
+
+        items, errors = validate_ideas_payload(payload, criteria_names)
+        items = list(items)  # The payload may be shared with other callers
+
+        for attempt in range(self.config.structured_repair_attempts):
+            if not errors:
+                break
+            print(f"  Repairing {len(errors)} invalid idea(s) (attempt {attempt + 1})...")
+            repair_prompt = prompt + "\n\n## REPAIR\n" + build_repair_message(items, errors)
+            try:
+                repaired_payload = call(repair_prompt, criteria_names, plan)
+                repaired_items = repaired_payload.get("ideas") if isinstance(repaired_payload, dict) else None
+                errors = merge_repaired_items(items, errors, repaired_items or [], criteria_names)
+            except Exception as e:
+                print(f"  Repair request failed: {type(e).__name__}: {str(e)}")
+                break
+
+        if errors:
+            print(f"  Dropping {len(errors)} idea(s) that are still invalid")
+
+        ideas = ideas_from_payload(payload, items, errors, criteria['weights'])
+        if not any(idea.get("rank") for idea in ideas):
+            self._apply_score_ranking(ideas)
 
         print(f"✓ Generated {len(ideas)} ideas\n")
         return ideas
 
+    def _call_anthropic_structured(
+        self,
+        prompt: str,
+        criteria_names: List[str],
+        plan: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Ask Claude for ideas through a forced tool call and return the tool input."""
+        client = get_client(self.config, "anthropic")
+
+        # Forcing a specific tool is not supported together with extended
+        # thinking, so structured mode runs without a thinking budget
+        start = time.monotonic()
+        with self._reserve(plan), \
+                tracing.span("llm.call", provider="anthropic", model=self.config.model,
+                             structured=True, max_tokens=plan["max_tokens"], prompt_chars=len(prompt)):
+            message = client.messages.create(
+                model=self.config.model,
+                max_tokens=plan["max_tokens"],
+                temperature=self.config.temperature,
+                tools=[build_ideas_tool(criteria_names)],
+                tool_choice={"type": "tool", "name": IDEAS_TOOL_NAME},
+                messages=[{
+                    "role": "user",
+                    "content": self._prompt_content(prompt)
+                }]
+            )
+            self._track_usage(message.usage, "structured")
+
+            payload = next(
+                (block.input for block in message.content
+                 if block.type == "tool_use" and block.name == IDEAS_TOOL_NAME),
+                None
+            )
+            items = payload.get("ideas") if isinstance(payload, dict) else None
+            self.budget.record(
+                plan, message.usage, message.stop_reason, time.monotonic() - start,
+                json.dumps(payload) if payload is not None else "",
+                ideas_parsed=len(items) if isinstance(items, list) else 0
+            )
+
+        if payload is None:
+            raise ValueError("Model did not return structured ideas")
+        return payload
+
+    def _call_openai_structured(
+        self,
+        prompt: str,
+        criteria_names: List[str],
+        plan: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Ask OpenAI for ideas as JSON matching the ideas schema."""
+        client = get_client(self.config, "openai")
+
+        with self._reserve(plan), \
+                tracing.span("llm.call", provider="openai", model=self.config.openai_model,
+                             structured=True, max_tokens=plan["max_tokens"], prompt_chars=len(prompt)):
+            response = client.chat.completions.create(
+                model=self.config.openai_model,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": IDEAS_TOOL_NAME,
+                        "schema": build_ideas_schema(criteria_names),
+                        "strict": False
+                    }
+                },
+                max_completion_tokens=plan["max_tokens"],
+                messages=[{
+                    "role": "user",
+                    "content": prompt
+                }]
+            )
+            self._track_usage(response.usage, "structured")
+
+        return parse_json_payload(response.choices[0].message.content)
+
     def _build_generation_prompt(
         self,
         opportunity: Dict[str, Any],
@@ -161,9 +987,72 @@ class IdeaGeneration:
         example_ideas: List[Dict[str, Any]]
     ) -> str:
         """Build the prompt for AI idea generation."""
+        with tracing.span("prompt.build", format="markdown") as build_span:
+            prompt_parts = self._build_context_parts(
+                opportunity, context, criteria, competitive_insights, example_ideas
+            )
+
+            # Add instructions
+            prompt_parts.append("\n## INSTRUCTIONS")
+            prompt_parts.append(MARKDOWN_INSTRUCTIONS)
+
+            prompt = "\n".join(prompt_parts)
+            build_span.set_attribute("chars", len(prompt))
+        return prompt
 
+    def _build_structured_prompt(
+        self,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> str:
+        """Build the prompt for structured (tool-use / JSON schema) idea generation."""
+        with tracing.span("prompt.build", format="structured") as build_span:
+            prompt_parts = self._build_context_parts(
+                opportunity, context, criteria, competitive_insights, example_ideas
+            )
+
+            prompt_parts.append("\n## INSTRUCTIONS")
+            prompt_parts.append(structured_instructions(list(criteria['weights'].keys())))
+
+            prompt = "\n".join(prompt_parts)
+            build_span.set_attribute("chars", len(prompt))
+        return prompt
+
+    def build_shared_prefix(
+        self,
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> str:
+        """The prompt text shared by opportunities that have the same other inputs."""
+        return "\n".join(
+            [PROMPT_INTRO] + self._build_shared_parts(context, criteria, competitive_insights, example_ideas)
+        )
+
+    def _build_context_parts(
+        self,
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[str]:
+        """Build the prompt sections shared by every output format."""
+        opportunity_parts = self._build_opportunity_parts(opportunity)
+        if self.shared_prefix is not None:
+            # Queued opportunities put the sections they share first
+            return [self.shared_prefix] + opportunity_parts
+        return [PROMPT_INTRO] + opportunity_parts + self._build_shared_parts(
+            context, criteria, competitive_insights, example_ideas
+        )
+
+    def _build_opportunity_parts(self, opportunity: Dict[str, Any]) -> List[str]:
+        """The prompt section describing the opportunity."""
         prompt_parts = [
-            "You are an expert product strategist and innovation consultant. Your task is to generate 7-10 innovative solution ideas for a specific customer opportunity.",
             "\n## OPPORTUNITY",
             f"\nProblem/Desire: {opportunity.get('description', 'N/A')}",
         ]
@@ -175,8 +1064,18 @@ class IdeaGeneration:
         if opportunity.get('impact'):
             prompt_parts.append(f"Impact: {opportunity['impact']}")
 
+        return prompt_parts
+
+    def _build_shared_parts(
+        self,
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[str]:
+        """The prompt sections for everything except the opportunity."""
         # Add context
-        prompt_parts.append("\n## PRODUCT CONTEXT")
+        prompt_parts = ["\n## PRODUCT CONTEXT"]
 
         if context.get('icp'):
             prompt_parts.append(f"\nTarget Audience:\n{context['icp']}")
@@ -208,87 +1107,82 @@ class IdeaGeneration:
         for criterion, weight in criteria['weights'].items():
             prompt_parts.append(f"- {criterion} (importance: {weight}/5)")
 
-        # Add instructions
-        prompt_parts.append("\n## INSTRUCTIONS")
-        prompt_parts.append("""
-Generate 7-10 innovative solution ideas. For each idea, provide:
-
-1. **Title**: A clear, compelling title (5-10 words)
-2. **Description**: A detailed explanation of the solution (2-4 paragraphs)
-3. **How it addresses the opportunity**: Specific connection to the problem/desire
-4. **Expected impact**: How it drives the primary metric
-5. **Implementation considerations**: Key aspects to consider
-
-Format each idea as follows:
-
----
-### IDEA [NUMBER]: [TITLE]
-
-**Description:**
-[Detailed description]
-
-**How it addresses the opportunity:**
-[Explanation]
-
-**Expected impact:**
-[Impact analysis]
-
-**Implementation considerations:**
-[Key considerations]
-
----
-
-After all ideas, provide:
-
-## TOP 3 FORCE RANKED IDEAS
-
-Rank the top 3 ideas and explain your reasoning based on the evaluation criteria.
-
-1. **[Idea Title]** - [Reasoning]
-2. **[Idea Title]** - [Reasoning]
-3. **[Idea Title]** - [Reasoning]
-""")
-
-        return "\n".join(prompt_parts)
+        return prompt_parts
 
     def _parse_ideas_from_response(
         self,
         response_text: str,
         criteria: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Idea]:
         """Parse ideas from AI response."""
-        ideas = []
-
-        # Split by idea markers
-        idea_sections = response_text.split("### IDEA")
-
-        for section in idea_sections[1:]:  # Skip first split (before first idea)
-            lines = section.strip().split("\n")
-
-            # Extract title from first line
-            title_line = lines[0] if lines else ""
-            # Remove number prefix (e.g., "1: " or "1. ")
-            title = title_line.split(":", 1)[-1].strip() if ":" in title_line else title_line
+        with tracing.span("ideas.parse", response_chars=len(response_text)) as parse_span:
+            ideas = list(self.iter_ideas(response_text, criteria))
+            parse_span.set_attribute("ideas", len(ideas))
 
-            # Extract full text
-            full_text = "\n".join(lines[1:]).strip()
-
-            # Calculate a simple score (mock for now)
-            score = self._calculate_idea_score(full_text, criteria)
+        return ideas
 
-            ideas.append({
-                "title": title,
-                "content": full_text,
-                "score": score,
-                "rank": None  # Will be set later
-            })
+    def iter_ideas(self, response_text: str, criteria: Dict[str, Any]) -> Iterator[Idea]:
+        """Parse and score ideas from a response one at a time, in order.
 
+        Yields the same ideas as _parse_ideas_from_response. Only the first
+        three are held back, until the force ranking has been applied to
+        them, so a consumer that writes each idea out as it arrives keeps
+        memory flat however many ideas the response holds.
+        """
         # Extract force ranking if present
+        ranking_text = None
         if "TOP 3 FORCE RANKED" in response_text or "FORCE RANKED IDEAS" in response_text:
-            ranking_section = response_text.split("TOP 3")[1] if "TOP 3" in response_text else ""
-            self._apply_force_ranking(ideas, ranking_section)
-
-        return ideas
+            ranking_text = self._ranking_section(response_text)
+
+        pending: List[Idea] = []
+        for section in iter_idea_sections(response_text):
+            idea = self._parse_idea_section(section, criteria)
+            if ranking_text is None:
+                yield idea
+                continue
+
+            # Force ranking covers the first three ideas
+            pending.append(idea)
+            if len(pending) == 3:
+                self._apply_force_ranking(pending, ranking_text)
+                yield from pending
+                pending = []
+                ranking_text = None
+
+        if pending:
+            self._apply_force_ranking(pending, ranking_text)
+            yield from pending
+
+    def _ranking_section(self, response_text: str) -> str:
+        """The text between the first "TOP 3" and the next one (empty if there is none)."""
+        start = response_text.find("TOP 3")
+        if start < 0:
+            return ""
+        start += len("TOP 3")
+        end = response_text.find("TOP 3", start)
+        return response_text[start:end if end >= 0 else len(response_text)]
+
+    def _parse_idea_section(self, section: str, criteria: Dict[str, Any]) -> Idea:
+        """Parse one idea from the text that follows an "### IDEA" marker."""
+        lines = section.strip().split("\n")
+
+        # Extract title from first line
+        title_line = lines[0] if lines else ""
+        # Remove number prefix (e.g., "1: " or "1. ")
+        title = title_line.split(":", 1)[-1].strip() if ":" in title_line else title_line
+
+        # Extract full text
+        full_text = "\n".join(lines[1:]).strip()
+
+        # Calculate a simple score (mock for now)
+        score = self._calculate_idea_score(full_text, criteria)
+
+        return Idea(
+            title=title,
+            content=full_text,
+            score=score,
+            rank=None  # Will be set later
+        )
 
     def _calculate_idea_score(self, idea_text: str, criteria: Dict[str, Any]) -> float:
         """Calculate a simple score for an idea based on criteria."""
@@ -307,12 +1201,21 @@ Rank the top 3 ideas and explain your reasoning based on the evaluation criteria
         for i, idea in enumerate(ideas[:3]):
             idea["rank"] = i + 1
 
+    def _apply_score_ranking(self, ideas: List[Dict[str, Any]]):
+        """Rank the top 3 ideas by score when the model gave no usable ranking."""
+        by_score = sorted(ideas, key=lambda idea: idea["score"], reverse=True)
+        for i, idea in enumerate(by_score[:3]):
+            idea["rank"] = i + 1
+
     def _generate_mock_ideas(
         self,
         opportunity: Dict[str, Any],
         criteria: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
-        """Generate mock ideas for testing without API."""
+        """Generate five fixed mock ideas for demos without an API key.
+
+        For realistic volumes use the synthetic provider (IDEATION_PROVIDER=synthetic).
+        """
         print("Generating mock ideas (API not configured)...\n")
 
         mock_ideas = [
@@ -398,4 +1301,4 @@ Complex technical implementation requiring robust conflict resolution.""",
             }
         ]
 
-        return mock_ideas[:7]  # Return 7 mock ideas
+        return [Idea(**idea) for idea in mock_ideas]
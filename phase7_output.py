@@ -5,16 +5,36 @@ Display results and save selected ideas to file
 
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 from config import Config
 from input_helpers import confirm, get_user_input
+from idea_model import Idea, IdeaSummary
+from output_writer import IdeaOutputWriter, reserve_output_path
+from terminal_render import OutputBuffer, add_idea_details, add_idea_table, is_interactive, parse_numbers
+from analytics_export import AnalyticsExporter
+from output_manifest import OPPORTUNITY_PREVIEW_CHARS, OutputManifest, top_titles
+from session_payload import opportunity_hash
+import tracing
 
 
 class OutputGeneration:
     """Handles output display and file generation."""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        expander: Optional[Any] = None,
+        usage: Optional[Dict[str, int]] = None,
+        fingerprint: Optional[Dict[str, str]] = None
+    ):
         self.config = config
+        # Expands outline ideas before they are saved (lazy expansion mode)
+        self.expander = expander
+        # Token usage of the generation phase, recorded with the analytics
+        self.usage = usage
+        # Hash of each input section, recorded for incremental reruns
+        self.fingerprint = fingerprint
+        self.analytics = AnalyticsExporter(config) if config.analytics_export else None
 
     def execute(
         self,
@@ -39,29 +59,78 @@ class OutputGeneration:
         save_all = confirm("Would you like to save all ideas to a file?")
 
         if save_all:
+            self._expand_outlines(ideas)
             self._save_ideas_to_file(ideas, opportunity, context, criteria)
         else:
             # Ask which specific ideas to save
             selected_indices = self._select_ideas_to_save(ideas)
             if selected_indices:
                 selected_ideas = [ideas[i] for i in selected_indices]
-                self._save_ideas_to_file(selected_ideas, opportunity, context, criteria)
+                self._expand_outlines(selected_ideas)
+                self._save_ideas_to_file(
+                    selected_ideas, opportunity, context, criteria,
+                    complete=len(set(selected_indices)) == len(ideas)
+                )
             else:
                 print("\nNo ideas saved.")
 
-    def _display_all_ideas(self, ideas: List[Dict[str, Any]]):
-        """Display all generated ideas."""
-        print("Generated Ideas:\n")
+    def save(
+        self,
+        ideas: List[Dict[str, Any]],
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        session_id: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+        source: Optional[str] = None
+    ) -> Optional[str]:
+        """Save all of a session's ideas without any prompts (used by batch and background runs)."""
+        return self._save_ideas_to_file(ideas, opportunity, context, criteria, session_id, usage, source)
+
+    def _expand_outlines(self, ideas: List[Dict[str, Any]]):
+        """Write up any outline-only ideas in full before saving."""
+        if self.expander is not None:
+            self.expander.expand(ideas)
+
+    def _display_all_ideas(self, ideas: List[Dict[str, Any]], start: int = 1):
+        """Display generated ideas, numbered from start."""
+        out = OutputBuffer()
+        out.line("Generated Ideas:\n" if start == 1 else "New Ideas:\n")
+
+        if not is_interactive():
+            # Quiet plain-text mode for pipes and logs: the compact table only
+            add_idea_table(out, ideas, start)
+            out.flush()
+            return
+
+        if len(ideas) <= self.config.display_full_limit:
+            add_idea_details(out, ideas, list(range(start, start + len(ideas))))
+            out.flush()
+            return
 
-        for i, idea in enumerate(ideas, 1):
-            print("=" * 60)
-            print(f"IDEA {i}: {idea['title']}")
-            print("=" * 60)
-            print(idea['content'])
-            print(f"\nScore: {idea['score']}/100")
-            if idea.get('rank'):
-                print(f"Rank: #{idea['rank']}")
-            print()
+        add_idea_table(out, ideas, start)
+        out.page()
+        self._expand_on_demand(ideas, start)
+
+    def _expand_on_demand(self, ideas: List[Dict[str, Any]], start: int):
+        """Let the user read selected ideas from the table in full."""
+        last = start + len(ideas) - 1
+        while True:
+            response = get_user_input(
+                f"Idea numbers to read in full ({start}-{last}, e.g. {start},{start + 2} or {start}-{start + 1}):",
+                required=False
+            )
+            if not response:
+                return
+
+            numbers = parse_numbers(response, start, last)
+            if not numbers:
+                print("No valid idea numbers given.")
+                continue
+
+            out = OutputBuffer()
+            add_idea_details(out, [ideas[number - start] for number in numbers], numbers)
+            out.page()
 
     def _display_force_ranking(self, ideas: List[Dict[str, Any]]):
         """Display the top 3 force-ranked ideas."""
@@ -71,20 +140,23 @@ class OutputGeneration:
         if not ranked_ideas:
             return
 
-        print("\n" + "=" * 60)
-        print("TOP 3 FORCE RANKED IDEAS")
-        print("=" * 60 + "\n")
+        out = OutputBuffer()
+        out.line("\n" + "=" * 60)
+        out.line("TOP 3 FORCE RANKED IDEAS")
+        out.line("=" * 60 + "\n")
 
         for idea in ranked_ideas[:3]:
-            print(f"{idea['rank']}. {idea['title']}")
-            print(f"   Score: {idea['score']}/100")
+            out.line(f"{idea['rank']}. {idea['title']}")
+            out.line(f"   Score: {idea['score']}/100")
 
             # Extract reasoning if available
             if "**Force Ranking Reasoning:**" in idea['content']:
                 reasoning = idea['content'].split("**Force Ranking Reasoning:**")[1].split("**")[0].strip()
-                print(f"   Reasoning: {reasoning[:200]}...")
+                out.line(f"   Reasoning: {reasoning[:200]}...")
+
+            out.line()
 
-            print()
+        out.flush()
 
     def _select_ideas_to_save(self, ideas: List[Dict[str, Any]]) -> List[int]:
         """Let user select which ideas to save."""
@@ -115,99 +187,114 @@ class OutputGeneration:
 
     def _save_ideas_to_file(
         self,
-        ideas: List[Dict[str, Any]],
+        ideas: Iterable[Idea],
         opportunity: Dict[str, Any],
         context: Dict[str, Any],
-        criteria: Dict[str, Any]
-    ):
-        """Save selected ideas to a markdown file."""
-
-        # Generate filename
+        criteria: Dict[str, Any],
+        session_id: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+        source: Optional[str] = None,
+        complete: bool = True
+    ) -> Optional[str]:
+        """Save selected ideas to a markdown file. Returns the path, or None on error.
+
+        ideas may be a generator: each idea is written as it arrives and only
+        its summary is kept, so saving a long stream of ideas (see
+        IdeaGeneration.iter_ideas) does not hold their text in memory.
+        complete is False when ideas is only a selection of those generated;
+        incremental reruns reuse complete sessions only.
+        """
+
+        # Generate filename (numbered if another save took it this second)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"ideation_session_{timestamp}.md"
-        filepath = os.path.join(self.config.output_dir, filename)
-
-        # Build markdown content
-        content = self._build_markdown_output(ideas, opportunity, context, criteria)
+        if session_id:
+            stem = f"ideation_session_{timestamp}_{session_id}"
+        else:
+            stem = f"ideation_session_{timestamp}"
+        try:
+            filepath = reserve_output_path(self.config.output_dir, stem)
+        except OSError as e:
+            print(f"\n✗ Error saving file: {str(e)}")
+            return None
 
-        # Write to file
+        # Each idea is appended and synced as it is written, so a crash
+        # leaves a valid partial file instead of nothing
+        writer = IdeaOutputWriter(filepath)
+        summaries: List[IdeaSummary] = []
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with tracing.span("output.write") as write_span:
+                with writer.open(opportunity, context, criteria, complete=complete):
+                    for idea in ideas:
+                        writer.add_idea(idea)
+                        summaries.append(idea.summary())
+                    writer.finish()
+                write_span.set_attribute("ideas", len(summaries))
+                write_span.set_attribute("bytes", os.path.getsize(filepath) + os.path.getsize(writer.jsonl_path))
 
             print(f"\n✓ Ideas saved to: {filepath}")
-            print(f"  ({len(ideas)} idea(s) saved)")
+            print(f"  ({len(summaries)} idea(s) saved, data in {writer.jsonl_path})")
 
         except Exception as e:
             print(f"\n✗ Error saving file: {str(e)}")
+            if os.path.exists(filepath) and os.path.getsize(filepath) == 0:
+                os.remove(filepath)  # The name claimed for this save
+            return None
+
+        with tracing.span("output.manifest"):
+            self._record_manifest(writer, summaries, opportunity, session_id, complete)
+        with tracing.span("output.analytics"):
+            self._export_analytics(filepath, summaries, opportunity, criteria, session_id, usage, source)
+        return filepath
 
-    def _build_markdown_output(
+    def _record_manifest(
         self,
-        ideas: List[Dict[str, Any]],
+        writer: IdeaOutputWriter,
+        ideas: List[IdeaSummary],
         opportunity: Dict[str, Any],
-        context: Dict[str, Any],
-        criteria: Dict[str, Any]
-    ) -> str:
-        """Build markdown-formatted output."""
-
-        parts = [
-            "# Ideation Session Output",
-            f"\n*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
-            "\n---\n",
-            "## Opportunity",
-            f"\n**Problem/Desire:** {opportunity.get('description', 'N/A')}",
-        ]
-
-        if opportunity.get('who'):
-            parts.append(f"\n**Who:** {opportunity['who']}")
-        if opportunity.get('context'):
-            parts.append(f"\n**Context:** {opportunity['context']}")
-
-        # Add context section
-        parts.append("\n---\n")
-        parts.append("## Context")
-
-        if context.get('icp'):
-            parts.append(f"\n### Target Audience\n{context['icp']}")
-        if context.get('primary_metric'):
-            parts.append(f"\n### Primary Metric\n{context['primary_metric']}")
-
-        # Add evaluation criteria
-        parts.append("\n---\n")
-        parts.append("## Evaluation Criteria\n")
-
-        sorted_criteria = sorted(
-            criteria['weights'].items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-
-        for criterion, weight in sorted_criteria:
-            parts.append(f"- {criterion}: {weight}/5")
-
-        # Add force ranking
-        ranked_ideas = [idea for idea in ideas if idea.get('rank')]
-        if ranked_ideas:
-            parts.append("\n---\n")
-            parts.append("## Top 3 Force Ranked Ideas\n")
-
-            ranked_ideas.sort(key=lambda x: x['rank'])
-            for idea in ranked_ideas[:3]:
-                parts.append(f"\n{idea['rank']}. **{idea['title']}** (Score: {idea['score']}/100)")
-
-        # Add all ideas
-        parts.append("\n---\n")
-        parts.append("## Generated Ideas\n")
-
-        for i, idea in enumerate(ideas, 1):
-            parts.append(f"\n### Idea {i}: {idea['title']}\n")
-            parts.append(f"**Score:** {idea['score']}/100")
-            if idea.get('rank'):
-                parts.append(f" | **Rank:** #{idea['rank']}")
-            parts.append(f"\n\n{idea['content']}\n")
-
-        # Add footer
-        parts.append("\n---\n")
-        parts.append("*Generated by Ideation Agent*")
-
-        return "\n".join(parts)
+        session_id: Optional[str],
+        complete: bool
+    ):
+        """Add the saved session to the output directory's manifest (never fails the save)."""
+        try:
+            OutputManifest(self.config.output_dir).append({
+                "session_id": os.path.splitext(os.path.basename(writer.filepath))[0],
+                "queue_id": session_id,
+                "path": os.path.relpath(writer.filepath, self.config.output_dir),
+                "sidecar": os.path.relpath(writer.jsonl_path, self.config.output_dir),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "opportunity_hash": opportunity_hash(opportunity),
+                "opportunity": opportunity.get('description', '')[:OPPORTUNITY_PREVIEW_CHARS],
+                "idea_count": len(ideas),
+                "complete": complete,
+                "top_titles": top_titles(ideas),
+                "titles": [idea['title'] for idea in ideas],
+                "offsets": [[item["offset"], item["length"]] for item in writer.offsets],
+                "fingerprint": self.fingerprint
+            })
+        except Exception as e:
+            print(f"  Warning: Could not update the manifest: {type(e).__name__}: {str(e)}")
+
+    def _export_analytics(
+        self,
+        filepath: str,
+        ideas: List[IdeaSummary],
+        opportunity: Dict[str, Any],
+        criteria: Dict[str, Any],
+        session_id: Optional[str],
+        usage: Optional[Dict[str, int]],
+        source: Optional[str] = None
+    ):
+        """Append the saved session to the analytics dataset (never fails the save)."""
+        if self.analytics is None:
+            return
+        try:
+            self.analytics.export(
+                os.path.splitext(os.path.basename(filepath))[0],
+                ideas,
+                opportunity,
+                criteria,
+                usage=usage if usage is not None else self.usage,
+                source=source or ("batch" if session_id else "interactive")
+            )
+        except Exception as e:
+            print(f"  Warning: Could not export analytics: {type(e).__name__}: {str(e)}")
@@ -0,0 +1,126 @@
+"""
+Phase Profiler - Per-phase CPU and memory profiles for --profile runs
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+
+class PhaseProfiler:
+    """Profiles each session phase with cProfile and tracemalloc.
+
+    Every phase gets its own .prof file (open with pstats or snakeviz) in a
+    timestamped directory under output_dir/profiles/, and summary.txt
+    lists wall time, CPU time and memory per phase with the top-N hotspots.
+    Only created with --profile: without it no profiler code runs at all.
+    cProfile sees the main thread only, so work done in worker threads
+    (judging, expansion, best-of-N) shows up as waiting time.
+    """
+
+    def __init__(self, output_dir: str, top_n: int = 15):
+        self.top_n = top_n
+        self.directory = os.path.join(
+            output_dir, "profiles", datetime.now().strftime("%Y%m%d_%H%M%S")
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        self.results: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Profile the body of the with-block as one phase."""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        memory_before, _ = tracemalloc.get_traced_memory()
+
+        profile = cProfile.Profile()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            memory_after, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+
+            self._record(name, profile, wall, cpu, memory_after - memory_before, peak, before, after)
+
+    def write_summary(self) -> str:
+        """Write summary.txt for all phases profiled so far. Returns its path."""
+        lines = [
+            f"{'Phase':<22}{'Wall s':>9}{'CPU s':>9}{'Peak MB':>10}{'Net MB':>9}",
+            "-" * 59,
+        ]
+        for result in self.results:
+            lines.append(
+                f"{result['name']:<22}{result['wall']:>9.3f}{result['cpu']:>9.3f}"
+                f"{result['peak'] / 1e6:>10.2f}{result['net'] / 1e6:>9.2f}"
+            )
+        lines.append("\nWall time includes waiting for input and API responses; CPU time does not.")
+
+        for result in self.results:
+            lines.append("\n" + "=" * 59)
+            lines.append(f"{result['name']}  (profile: {result['profile_file']})")
+            lines.append("=" * 59)
+            lines.append(f"\nTop {self.top_n} functions by cumulative time:\n")
+            lines.append(result["hotspots"])
+            lines.append(f"Top {self.top_n} allocation sites (net, by line):\n")
+            lines.extend(result["allocations"] or ["  (none)"])
+
+        path = os.path.join(self.directory, "summary.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+        print(f"\n✓ Profiles written to: {self.directory}")
+        return path
+
+    def _record(
+        self,
+        name: str,
+        profile: cProfile.Profile,
+        wall: float,
+        cpu: float,
+        net: int,
+        peak: int,
+        before: Any,
+        after: Any
+    ):
+        """Save a phase's profile file and keep its summary figures."""
+        profile_file = f"{len(self.results) + 1:02d}_{name}.prof"
+        profile.dump_stats(os.path.join(self.directory, profile_file))
+
+        buffer = io.StringIO()
+        stats = pstats.Stats(profile, stream=buffer)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(self.top_n)
+        hotspots = buffer.getvalue().split("\n", 1)[-1].strip("\n") + "\n"
+
+        snapshot_filter = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = after.filter_traces(snapshot_filter).compare_to(
+            before.filter_traces(snapshot_filter), "lineno"
+        )
+        allocations = [f"  {difference}" for difference in differences[:self.top_n]]
+
+        self.results.append({
+            "name": name,
+            "wall": wall,
+            "cpu": cpu,
+            "net": net,
+            "peak": peak,
+            "profile_file": profile_file,
+            "hotspots": hotspots,
+            "allocations": allocations,
+        })
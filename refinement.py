@@ -0,0 +1,160 @@
+"""
+Refinement - Iterative rounds of new ideas from user feedback
+"""
+
+import re
+from typing import Any, Dict, List
+
+from client_pool import get_client
+from idea_stream import normalize_title
+import tracing
+
+
+REFINEMENT_INSTRUCTIONS = """
+## REFINEMENT REQUEST
+
+Build on ideas: {selected}
+Feedback: {feedback}
+
+Generate {count} NEW ideas that follow this feedback. Do not repeat any idea above.
+Use exactly the same "### IDEA [NUMBER]: [TITLE]" format, numbering from {next_number}.
+Do not add a force ranking section.
+"""
+
+# Output cap for one refinement round
+REFINEMENT_MAX_TOKENS = 6000
+
+
+def parse_idea_numbers(text: str) -> List[int]:
+    """Find idea references like "#3" in feedback text."""
+    return [int(number) for number in re.findall(r"#(\d+)", text)]
+
+
+class IdeaRefinement:
+    """Runs refinement rounds as deltas on a cached conversation prefix.
+
+    The original generation prompt and response form the conversation
+    prefix. Each round appends only the user's feedback and the selected
+    idea numbers, marks the newest turn as a cache breakpoint, and merges
+    the new ideas into the session's idea set.
+    """
+
+    def __init__(
+        self,
+        generator: Any,
+        ideas: List[Dict[str, Any]],
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ):
+        self.generator = generator
+        self.config = generator.config
+        self.ideas = ideas
+        self.criteria = criteria
+
+        prompt = generator.last_prompt or generator._build_generation_prompt(
+            opportunity, context, criteria, competitive_insights, example_ideas
+        )
+        # Modes that do not keep raw markdown replay the ideas in that format
+        response_text = generator.last_response_text or self._render_ideas(ideas)
+
+        self.messages: List[Dict[str, str]] = [
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": response_text},
+        ]
+
+    def refine(self, feedback: str, selected: List[int], count: int = 3) -> List[Dict[str, Any]]:
+        """Run one round. Returns the new ideas, which are also merged into the set."""
+        selected = [number for number in selected if 1 <= number <= len(self.ideas)]
+        selected_text = ", ".join(
+            f"#{number} ({self.ideas[number - 1]['title']})" for number in selected
+        ) or "none in particular"
+
+        delta = REFINEMENT_INSTRUCTIONS.format(
+            selected=selected_text,
+            feedback=feedback,
+            count=count,
+            next_number=len(self.ideas) + 1
+        )
+        self.messages.append({"role": "user", "content": delta})
+
+        try:
+            response_text = self._call(self.messages)
+        except Exception:
+            self.messages.pop()
+            raise
+
+        self.messages.append({"role": "assistant", "content": response_text})
+
+        new_ideas = self._merge(self.generator._parse_ideas_from_response(response_text, self.criteria))
+        if new_ideas:
+            self.generator._judge_ideas(new_ideas, self.criteria)
+        return new_ideas
+
+    def _merge(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append ideas whose titles are new to the session's idea set."""
+        seen = {normalize_title(idea["title"]) for idea in self.ideas}
+        added = []
+        for idea in candidates:
+            key = normalize_title(idea["title"])
+            if key and key not in seen:
+                seen.add(key)
+                idea["rank"] = None
+                idea["refined"] = True
+                self.ideas.append(idea)
+                added.append(idea)
+        return added
+
+    def _call(self, messages: List[Dict[str, str]]) -> str:
+        """Send the conversation to the provider and return the new text."""
+        provider = self.config.get_model_provider()
+        if provider == "synthetic":
+            return self.generator._call_synthetic(messages[-1]["content"], "refinement")
+        client = get_client(self.config, provider)
+
+        conversation = "".join(message["content"] for message in messages)
+        with self.generator._reserve_prompt(conversation, REFINEMENT_MAX_TOKENS), \
+                tracing.span("llm.call", provider=provider, purpose="refinement",
+                             turns=len(messages)) as call_span:
+            if provider == "anthropic":
+                message = client.messages.create(
+                    model=self.config.model,
+                    max_tokens=REFINEMENT_MAX_TOKENS,
+                    temperature=self.config.temperature,
+                    messages=self._with_cache_breakpoints(messages)
+                )
+                usage = message.usage
+                self.generator._track_usage(usage, "refinement")
+                cached = getattr(usage, "cache_read_input_tokens", 0) or 0
+                call_span.set_attribute("cache_read_tokens", cached)
+                print(f"  ({usage.input_tokens} new input tokens, {cached} read from cache)")
+                return "".join(block.text for block in message.content if block.type == "text")
+
+            # OpenAI caches repeated prompt prefixes automatically
+            response = client.chat.completions.create(
+                model=self.config.openai_model,
+                max_completion_tokens=REFINEMENT_MAX_TOKENS,
+                messages=messages
+            )
+            self.generator._track_usage(response.usage, "refinement")
+            return response.choices[0].message.content or ""
+
+    def _with_cache_breakpoints(self, messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Mark the original prompt and the latest assistant turn as cache breakpoints."""
+        last_assistant = max(i for i, message in enumerate(messages) if message["role"] == "assistant")
+        api_messages = []
+        for i, message in enumerate(messages):
+            block: Dict[str, Any] = {"type": "text", "text": message["content"]}
+            if i == 0 or i == last_assistant:
+                block["cache_control"] = {"type": "ephemeral"}
+            api_messages.append({"role": message["role"], "content": [block]})
+        return api_messages
+
+    def _render_ideas(self, ideas: List[Dict[str, Any]]) -> str:
+        """Render ideas in the generation response format."""
+        return "\n".join(
+            f"---\n### IDEA {i}: {idea['title']}\n\n{idea['content']}\n"
+            for i, idea in enumerate(ideas, 1)
+        )
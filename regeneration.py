@@ -0,0 +1,281 @@
+"""
+Regeneration - Incremental reruns that keep the ideas unaffected by changed inputs
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from idea_model import Idea
+from output_manifest import OutputManifest
+from structured_output import parse_json_payload
+import tracing
+
+
+VALIDATION_INSTRUCTIONS = """
+You are reviewing product ideas after some of the inputs they were generated
+from changed. The changed inputs now read:
+
+{changes}
+
+## IDEAS
+{ideas}
+
+An idea is invalid if it conflicts with the changed inputs: it breaks a new
+constraint, no longer fits the audience, product or metric, or duplicates a
+listed competitor. Ideas the changes do not affect stay valid.
+
+Respond with JSON only, in exactly this shape:
+{{"invalid": [{{"id": 1, "reason": "<one sentence>"}}]}}
+"""
+
+REPLACEMENT_HINT = """
+Generate only {count} new ideas. These ideas already exist; do not repeat or
+closely resemble them:
+{titles}
+"""
+
+# Characters of idea content sent for validation per idea
+MAX_VALIDATION_CHARS = 800
+
+# The fingerprint section that identifies an opportunity across reruns
+LINEAGE_SECTION = "opportunity.description"
+
+# Sections that only calibrate generation; changing them keeps existing ideas
+CALIBRATION_SECTIONS = ("example_ideas",)
+
+SECTION_LABELS = {
+    "context.icp": "Target Audience",
+    "context.vision": "Product Vision",
+    "context.product_description": "Product Description",
+    "context.primary_metric": "Primary Metric",
+    "context.constraints": "Constraints",
+    "competitive_insights": "Competitive Insights",
+}
+
+
+def section_hash(value: Any) -> str:
+    """Short content hash of one input section."""
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def input_fingerprint(
+    opportunity: Dict[str, Any],
+    context: Dict[str, Any],
+    criteria: Dict[str, Any],
+    competitive_insights: List[Dict[str, Any]],
+    example_ideas: List[Dict[str, Any]]
+) -> Dict[str, str]:
+    """Hash of each input section: every opportunity and context field, the
+    criteria weights, the competitive insights and the example ideas.
+
+    Empty fields are left out, so a blank answer matches a missing one.
+    """
+    fingerprint = {}
+    for prefix, fields in (("opportunity", opportunity), ("context", context)):
+        for key, value in fields.items():
+            if value not in (None, "", [], {}):
+                fingerprint[f"{prefix}.{key}"] = section_hash(value)
+    fingerprint["criteria"] = section_hash(criteria.get("weights") or {})
+    if competitive_insights:
+        fingerprint["competitive_insights"] = section_hash(competitive_insights)
+    if example_ideas:
+        fingerprint["example_ideas"] = section_hash(example_ideas)
+    return fingerprint
+
+
+def changed_sections(old: Dict[str, str], new: Dict[str, str]) -> List[str]:
+    """Sections added, removed or edited between two fingerprints."""
+    return sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
+
+
+class IncrementalRegeneration:
+    """Reruns a session by updating the ideas saved for the same opportunity.
+
+    Each saved session records its input fingerprint in the manifest. On a
+    rerun, the newest session with the same opportunity description is
+    compared section by section with the new inputs:
+
+    - nothing changed: its ideas are reused as they are
+    - criteria changed: ideas are re-scored (weight-only changes are free,
+      since judgements are cached by idea and criteria names)
+    - context, other opportunity fields or competitive insights changed:
+      one call checks the ideas against the changed sections, and only
+      as many new ideas are generated as were invalidated
+    - example ideas changed: ideas are kept (examples only calibrate)
+
+    execute() returns None when a full regeneration is needed instead.
+    """
+
+    def __init__(self, generator: Any):
+        self.generator = generator
+        self.config = generator.config
+
+    def execute(
+        self,
+        fingerprint: Dict[str, str],
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> Optional[List[Idea]]:
+        """The updated ideas, or None if the session must be generated in full."""
+        manifest = OutputManifest(self.config.output_dir)
+        entry = self._previous_session(manifest, fingerprint)
+        if entry is None:
+            return None
+
+        ideas = self._load_ideas(manifest, entry)
+        if not ideas:
+            return None
+
+        changed = changed_sections(entry["fingerprint"], fingerprint)
+        if not changed:
+            print(f"Inputs unchanged since session {entry['session_id']}: reusing its {len(ideas)} idea(s)\n")
+            return ideas
+        print(f"Changed since session {entry['session_id']}: {', '.join(changed)}")
+
+        with tracing.span("ideas.regenerate", previous=entry["session_id"], changed=len(changed)) as regen_span:
+            to_check = [key for key in changed if key != "criteria" and key not in CALIBRATION_SECTIONS]
+            kept = ideas
+            if to_check:
+                inputs = {"opportunity": opportunity, "context": context, "competitive_insights": competitive_insights}
+                kept = self._validate(ideas, to_check, inputs)
+                print(f"  {len(ideas) - len(kept)} of {len(ideas)} idea(s) invalidated by the changes")
+                if not kept:
+                    print("  No ideas survived; generating in full\n")
+                    return None
+
+            # Every kept idea is scored against the current criteria
+            self._rescore(kept, criteria)
+
+            replaced = len(ideas) - len(kept)
+            new_ideas: List[Idea] = []
+            if replaced:
+                new_ideas = self._generate_replacements(
+                    replaced, kept, opportunity, context, criteria, competitive_insights, example_ideas
+                )
+                print(f"✓ Generated {len(new_ideas)} replacement idea(s)")
+
+            result = kept + new_ideas
+            for idea in result:
+                idea["rank"] = None
+            self.generator._apply_score_ranking(result)
+            regen_span.set_attribute("kept", len(kept))
+            regen_span.set_attribute("generated", len(new_ideas))
+
+        print(f"✓ {len(kept)} idea(s) kept, {len(new_ideas)} new\n")
+        return result
+
+    def _previous_session(self, manifest: OutputManifest, fingerprint: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """The newest session for the same opportunity description that saved all its ideas."""
+        lineage = fingerprint.get(LINEAGE_SECTION)
+        if lineage is None:
+            # Without a description there is nothing to tie reruns together
+            return None
+        for entry in manifest.entries():
+            previous = entry.get("fingerprint")
+            if entry.get("complete") and isinstance(previous, dict) and previous.get(LINEAGE_SECTION) == lineage:
+                return entry
+        return None
+
+    def _load_ideas(self, manifest: OutputManifest, entry: Dict[str, Any]) -> List[Idea]:
+        """The ideas a session saved, read back from its JSONL sidecar.
+
+        Empty unless the sidecar says it holds every idea the session generated.
+        """
+        ideas = []
+        try:
+            with open(manifest.resolve(entry, "sidecar"), 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get("type") == "session" and not record.get("complete"):
+                        print(f"  Session {entry.get('session_id')} saved only some of its ideas")
+                        return []
+                    if record.get("type") == "idea":
+                        ideas.append(Idea(**{key: record[key] for key in Idea.FIELDS if key in record}))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  Warning: Could not read session {entry.get('session_id')}: {str(e)}")
+            return []
+        return ideas
+
+    def _validate(self, ideas: List[Idea], sections: List[str], inputs: Dict[str, Any]) -> List[Idea]:
+        """The ideas that still hold under the changed sections."""
+        if self.generator.synthetic is not None:
+            # No model to judge with; the synthetic provider keeps every idea
+            return ideas
+
+        changes = []
+        for section in sections:
+            label = SECTION_LABELS.get(section, section.split(".", 1)[-1].replace("_", " ").title())
+            value = self._section_value(section, inputs)
+            changes.append(f"### {label}\n{value if value else '(removed)'}")
+
+        idea_lines = [
+            f"### Idea {i}: {idea['title']}\n{idea['content'][:MAX_VALIDATION_CHARS]}\n"
+            for i, idea in enumerate(ideas, 1)
+        ]
+        prompt = VALIDATION_INSTRUCTIONS.format(changes="\n\n".join(changes), ideas="\n".join(idea_lines))
+        payload = parse_json_payload(
+            self.generator._complete_text(prompt, 200 + 60 * len(ideas), "validation")
+        )
+
+        invalid = {}
+        for item in (payload.get("invalid") or []) if isinstance(payload, dict) else []:
+            if isinstance(item, dict) and isinstance(item.get("id"), int) and 1 <= item["id"] <= len(ideas):
+                invalid[item["id"]] = str(item.get("reason") or "")
+        for number, reason in sorted(invalid.items()):
+            print(f"  ✗ {ideas[number - 1]['title']}: {reason}")
+        return [idea for i, idea in enumerate(ideas, 1) if i not in invalid]
+
+    def _section_value(self, section: str, inputs: Dict[str, Any]) -> str:
+        """The current text of one fingerprint section."""
+        if section == "competitive_insights":
+            return "\n".join(
+                f"- {insight['url']}" + (f": {insight['notes']}" if insight.get("notes") else "")
+                for insight in inputs["competitive_insights"]
+            )
+        prefix, _, key = section.partition(".")
+        value = inputs.get(prefix, {}).get(key)
+        if not value:
+            return ""
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+    def _rescore(self, ideas: List[Idea], criteria: Dict[str, Any]):
+        """Score ideas against the current criteria, as newly generated ones are."""
+        for idea in ideas:
+            idea.pop("sub_scores", None)
+            idea["score"] = self.generator._calculate_idea_score(idea["content"], criteria)
+        self.generator._judge_ideas(ideas, criteria)
+
+    def _generate_replacements(
+        self,
+        count: int,
+        kept: List[Idea],
+        opportunity: Dict[str, Any],
+        context: Dict[str, Any],
+        criteria: Dict[str, Any],
+        competitive_insights: List[Dict[str, Any]],
+        example_ideas: List[Dict[str, Any]]
+    ) -> List[Idea]:
+        """Generate count new ideas that differ from the kept ones."""
+        prompt = self.generator._build_generation_prompt(
+            opportunity, context, criteria, competitive_insights, example_ideas
+        ) + REPLACEMENT_HINT.format(count=count, titles="\n".join(f"- {idea['title']}" for idea in kept))
+
+        provider = self.config.get_model_provider()
+        self.generator.idea_count = count
+        try:
+            if provider == "synthetic":
+                response_text = self.generator._call_synthetic(prompt)
+            elif provider == "anthropic":
+                response_text = self.generator._call_anthropic(prompt)
+            else:
+                response_text = self.generator._call_openai(prompt)
+        finally:
+            self.generator.idea_count = None
+
+        ideas = self.generator._parse_ideas_from_response(response_text, criteria)[:count]
+        return self.generator._judge_ideas(ideas, criteria)
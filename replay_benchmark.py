@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Replay Benchmark - Time the generation and output stages on a recorded cassette
+
+Record a cassette once with a real provider:
+  IDEATION_CASSETTE=run.jsonl.gz IDEATION_CASSETTE_MODE=record \
+      python3 replay_benchmark.py session.json run.jsonl.gz --runs 1
+
+Then replay it offline, as often as needed:
+  python3 replay_benchmark.py session.json run.jsonl.gz
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark phases 6-7 against a cassette")
+    parser.add_argument("session", help="Session payload JSON file (phase 1-5 inputs)")
+    parser.add_argument("cassette", help="Cassette file to replay (or record)")
+    parser.add_argument("--runs", type=int, default=5, help="Number of timed runs")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed (0 = no recorded delays)")
+    args = parser.parse_args()
+
+    os.environ["IDEATION_CASSETTE"] = args.cassette
+    os.environ.setdefault("IDEATION_CASSETTE_MODE", "replay")
+    os.environ["IDEATION_REPLAY_SPEED"] = str(args.speed)
+
+    import client_pool
+    from config import Config
+    from phase6_generation import IdeaGeneration
+    from phase7_output import OutputGeneration
+    from session_payload import load_session_payload
+
+    session = load_session_payload(args.session)
+    timings: Dict[str, List[float]] = {"generate": [], "save": []}
+    idea_count = 0
+
+    for _ in range(args.runs):
+        config = Config()
+        config.output_dir = tempfile.mkdtemp(prefix="ideation_bench_")
+        # A fresh client per run re-reads the cassette from the start
+        client_pool.close_all()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            ideas = IdeaGeneration(config).execute(
+                session["opportunity"],
+                session["context"],
+                session["criteria"],
+                session["competitive_insights"],
+                session["example_ideas"]
+            )
+            timings["generate"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            OutputGeneration(config).save(ideas, session["opportunity"], session["context"], session["criteria"])
+            timings["save"].append(time.perf_counter() - start)
+        idea_count = len(ideas)
+
+    print(f"{idea_count} idea(s) per run, {args.runs} run(s)")
+    for stage, samples in timings.items():
+        print(f"  {stage:<9} median {statistics.median(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
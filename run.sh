@@ -11,15 +11,16 @@ if ! command -v python3 &> /dev/null; then
     exit 1
 fi
 
-# Check if required packages are installed
-python3 -c "import anthropic" 2>/dev/null || python3 -c "import openai" 2>/dev/null
+# Check if required packages are installed (finds them without importing,
+# so this costs a bare interpreter start rather than an SDK import)
+python3 -c "import importlib.util, sys; sys.exit(0 if importlib.util.find_spec('anthropic') or importlib.util.find_spec('openai') else 1)" 2>/dev/null
 if [ $? -ne 0 ]; then
     echo "Installing required packages..."
     pip3 install -r requirements.txt
 fi
 
 # Run the agent
-python3 ideation_agent.py
+python3 ideation_agent.py "$@"
 
 echo ""
 echo "Session ended. Goodbye!"
@@ -2,108 +2,273 @@
 Session Manager - Orchestrates the ideation workflow
 """
 
-from typing import Dict, Any, Optional
+from typing import Any, Optional
 from config import Config
-from phase1_opportunity import OpportunityDiscovery
-from phase2_context import ContextGathering
-from phase3_criteria import CriteriaSetup
-from phase4_competitive import CompetitiveAnalysis
-from phase5_examples import ExampleCollection
-from phase6_generation import IdeaGeneration
-from phase7_output import OutputGeneration
+import client_pool
+import tracing
+from input_helpers import confirm, get_user_input
+from idea_model import SessionState
+
+
+# Phase modules are imported where each phase starts, so the CLI shows its
+# first prompt without loading generation and output code (and their
+# dependencies) up front.
 
 
 class SessionManager:
     """Manages the ideation session state and workflow."""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, profiler: Optional[Any] = None, queue: bool = False):
         self.config = config
-        self.state: Dict[str, Any] = {
-            "opportunity": {},
-            "context": {},
-            "criteria": {},
-            "competitive_insights": [],
-            "example_ideas": [],
-            "generated_ideas": [],
-            "phase": 1
-        }
+        # PhaseProfiler for --profile runs; None means phases run unwrapped
+        self.profiler = profiler
+        # Queue mode: several opportunities share phases 2-5 and generate in
+        # the background while the next one is entered
+        self.queue = queue
+        self.state = SessionState()
+        self.generator: Optional[Any] = None
+        self.output: Optional[Any] = None
 
     def run(self):
         """Run the complete ideation session."""
         print("Let's start your ideation session!\n")
 
-        # Phase 1: Opportunity Discovery
+        phases = [
+            ("phase1_opportunity", self._run_opportunity),
+            ("phase2_context", self._run_context),
+            ("phase3_criteria", self._run_criteria),
+            ("phase4_competitive", self._run_competitive),
+            ("phase5_examples", self._run_examples),
+        ]
+        if self.queue:
+            phases.append(("opportunity_queue", self._run_queue))
+        else:
+            phases += [
+                ("phase6_generation", self._run_generation),
+                ("phase7_output", self._run_output),
+                ("refinement", self._run_refinement),
+            ]
+        try:
+            with tracing.span("session") as session_span:
+                for number, (name, run_phase) in enumerate(phases, 1):
+                    self.state["phase"] = number
+                    with tracing.span(name, phase=number):
+                        if self.profiler is None:
+                            run_phase()
+                        else:
+                            with self.profiler.phase(name):
+                                run_phase()
+                session_span.set_attribute("ideas", len(self.state["generated_ideas"]))
+        finally:
+            if self.generator is not None:
+                self.generator.close()
+            if self.profiler is not None:
+                self.profiler.write_summary()
+
+        print("\n" + "=" * 60)
+        print("SESSION COMPLETE")
+        print("=" * 60)
+        if self.generator is not None:
+            print(self.generator.ledger.summary())
+        print("\nThank you for using Ideation Agent!")
+
+    def _run_opportunity(self):
+        """Phase 1: Opportunity Discovery."""
         print("=" * 60)
         print("PHASE 1: OPPORTUNITY DISCOVERY")
         print("=" * 60 + "\n")
+        from phase1_opportunity import OpportunityDiscovery
         phase1 = OpportunityDiscovery()
         self.state["opportunity"] = phase1.execute()
 
-        # Phase 2: Context Gathering
+    def _run_context(self):
+        """Phase 2: Context Gathering."""
         print("\n" + "=" * 60)
         print("PHASE 2: CONTEXT GATHERING")
         print("=" * 60 + "\n")
+        from phase2_context import ContextGathering
         phase2 = ContextGathering()
         self.state["context"] = phase2.execute()
 
-        # Phase 3: Evaluation Criteria Setup
+    def _run_criteria(self):
+        """Phase 3: Evaluation Criteria Setup."""
         print("\n" + "=" * 60)
         print("PHASE 3: EVALUATION CRITERIA")
         print("=" * 60 + "\n")
+        from phase3_criteria import CriteriaSetup
         phase3 = CriteriaSetup(self.config)
         self.state["criteria"] = phase3.execute()
 
-        # Phase 4: Competitive Analysis (Optional)
+    def _run_competitive(self):
+        """Phase 4: Competitive Analysis (Optional)."""
         print("\n" + "=" * 60)
         print("PHASE 4: COMPETITIVE ANALYSIS (OPTIONAL)")
         print("=" * 60 + "\n")
+        from phase4_competitive import CompetitiveAnalysis
         phase4 = CompetitiveAnalysis()
         self.state["competitive_insights"] = phase4.execute()
 
-        # Phase 5: Example Collection
+    def _run_examples(self):
+        """Phase 5: Example Collection."""
+        # Warm the provider connection while the user writes examples,
+        # so phase 6 does not pay for connection setup
+        if self.config.has_api_key():
+            client_pool.prewarm(self.config)
+
         print("\n" + "=" * 60)
         print("PHASE 5: EXAMPLE IDEAS")
         print("=" * 60 + "\n")
+        from phase5_examples import ExampleCollection
         phase5 = ExampleCollection()
         self.state["example_ideas"] = phase5.execute()
 
-        # Phase 6: Idea Generation
+    def _run_generation(self):
+        """Phase 6: Idea Generation."""
         print("\n" + "=" * 60)
         print("PHASE 6: GENERATING IDEAS")
         print("=" * 60 + "\n")
 
-        # Check if API key is available
+        from phase6_generation import IdeaGeneration
+
+        self.generator = IdeaGeneration(self.config, use_mock=self._check_provider())
+
+        self.state["generated_ideas"] = self.generator.execute(
+            self.state["opportunity"],
+            self.state["context"],
+            self.state["criteria"],
+            self.state["competitive_insights"],
+            self.state["example_ideas"]
+        )
+
+    def _check_provider(self) -> bool:
+        """Report which provider generation will use. Returns True for mock ideas."""
+        if self.config.get_model_provider() == "synthetic":
+            print("✓ Synthetic provider (no API calls)")
+            return False
         if not self.config.has_api_key():
             print("WARNING: No API key found for Anthropic or OpenAI.")
             print("Please set ANTHROPIC_API_KEY or OPENAI_API_KEY environment variable.")
             print("Or add MY_API_KEY to the .env file in the ideation-agent directory.")
             print("\nFor now, generating mock ideas for demonstration purposes...")
-            phase6 = IdeaGeneration(self.config, use_mock=True)
-        else:
-            print(f"✓ API key detected. Provider: {self.config.get_model_provider()}")
-            phase6 = IdeaGeneration(self.config, use_mock=False)
+            return True
+        print(f"✓ API key detected. Provider: {self.config.get_model_provider()}")
+        return False
 
-        self.state["generated_ideas"] = phase6.execute(
-            self.state["opportunity"],
+    def _run_queue(self):
+        """Phases 6-7 for a queue of opportunities that share phases 2-5.
+
+        Each opportunity generates and saves in the background while the
+        user enters the next one.
+        """
+        print("\n" + "=" * 60)
+        print("PHASE 6: GENERATING IDEAS (QUEUE)")
+        print("=" * 60 + "\n")
+
+        from generation_pipeline import GenerationPipeline
+        from phase1_opportunity import OpportunityDiscovery
+
+        pipeline = GenerationPipeline(
+            self.config,
             self.state["context"],
             self.state["criteria"],
             self.state["competitive_insights"],
-            self.state["example_ideas"]
+            self.state["example_ideas"],
+            use_mock=self._check_provider()
         )
+        with pipeline:
+            pipeline.submit(self.state["opportunity"])
+            while confirm("\nAdd another opportunity with the same context, criteria and examples?"):
+                pipeline.report()
+                print("\n" + "=" * 60)
+                print(f"OPPORTUNITY {len(pipeline.jobs) + 1}")
+                print("=" * 60 + "\n")
+                pipeline.submit(OpportunityDiscovery().execute())
+
+            print("\nWaiting for the remaining opportunities...")
+            pipeline.report(wait=True)
 
-        # Phase 7: Output Generation
+        self.state["generated_ideas"] = pipeline.all_ideas()
+        print(f"\n{pipeline.ledger.summary()}")
+        print("Use 'python3 ideation_agent.py list' and 'show' to browse the saved sessions.")
+
+    def _run_output(self):
+        """Phase 7: Output Generation."""
         print("\n" + "=" * 60)
         print("PHASE 7: RESULTS & OUTPUT")
         print("=" * 60 + "\n")
-        phase7 = OutputGeneration(self.config)
-        phase7.execute(
+        from phase7_output import OutputGeneration
+        self.output = OutputGeneration(
+            self.config,
+            expander=self.generator.expander,
+            usage=self.generator.usage,
+            fingerprint=self.generator.fingerprint
+        )
+        self.output.execute(
             self.state["generated_ideas"],
             self.state["opportunity"],
             self.state["context"],
             self.state["criteria"]
         )
 
+    def _run_refinement(self):
+        """Optional refinement rounds (skipped for mock ideas)."""
+        if not self.generator.use_mock:
+            self._refine(self.generator, self.output)
+
+    def _refine(self, phase6: Any, phase7: Any):
+        """Run optional refinement rounds on top of the generated ideas."""
+        from refinement import IdeaRefinement, parse_idea_numbers
+
         print("\n" + "=" * 60)
-        print("SESSION COMPLETE")
-        print("=" * 60)
-        print("\nThank you for using Ideation Agent!")
+        print("REFINEMENT (OPTIONAL)")
+        print("=" * 60 + "\n")
+
+        if not confirm("Would you like to refine these ideas?"):
+            return
+
+        refinement = IdeaRefinement(
+            phase6,
+            self.state["generated_ideas"],
+            self.state["opportunity"],
+            self.state["context"],
+            self.state["criteria"],
+            self.state["competitive_insights"],
+            self.state["example_ideas"]
+        )
+
+        added = 0
+        while True:
+            print("\nDescribe what to change, and mention ideas to build on as #N (e.g., 'more like #2, but cheaper')")
+            feedback = get_user_input("Feedback:", required=False)
+            if not feedback:
+                break
+
+            selected = parse_idea_numbers(feedback)
+            if not selected:
+                numbers = get_user_input("Idea numbers to build on (comma-separated):", required=False)
+                selected = [int(n) for n in numbers.replace(",", " ").split() if n.isdigit()]
+
+            first_new = len(self.state["generated_ideas"]) + 1
+            print("Refining ideas...")
+            try:
+                new_ideas = refinement.refine(feedback, selected)
+            except Exception as e:
+                print(f"ERROR during refinement: {type(e).__name__}: {str(e)}")
+                continue
+
+            if not new_ideas:
+                print("No new ideas this round.")
+                continue
+
+            added += len(new_ideas)
+            print(f"✓ Added {len(new_ideas)} new idea(s)\n")
+            phase7._display_all_ideas(new_ideas, start=first_new)
+
+        if added and confirm(f"Save all {len(self.state['generated_ideas'])} ideas, including refinements?"):
+            phase7._expand_outlines(self.state["generated_ideas"])
+            phase7.save(
+                self.state["generated_ideas"],
+                self.state["opportunity"],
+                self.state["context"],
+                self.state["criteria"]
+            )
@@ -0,0 +1,107 @@
+"""
+Session Payload - Non-interactive session inputs stored as JSON
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List
+
+from idea_model import intern_criteria, share_strings
+
+
+# A session payload holds the output of phases 1-5:
+# {
+#     "opportunity": {"description": "...", "who": "...", ...},
+#     "context": {"icp": "...", "constraints": "...", ...},
+#     "criteria": {"weights": {"Impact on #1 product metric": 5, ...}},
+#     "competitive_insights": [{"url": "...", "notes": "..."}],
+#     "example_ideas": [{"description": "..."}]
+# }
+PAYLOAD_KEYS = ["opportunity", "context", "criteria", "competitive_insights", "example_ideas"]
+
+# Longest custom ID the batch API accepts
+MAX_SESSION_ID_CHARS = 64
+
+
+def session_id_for(path: str) -> str:
+    """Derive a session ID from a payload file name (safe for provider custom IDs).
+
+    Names that had to be cleaned up or shortened get a hash of the
+    original name, so two files never share an ID.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    session_id = re.sub(r"[^a-zA-Z0-9_-]", "_", stem)
+    if session_id == stem and len(session_id) <= MAX_SESSION_ID_CHARS:
+        return session_id
+    suffix = hashlib.sha256(stem.encode("utf-8")).hexdigest()[:8]
+    return f"{session_id[:MAX_SESSION_ID_CHARS - len(suffix) - 1]}_{suffix}"
+
+
+def opportunity_hash(opportunity: Dict[str, Any]) -> str:
+    """Stable short hash of an opportunity, for grouping sessions on the same problem."""
+    canonical = json.dumps(opportunity, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def validate_session_payload(payload: Any) -> List[str]:
+    """Check a payload has what phase 6 needs. Returns a list of problems."""
+    if not isinstance(payload, dict):
+        return ["payload must be a JSON object"]
+
+    problems = []
+    if not (payload.get("opportunity") or {}).get("description"):
+        problems.append("opportunity.description is required")
+    weights = (payload.get("criteria") or {}).get("weights")
+    if not isinstance(weights, dict) or not weights:
+        problems.append("criteria.weights must map criteria to 1-5 weights")
+    return problems
+
+
+def normalize_session_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill optional sections with the empty values the phases would produce."""
+    normalized = {
+        "opportunity": dict(payload.get("opportunity") or {}),
+        "context": dict(payload.get("context") or {}),
+        "criteria": dict(payload.get("criteria") or {}),
+        "competitive_insights": list(payload.get("competitive_insights") or []),
+        "example_ideas": list(payload.get("example_ideas") or []),
+    }
+    normalized["criteria"].setdefault("criteria_list", list(normalized["criteria"].get("weights", {})))
+
+    # Queued sessions often repeat the same context and criteria; keep one copy
+    intern_criteria(normalized["criteria"])
+    for key in ("opportunity", "context", "competitive_insights", "example_ideas"):
+        share_strings(normalized[key])
+    return normalized
+
+
+def load_session_payload(path: str) -> Dict[str, Any]:
+    """Load and validate a session payload file.
+
+    Raises:
+        ValueError: if the file is not a valid session payload
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+
+    problems = validate_session_payload(payload)
+    if problems:
+        raise ValueError(f"{path}: " + "; ".join(problems))
+
+    return normalize_session_payload(payload)
+
+
+def load_session_queue(queue_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Load every *.json payload in a directory, keyed by session ID."""
+    sessions = {}
+    for filename in sorted(os.listdir(queue_dir)):
+        if not filename.endswith(".json") or filename.startswith("."):
+            continue
+        path = os.path.join(queue_dir, filename)
+        try:
+            sessions[session_id_for(path)] = load_session_payload(path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Skipping {filename}: {str(e)}")
+    return sessions
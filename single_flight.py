@@ -0,0 +1,91 @@
+"""
+Single Flight - Coalesce identical in-flight generation requests
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """In-flight request table keyed by request hash.
+
+    The first caller for a key runs the request; callers that arrive with
+    the same key while it is still running wait on the same future and
+    receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per key at a time.
+
+        Returns:
+            (result, shared) where shared is True if the result came from
+            another caller's request
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of distinct requests currently running."""
+        with self._lock:
+            return len(self._calls)
+
+
+def request_key(
+    provider: str,
+    model: Optional[str],
+    prompt: str,
+    max_tokens: Optional[int],
+    thinking_budget: int = 0,
+    temperature: Optional[float] = None,
+    **params: Any
+) -> str:
+    """Build a stable hash over everything that shapes a request's response.
+
+    Requests only share a flight when provider, model, output cap,
+    thinking budget, temperature, prompt and any other params all match.
+    """
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "prompt": prompt,
+        "max_tokens": max_tokens,
+        "thinking_budget": thinking_budget,
+        "temperature": temperature,
+        "params": params,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Process-wide table shared by all sessions
+_flight = SingleFlight()
+
+
+def do(key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+    """Run fn through the shared in-flight table."""
+    return _flight.do(key, fn)
@@ -0,0 +1,384 @@
+"""
+Spend Ledger - Token and cost accounting with per-session, per-batch and daily budgets
+"""
+
+import contextvars
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still single writes
+    fcntl = None
+
+from budget_controller import MIN_THINKING_BUDGET, estimate_tokens
+
+
+# USD per million tokens: input, output, cache write, cache read. Models are
+# matched by the longest prefix; extend or override with IDEATION_PRICES.
+PRICES: Dict[str, Tuple[float, float, float, float]] = {
+    "claude-opus-4-5": (5.00, 25.00, 6.25, 0.50),
+    "claude-opus-4": (15.00, 75.00, 18.75, 1.50),
+    "claude-sonnet-4": (3.00, 15.00, 3.75, 0.30),
+    "claude-haiku-4": (1.00, 5.00, 1.25, 0.10),
+    "gpt-5.2": (1.75, 14.00, 1.75, 0.175),
+    "gpt-5": (1.25, 10.00, 1.25, 0.125),
+    "synthetic": (0.0, 0.0, 0.0, 0.0),
+}
+
+# Message batches are billed at half the standard price
+BATCH_DISCOUNT = 0.5
+
+# Fewest ideas a generation request is cut down to before it is refused
+MIN_DEGRADED_IDEAS = 3
+
+LEDGER_DIRNAME = "ledger"
+
+# The reservation of the call in progress, so its ledger line can carry the
+# pre-estimate it was admitted with
+_reservation: contextvars.ContextVar = contextvars.ContextVar("ideation_reservation", default=None)
+
+# Spend per day across this process's ledgers, which is all the daily budget
+# can see when the ledger file is disabled
+_process_spend: Dict[str, float] = {}
+_process_lock = threading.Lock()
+_warned_unshared = False
+
+
+class BudgetExceededError(Exception):
+    """A call was refused because it could take spend past a budget."""
+
+
+def model_name(config: Any) -> str:
+    """The model the configured provider calls."""
+    provider = config.get_model_provider()
+    return {"openai": config.openai_model, "synthetic": "synthetic"}.get(provider, config.model)
+
+
+def price_for(model: str, overrides: Optional[Dict[str, Any]] = None) -> Tuple[float, float, float, float]:
+    """Per-million-token prices for a model.
+
+    Unknown models are priced like the most expensive known one, so a
+    budget is never under-counted.
+    """
+    table = dict(PRICES)
+    for name, prices in (overrides or {}).items():
+        table[name] = tuple(float(price) for price in prices)
+    matches = [name for name in table if model.startswith(name)]
+    if matches:
+        return table[max(matches, key=len)]
+    return max(table.values(), key=lambda prices: prices[1])
+
+
+def usage_tokens(usage: Any) -> Dict[str, int]:
+    """Billed token counts from either provider's usage object.
+
+    input_tokens excludes cached tokens: Anthropic reports cache writes and
+    reads separately, OpenAI includes its cached tokens in prompt_tokens.
+    """
+    if hasattr(usage, "prompt_tokens"):
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        return {
+            "input_tokens": (usage.prompt_tokens or 0) - cached,
+            "output_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "cache_write_tokens": 0,
+            "cache_read_tokens": cached,
+        }
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+    }
+
+
+def tokens_cost(
+    prices: Tuple[float, float, float, float],
+    tokens: Dict[str, int],
+    batch: bool = False
+) -> float:
+    """USD cost of a set of token counts."""
+    cost = (
+        tokens.get("input_tokens", 0) * prices[0]
+        + tokens.get("output_tokens", 0) * prices[1]
+        + tokens.get("cache_write_tokens", 0) * prices[2]
+        + tokens.get("cache_read_tokens", 0) * prices[3]
+    ) / 1e6
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+class SpendLedger:
+    """Accounts for every provider call of a session and enforces budgets.
+
+    Calls are admitted against a worst-case pre-estimate (the estimated
+    prompt tokens plus the full output cap), held as a reservation while
+    they run, and then charged at the usage the provider reports, cache
+    reads and writes included. Each charge is appended as one JSON line
+    to a per-day file under the ledger directory, which is also how the
+    daily budget sees spend from other sessions and processes.
+    """
+
+    def __init__(self, config: Any, source: str = "interactive"):
+        self.config = config
+        self.source = source
+        self.session_id = uuid.uuid4().hex[:12]
+        self.directory = os.path.join(config.output_dir, LEDGER_DIRNAME)
+        self.totals: Dict[str, float] = {
+            "input_tokens": 0, "output_tokens": 0, "cache_write_tokens": 0, "cache_read_tokens": 0,
+            "calls": 0, "cost_usd": 0.0,
+        }
+        self.reserved = 0.0
+        self._lock = threading.Lock()
+        # Today's spend as read from the ledger file, and how far it was read
+        self._day: Optional[str] = None
+        self._day_offset = 0
+        self._day_spent = 0.0
+        self._warn_unshared_daily_budget()
+
+    def prices(self, model: str) -> Tuple[float, float, float, float]:
+        """Per-million-token prices for a model, with configured overrides."""
+        return price_for(model, self.config.price_overrides)
+
+    def estimate(self, model: str, input_tokens: int, max_output_tokens: int, batch: bool = False) -> float:
+        """Worst-case USD cost of a call: every input token plus the full output cap."""
+        return tokens_cost(
+            self.prices(model),
+            {"input_tokens": input_tokens, "output_tokens": max_output_tokens},
+            batch
+        )
+
+    def estimate_prompt(self, model: str, prompt: str, max_output_tokens: int) -> float:
+        """Worst-case USD cost of sending a prompt."""
+        return self.estimate(model, estimate_tokens(prompt), max_output_tokens)
+
+    def remaining(self) -> Optional[float]:
+        """USD left under the tightest session or daily budget (None when unlimited)."""
+        with self._lock:
+            return self._remaining()
+
+    def day_spent(self) -> float:
+        """USD charged today across all sessions that share the ledger directory."""
+        with self._lock:
+            return self._refresh_day()
+
+    def fit(self, plan: Dict[str, int], model: str) -> Dict[str, int]:
+        """Shrink a generation plan until its worst case fits the budgets.
+
+        The thinking budget is cut first, then the number of ideas. With
+        the "refuse" action, or when even the smallest plan does not fit,
+        BudgetExceededError is raised instead.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return plan
+
+        prices = self.prices(model)
+        if prices[1] <= 0:
+            return plan
+        input_cost = plan["prompt_tokens"] * prices[0] / 1e6
+        allowed_output = int((remaining - input_cost) * 1e6 / prices[1])
+        if plan["max_tokens"] <= allowed_output:
+            return plan
+
+        needed = self.estimate(model, plan["prompt_tokens"], plan["max_tokens"])
+        if self.config.budget_action != "degrade":
+            raise BudgetExceededError(
+                f"Request needs up to ${needed:.4f} but only ${max(remaining, 0):.4f} is left in the budget"
+            )
+
+        thinking = plan["thinking_budget"]
+        text_tokens = plan["max_tokens"] - thinking
+        idea_count = plan["idea_count"]
+        if thinking:
+            thinking = max(min(thinking, allowed_output - text_tokens), MIN_THINKING_BUDGET)
+
+        if thinking + text_tokens > allowed_output:
+            per_idea = text_tokens / max(idea_count, 1)
+            idea_count = int((allowed_output - thinking) / per_idea) if per_idea > 0 else 0
+            text_tokens = int(idea_count * per_idea)
+            if idea_count < MIN_DEGRADED_IDEAS or (thinking and text_tokens < MIN_THINKING_BUDGET):
+                raise BudgetExceededError(
+                    f"Only ${max(remaining, 0):.4f} is left in the budget, "
+                    f"not enough for {MIN_DEGRADED_IDEAS} ideas"
+                )
+
+        return {
+            **plan,
+            "thinking_budget": thinking,
+            "max_tokens": thinking + text_tokens,
+            "idea_count": min(idea_count, plan["idea_count"]),
+            "degraded": 1,
+        }
+
+    @contextmanager
+    def reserve(self, cost: float, input_tokens: int = 0) -> Iterator[None]:
+        """Hold a call's worst-case cost against the budgets while it runs.
+
+        Raises BudgetExceededError (before the call is made) if the
+        reservation would take spend past a budget.
+        """
+        # Checked and reserved under one lock, so concurrent calls cannot
+        # all pass the check and overspend together
+        with self._lock:
+            remaining = self._remaining()
+            if remaining is not None and cost > remaining:
+                raise BudgetExceededError(
+                    f"Call needs up to ${cost:.4f} but only ${max(remaining, 0):.4f} is left in the budget"
+                )
+            self.reserved += cost
+        token = _reservation.set({"estimated_cost_usd": cost, "estimated_input_tokens": input_tokens})
+        try:
+            yield
+        finally:
+            _reservation.reset(token)
+            with self._lock:
+                self.reserved -= cost
+
+    def record(
+        self,
+        usage: Any,
+        model: str,
+        provider: str,
+        purpose: str,
+        batch: bool = False,
+        estimated: bool = False,
+        session_id: Optional[str] = None
+    ) -> float:
+        """Charge a completed call at its reported usage and append it to the ledger.
+
+        Returns its USD cost. estimated marks usage that was inferred rather
+        than reported (a stream cancelled before the provider's totals).
+        """
+        tokens = usage_tokens(usage)
+        cost = tokens_cost(self.prices(model), tokens, batch)
+        with self._lock:
+            for key, count in tokens.items():
+                self.totals[key] += count
+            self.totals["calls"] += 1
+            self.totals["cost_usd"] += cost
+
+        if not self.config.ledger_enabled:
+            with _process_lock:
+                day = date.today().isoformat()
+                _process_spend[day] = _process_spend.get(day, 0.0) + cost
+        else:
+            entry = {
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "session_id": session_id or self.session_id,
+                "source": self.source,
+                "purpose": purpose,
+                "provider": provider,
+                "model": model,
+                **tokens,
+                "cost_usd": round(cost, 6),
+                "batch": batch,
+                "estimated": estimated,
+            }
+            reservation = _reservation.get()
+            if reservation:
+                entry["estimated_input_tokens"] = reservation["estimated_input_tokens"]
+                entry["estimated_cost_usd"] = round(reservation["estimated_cost_usd"], 6)
+            self._append(entry)
+        return cost
+
+    def summary(self) -> str:
+        """One line with the session's calls, tokens and cost."""
+        totals = self.totals
+        cached = totals["cache_read_tokens"] + totals["cache_write_tokens"]
+        return (
+            f"Spend: ${totals['cost_usd']:.4f} over {int(totals['calls'])} call(s) "
+            f"({int(totals['input_tokens']):,} input, {int(totals['output_tokens']):,} output, "
+            f"{int(cached):,} cached tokens)"
+        )
+
+    def _path(self, day: str) -> str:
+        """The ledger file for a day (YYYY-MM-DD)."""
+        return os.path.join(self.directory, f"spend_{day}.jsonl")
+
+    def _append(self, entry: Dict[str, Any]):
+        """Append one entry with a single locked write."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            data = (json.dumps(entry) + "\n").encode("utf-8")
+            fd = os.open(self._path(entry["time"][:10]), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            # Accounting still holds in memory; only the record is lost
+            print(f"  Warning: Could not write the spend ledger: {str(e)}")
+
+    def _warn_unshared_daily_budget(self):
+        """Say once that, without the ledger file, the daily budget is per process."""
+        global _warned_unshared
+        if self.config.daily_budget_usd > 0 and not self.config.ledger_enabled:
+            with _process_lock:
+                if _warned_unshared:
+                    return
+                _warned_unshared = True
+            print(
+                "  Warning: IDEATION_LEDGER=0, so IDEATION_DAILY_BUDGET_USD only counts "
+                "this process's spend, not other sessions or earlier runs"
+            )
+
+    def _remaining(self) -> Optional[float]:
+        """remaining(), with the lock held."""
+        limits = []
+        if self.config.session_budget_usd > 0:
+            limits.append(self.config.session_budget_usd - self.totals["cost_usd"] - self.reserved)
+        if self.config.daily_budget_usd > 0:
+            limits.append(self.config.daily_budget_usd - self._refresh_day() - self.reserved)
+        return min(limits) if limits else None
+
+    def _refresh_day(self) -> float:
+        """Today's spend, reading only ledger lines added since the last call (lock held)."""
+        today = date.today().isoformat()
+        if not self.config.ledger_enabled:
+            # Nothing is written to disk, so only this process's spend is known
+            with _process_lock:
+                return _process_spend.get(today, 0.0)
+        if today != self._day:
+            self._day, self._day_offset, self._day_spent = today, 0, 0.0
+        try:
+            with open(self._path(today), 'rb') as f:
+                f.seek(self._day_offset)
+                data = f.read()
+        except OSError:
+            return self._day_spent
+
+        # A line still being written has no newline yet; read it next time
+        complete = data[:data.rfind(b"\n") + 1]
+        self._day_offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                self._day_spent += float(json.loads(line).get("cost_usd", 0))
+            except (ValueError, AttributeError, TypeError):
+                continue
+        return self._day_spent
+
+
+def read_ledger(output_dir: str, days: int) -> List[Dict[str, Any]]:
+    """Ledger entries from the last `days` days, oldest first."""
+    directory = os.path.join(output_dir, LEDGER_DIRNAME)
+    entries = []
+    for offset in range(days - 1, -1, -1):
+        day = (date.today() - timedelta(days=offset)).isoformat()
+        try:
+            with open(os.path.join(directory, f"spend_{day}.jsonl"), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+    return entries
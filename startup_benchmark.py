@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Time from launching the CLI to its first prompt
+
+Exits with status 1 when startup regresses, so it can gate CI:
+  - heavy modules (provider SDKs, NumPy, later phases) must not be imported
+    before the first prompt
+  - the median time to first prompt, minus a bare interpreter start, must
+    stay within the budget (and within a saved baseline, if one is given)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The first thing the interactive session asks for ends with this prompt marker
+FIRST_PROMPT = b"\n> "
+
+# Modules that must stay unloaded until they are needed
+DEFERRED_MODULES = [
+    "anthropic",
+    "openai",
+    "httpx",
+    "numpy",
+    "pyarrow",
+    "pydoc",
+    "phase6_generation",
+    "phase7_output",
+    "batch_runner",
+    "warm_daemon",
+    "refinement",
+]
+
+# Allowed time to first prompt on top of a bare interpreter start
+DEFAULT_BUDGET_MS = 60.0
+# Allowed slowdown against a saved baseline
+BASELINE_TOLERANCE = 1.25
+
+
+def time_to_first_prompt(timeout: float = 30.0) -> float:
+    """Launch the CLI once and return the seconds until its first prompt."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "ideation_agent.py")],
+        cwd=HERE,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    output = b""
+    try:
+        while FIRST_PROMPT not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError("CLI exited before showing a prompt")
+            output += chunk
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError("Timed out waiting for the first prompt")
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+        process.stdout.close()
+        process.stdin.close()
+
+
+def time_bare_interpreter() -> float:
+    """Seconds for the same interpreter to start and exit doing nothing."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def loaded_deferred_modules() -> List[str]:
+    """Deferred modules that importing the CLI entry point pulls in."""
+    code = (
+        "import json, sys; import ideation_agent; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def run(runs: int, budget_ms: float, baseline_path: Optional[str], save_path: Optional[str]) -> bool:
+    """Run the benchmark and print a report. Returns True when it passes."""
+    passed = True
+
+    loaded = loaded_deferred_modules()
+    if loaded:
+        print(f"✗ Imported at startup: {', '.join(loaded)}")
+        passed = False
+    else:
+        print("✓ No deferred modules imported at startup")
+
+    # One warm-up run so file system caches do not skew the first sample
+    time_to_first_prompt()
+    prompt_times = [time_to_first_prompt() for _ in range(runs)]
+    bare_times = [time_bare_interpreter() for _ in range(runs)]
+
+    prompt_ms = statistics.median(prompt_times) * 1000
+    bare_ms = statistics.median(bare_times) * 1000
+    overhead_ms = prompt_ms - bare_ms
+    print(f"  Time to first prompt: {prompt_ms:.1f} ms (median of {runs})")
+    print(f"  Bare interpreter:     {bare_ms:.1f} ms")
+    print(f"  Startup overhead:     {overhead_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    if overhead_ms > budget_ms:
+        print("✗ Startup overhead is over budget")
+        passed = False
+
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        limit = baseline["overhead_ms"] * BASELINE_TOLERANCE
+        print(f"  Baseline overhead:    {baseline['overhead_ms']:.1f} ms (limit {limit:.1f} ms)")
+        if overhead_ms > limit:
+            print("✗ Startup overhead regressed against the baseline")
+            passed = False
+
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump({"prompt_ms": prompt_ms, "bare_ms": bare_ms, "overhead_ms": overhead_ms}, f, indent=2)
+        print(f"  Saved results to {save_path}")
+
+    print("✓ Startup benchmark passed" if passed else "✗ Startup benchmark failed")
+    return passed
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark CLI time to first prompt")
+    parser.add_argument("--runs", type=int, default=10, help="Number of timed launches")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("IDEATION_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help="Allowed startup overhead over a bare interpreter"
+    )
+    parser.add_argument("--baseline", help="Fail if slower than the results saved in this file")
+    parser.add_argument("--save", help="Save these results (e.g. as a new baseline)")
+    args = parser.parse_args()
+
+    sys.exit(0 if run(args.runs, args.budget_ms, args.baseline, args.save) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Structured Output - Tool-use schema, validation and repair for generated ideas
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from idea_model import Idea
+
+
+IDEAS_TOOL_NAME = "submit_ideas"
+
+IDEA_TEXT_FIELDS = [
+    ("description", "Description"),
+    ("addresses_opportunity", "How it addresses the opportunity"),
+    ("expected_impact", "Expected impact"),
+    ("implementation_considerations", "Implementation considerations"),
+]
+
+MAX_TITLE_LENGTH = 120
+
+
+def build_ideas_schema(criteria_names: List[str]) -> Dict[str, Any]:
+    """Build the JSON schema for a batch of ideas scored against the given criteria."""
+    sub_score_properties = {
+        name: {"type": "integer", "minimum": 1, "maximum": 5}
+        for name in criteria_names
+    }
+
+    idea_properties: Dict[str, Any] = {
+        "id": {"type": "integer", "minimum": 1},
+        "title": {"type": "string", "maxLength": MAX_TITLE_LENGTH},
+    }
+    for field, _ in IDEA_TEXT_FIELDS:
+        idea_properties[field] = {"type": "string"}
+    idea_properties["sub_scores"] = {
+        "type": "object",
+        "properties": sub_score_properties,
+        "required": list(criteria_names),
+    }
+
+    return {
+        "type": "object",
+        "properties": {
+            "ideas": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": idea_properties,
+                    "required": list(idea_properties.keys()),
+                },
+            },
+            "top_ranked": {
+                "type": "array",
+                "maxItems": 3,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer", "minimum": 1},
+                        "reasoning": {"type": "string"},
+                    },
+                    "required": ["id", "reasoning"],
+                },
+            },
+        },
+        "required": ["ideas", "top_ranked"],
+    }
+
+
+def build_ideas_tool(criteria_names: List[str]) -> Dict[str, Any]:
+    """Build the Anthropic tool definition used to return ideas."""
+    return {
+        "name": IDEAS_TOOL_NAME,
+        "description": "Submit the generated ideas, their per-criterion scores and the top 3 ranking.",
+        "input_schema": build_ideas_schema(criteria_names),
+    }
+
+
+def structured_instructions(criteria_names: List[str], idea_range: str = "7-10") -> str:
+    """Instructions that replace the markdown format when structured output is used."""
+    criteria_list = "\n".join(f"- {name}" for name in criteria_names)
+    return f"""
+Generate {idea_range} innovative solution ideas and submit them with the `{IDEAS_TOOL_NAME}` tool.
+
+For each idea provide:
+- id: sequential number starting at 1
+- title: a clear, compelling title (5-10 words)
+- description: a detailed explanation of the solution (2-4 paragraphs)
+- addresses_opportunity: specific connection to the problem/desire
+- expected_impact: how it drives the primary metric
+- implementation_considerations: key aspects to consider
+- sub_scores: an integer score from 1 (poor) to 5 (excellent) for each criterion:
+{criteria_list}
+
+Then fill top_ranked with the ids of the top 3 ideas, best first, each with reasoning based on the evaluation criteria.
+"""
+
+
+def validate_idea_item(item: Any, criteria_names: List[str]) -> List[str]:
+    """Validate a single idea item. Returns a list of error messages (empty if valid)."""
+    if not isinstance(item, dict):
+        return ["idea must be an object"]
+
+    errors = []
+
+    if not isinstance(item.get("id"), int) or item["id"] < 1:
+        errors.append("id must be a positive integer")
+
+    title = item.get("title")
+    if not isinstance(title, str) or not title.strip():
+        errors.append("title must be a non-empty string")
+    elif len(title) > MAX_TITLE_LENGTH:
+        errors.append(f"title must be at most {MAX_TITLE_LENGTH} characters")
+
+    for field, _ in IDEA_TEXT_FIELDS:
+        value = item.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f"{field} must be a non-empty string")
+
+    sub_scores = item.get("sub_scores")
+    if not isinstance(sub_scores, dict):
+        errors.append("sub_scores must be an object")
+    else:
+        for name in criteria_names:
+            score = sub_scores.get(name)
+            if isinstance(score, bool) or not isinstance(score, (int, float)):
+                errors.append(f"sub_scores['{name}'] is missing")
+            elif not 1 <= score <= 5:
+                errors.append(f"sub_scores['{name}'] must be between 1 and 5")
+
+    return errors
+
+
+def validate_ideas_payload(
+    payload: Any,
+    criteria_names: List[str]
+) -> Tuple[List[Dict[str, Any]], Dict[int, List[str]]]:
+    """Validate a structured ideas payload.
+
+    Returns:
+        (items, errors) where items is the list of idea items and errors
+        maps the position of each invalid item to its error messages
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("ideas"), list):
+        raise ValueError("Structured response is missing the 'ideas' array")
+
+    items = payload["ideas"]
+    errors = {}
+    for position, item in enumerate(items):
+        item_errors = validate_idea_item(item, criteria_names)
+        if item_errors:
+            errors[position] = item_errors
+
+    return items, errors
+
+
+def build_repair_message(items: List[Any], errors: Dict[int, List[str]]) -> str:
+    """Describe the invalid items so the model can regenerate only those."""
+    lines = [
+        "Some ideas failed schema validation. Regenerate ONLY the ideas listed below,",
+        f"keeping the same id for each, and submit them with the `{IDEAS_TOOL_NAME}` tool.",
+        "Leave top_ranked empty.",
+        "",
+    ]
+    for position, item_errors in sorted(errors.items()):
+        item = items[position]
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(item_id, int):
+            item_id = position + 1
+        lines.append(f"Idea id {item_id}:")
+        for error in item_errors:
+            lines.append(f"  - {error}")
+        lines.append(f"  Previous value: {json.dumps(item)[:500]}")
+    return "\n".join(lines)
+
+
+def merge_repaired_items(
+    items: List[Any],
+    errors: Dict[int, List[str]],
+    repaired: List[Any],
+    criteria_names: List[str]
+) -> Dict[int, List[str]]:
+    """Replace invalid items with valid repaired ones, matched by id.
+
+    Returns the errors that remain after the merge.
+    """
+    repaired_by_id = {
+        item["id"]: item
+        for item in repaired
+        if isinstance(item, dict) and isinstance(item.get("id"), int)
+    }
+
+    remaining = {}
+    for position, item_errors in errors.items():
+        item = items[position]
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(item_id, int):
+            item_id = position + 1
+
+        candidate = repaired_by_id.get(item_id)
+        if candidate is not None and not validate_idea_item(candidate, criteria_names):
+            items[position] = candidate
+        else:
+            remaining[position] = item_errors
+
+    return remaining
+
+
+def ideas_from_payload(
+    payload: Dict[str, Any],
+    items: List[Any],
+    errors: Dict[int, List[str]],
+    weights: Dict[str, int]
+) -> List[Idea]:
+    """Convert validated idea items into the session's ideas.
+
+    Items that are still invalid are dropped.
+    """
+    reasoning_by_id = {}
+    rank_by_id = {}
+    for entry in payload.get("top_ranked") or []:
+        if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+            if entry["id"] not in rank_by_id and len(rank_by_id) < 3:
+                rank_by_id[entry["id"]] = len(rank_by_id) + 1
+                reasoning_by_id[entry["id"]] = str(entry.get("reasoning", "")).strip()
+
+    ideas = []
+    for position, item in enumerate(items):
+        if position in errors:
+            continue
+
+        sections = []
+        for field, heading in IDEA_TEXT_FIELDS:
+            sections.append(f"**{heading}:**\n{item[field].strip()}")
+        if reasoning_by_id.get(item["id"]):
+            sections.append(f"**Force Ranking Reasoning:**\n{reasoning_by_id[item['id']]}")
+
+        sub_scores = {name: item["sub_scores"][name] for name in weights}
+
+        ideas.append(Idea(
+            title=item["title"].strip(),
+            content="\n\n".join(sections),
+            score=weighted_criteria_score(sub_scores, weights),
+            rank=rank_by_id.get(item["id"]),
+            sub_scores=sub_scores,
+        ))
+
+    return ideas
+
+
+def weighted_criteria_score(sub_scores: Dict[str, float], weights: Dict[str, int]) -> float:
+    """Combine 1-5 criterion scores into a 0-100 score using the criteria weights."""
+    total_weight = sum(weights.values())
+    if not total_weight:
+        return 0.0
+
+    weighted = sum(sub_scores.get(name, 0) * weight for name, weight in weights.items())
+    return round(weighted / (total_weight * 5) * 100, 1)
+
+
+def parse_json_payload(text: Optional[str]) -> Any:
+    """Parse a JSON payload, tolerating a surrounding markdown code fence."""
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return json.loads(text)
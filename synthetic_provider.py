@@ -0,0 +1,163 @@
+"""
+Synthetic Provider - Deterministic generation responses for load testing
+"""
+
+import math
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional
+
+from idea_stream import REQUIRED_SECTIONS
+
+
+WORDS = (
+    "users customers team workflow onboarding retention signal dashboard insight "
+    "automation template feedback metric growth pricing trial mobile search alert "
+    "report sync integration export segment cohort funnel activation habit reminder "
+    "personalized contextual adaptive shared weekly instant guided smart lightweight "
+    "reduce increase surface predict suggest simplify highlight prioritize connect "
+    "measure learn recommend streamline detect schedule summarize compare unlock"
+).split()
+
+TITLE_WORDS = (
+    "Smart Guided Adaptive Shared Instant Contextual Predictive Weekly Personal "
+    "Onboarding Insights Templates Reminders Dashboard Alerts Search Sync Digest "
+    "Checklist Assistant Playbook Nudges Signals Workspace Timeline Scorecard"
+).split()
+
+# Ways a generated idea block can be broken, as seen from real models
+MALFORMED_KINDS = ("missing_section", "empty_section", "no_title", "truncated")
+
+# Rough characters per token, for the usage a synthetic call reports
+CHARS_PER_TOKEN = 4
+
+
+class SyntheticProvider:
+    """Produces generation responses without any network calls.
+
+    Responses use the same "### IDEA" / "TOP 3 FORCE RANKED" markdown
+    format the models are asked for, with a configurable number of ideas,
+    log-normal idea lengths around a mean word count, a share of malformed
+    blocks and duplicate titles, and simulated latency. Output depends only
+    on the settings, the seed and how many calls came before, so a load
+    test sees the same text on every run.
+    """
+
+    def __init__(
+        self,
+        idea_count: int = 50,
+        mean_words: int = 150,
+        malformed_rate: float = 0.0,
+        duplicate_rate: float = 0.0,
+        latency_ms: float = 0.0,
+        chars_per_second: float = 0.0,
+        seed: int = 0,
+        chunk_chars: int = 400
+    ):
+        self.idea_count = idea_count
+        self.mean_words = mean_words
+        self.malformed_rate = malformed_rate
+        self.duplicate_rate = duplicate_rate
+        self.latency_ms = latency_ms
+        self.chars_per_second = chars_per_second
+        self.seed = seed
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "SyntheticProvider":
+        """Build a provider from the synthetic_* settings."""
+        return cls(
+            idea_count=config.synthetic_ideas,
+            mean_words=config.synthetic_words,
+            malformed_rate=config.synthetic_malformed_rate,
+            duplicate_rate=config.synthetic_duplicate_rate,
+            latency_ms=config.synthetic_latency_ms,
+            chars_per_second=config.synthetic_chars_per_second,
+            seed=config.synthetic_seed
+        )
+
+    def complete(self, prompt: str) -> str:
+        """Return a full response after the simulated latency."""
+        text = self.response()
+        self._wait(self.latency_ms / 1000 + self._transfer_seconds(len(text)))
+        return text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield a response in chunks, paced like a streamed generation."""
+        text = self.response()
+        self._wait(self.latency_ms / 1000)
+        for start in range(0, len(text), self.chunk_chars):
+            chunk = text[start:start + self.chunk_chars]
+            self._wait(self._transfer_seconds(len(chunk)))
+            yield chunk
+
+    def usage(self, prompt: str, text: str) -> Any:
+        """Estimated token usage, shaped like a provider's usage object."""
+        return SimpleNamespace(
+            input_tokens=len(prompt) // CHARS_PER_TOKEN,
+            output_tokens=len(text) // CHARS_PER_TOKEN
+        )
+
+    def response(self) -> str:
+        """Generate the next response text."""
+        rng = random.Random(f"{self.seed}:{self.calls}")
+        self.calls += 1
+
+        titles: List[str] = []
+        parts = []
+        for number in range(1, self.idea_count + 1):
+            if titles and rng.random() < self.duplicate_rate:
+                title = rng.choice(titles)
+            else:
+                title = self._title(rng, number)
+            titles.append(title)
+
+            malformed = rng.choice(MALFORMED_KINDS) if rng.random() < self.malformed_rate else None
+            parts.append(self._idea_block(rng, number, title, malformed))
+
+        parts.append("## TOP 3 FORCE RANKED IDEAS\n")
+        for rank, title in enumerate(titles[:3], 1):
+            parts.append(f"{rank}. **{title}** - {self._sentence(rng, 12)}\n")
+        return "\n".join(parts)
+
+    def _idea_block(self, rng: random.Random, number: int, title: str, malformed: Optional[str]) -> str:
+        """One idea block, possibly broken in the given way."""
+        words = max(int(rng.lognormvariate(math.log(self.mean_words), 0.5)), len(REQUIRED_SECTIONS) * 4)
+        per_section = words // len(REQUIRED_SECTIONS)
+
+        sections = []
+        for heading in REQUIRED_SECTIONS:
+            body = self._sentence(rng, per_section)
+            sections.append(f"{heading}\n{body}\n")
+
+        if malformed == "missing_section":
+            del sections[rng.randrange(len(sections))]
+        elif malformed == "empty_section":
+            index = rng.randrange(len(sections))
+            sections[index] = REQUIRED_SECTIONS[index] + "\n"
+
+        header = f"### IDEA {number}" if malformed == "no_title" else f"### IDEA {number}: {title}"
+        block = f"---\n{header}\n\n" + "\n".join(sections)
+        if malformed == "truncated":
+            block = block[:rng.randrange(len(header) + 5, len(block))]
+        return block
+
+    def _title(self, rng: random.Random, number: int) -> str:
+        """A readable title, numbered so only deliberate duplicates repeat."""
+        return " ".join(rng.sample(TITLE_WORDS, 3)) + f" {number}"
+
+    def _sentence(self, rng: random.Random, words: int) -> str:
+        """Filler text of the given number of words."""
+        text = " ".join(rng.choices(WORDS, k=max(words, 1)))
+        return text[0].upper() + text[1:] + "."
+
+    def _transfer_seconds(self, chars: int) -> float:
+        """Time to deliver chars at the simulated output rate."""
+        return chars / self.chars_per_second if self.chars_per_second > 0 else 0.0
+
+    def _wait(self, seconds: float):
+        """Sleep for simulated latency."""
+        if seconds > 0:
+            time.sleep(seconds)
@@ -0,0 +1,96 @@
+"""
+Terminal Render - Buffered, paged output for the CLI
+"""
+
+import shutil
+import sys
+from typing import Any, Dict, List
+
+
+def is_interactive() -> bool:
+    """Whether a person is at the terminal (stdin and stdout are both TTYs)."""
+    return sys.stdin.isatty() and sys.stdout.isatty()
+
+
+def terminal_size() -> Any:
+    """Terminal columns and lines, with sane defaults when unknown."""
+    return shutil.get_terminal_size((100, 40))
+
+
+class OutputBuffer:
+    """Collects output lines and writes them to stdout in a single call."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def line(self, text: str = ""):
+        """Add a line (text may itself contain newlines)."""
+        self.lines.append(text)
+
+    def rule(self, char: str = "=", width: int = 60):
+        """Add a horizontal rule."""
+        self.lines.append(char * width)
+
+    def text(self) -> str:
+        """Everything buffered so far."""
+        return "\n".join(self.lines) + "\n" if self.lines else ""
+
+    def flush(self):
+        """Write the buffer in one call and clear it."""
+        if self.lines:
+            sys.stdout.write(self.text())
+            sys.stdout.flush()
+            self.lines = []
+
+    def page(self):
+        """Show the buffer through the pager when it does not fit the screen."""
+        text = self.text()
+        self.lines = []
+        if is_interactive() and text.count("\n") > terminal_size().lines - 2:
+            import pydoc  # Slow to import and only needed for long output
+            pydoc.pager(text)
+        else:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+
+def add_idea_table(out: OutputBuffer, ideas: List[Dict[str, Any]], start: int = 1):
+    """Add one line per idea: number, score, rank and title cut to the terminal width."""
+    width = max(terminal_size().columns, 40)
+    out.line(f"{'#':>4}  {'Score':>6}  {'Rank':>4}  Title")
+    out.line(f"{'-' * 4}  {'-' * 6}  {'-' * 4}  {'-' * 5}")
+    title_width = width - 22
+    for i, idea in enumerate(ideas, start):
+        rank = f"#{idea['rank']}" if idea.get('rank') else ""
+        title = idea['title']
+        if len(title) > title_width:
+            title = title[:title_width - 3] + "..."
+        out.line(f"{i:>4}  {idea['score']:>6}  {rank:>4}  {title}")
+
+
+def add_idea_details(out: OutputBuffer, ideas: List[Dict[str, Any]], numbers: List[int]):
+    """Add the full write-ups of ideas, each labelled with its number."""
+    for number, idea in zip(numbers, ideas):
+        out.rule()
+        out.line(f"IDEA {number}: {idea['title']}")
+        out.rule()
+        out.line(idea['content'])
+        if idea.get('expanded') is False:
+            out.line("\n(Outline only - the full write-up is generated if you save this idea)")
+        out.line(f"\nScore: {idea['score']}/100")
+        if idea.get('rank'):
+            out.line(f"Rank: #{idea['rank']}")
+        out.line()
+
+
+def parse_numbers(text: str, low: int, high: int) -> List[int]:
+    """Parse "3, 7 9" or "3-5" into idea numbers within [low, high]."""
+    numbers = []
+    for part in text.replace(",", " ").split():
+        first, _, last = part.partition("-")
+        if not first.isdigit() or (last and not last.isdigit()):
+            continue
+        for number in range(int(first), int(last or first) + 1):
+            if low <= number <= high and number not in numbers:
+                numbers.append(number)
+    return numbers
@@ -0,0 +1,147 @@
+"""
+Batch Stub - In-process stand-in for the Anthropic message batch endpoints
+
+Serves create, retrieve and results on a local port, so BatchRunner can be
+run end to end through the real SDK with ANTHROPIC_BASE_URL pointed here.
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+
+BATCH_PATH = re.compile(r"^/v1/messages/batches/(msgbatch_\d+)(/results)?$")
+TIMESTAMP = "2026-01-01T00:00:00Z"
+
+
+def default_response(custom_id: str, params: Dict[str, Any]) -> str:
+    """Three complete ideas whose titles name the request they answer."""
+    return "".join(
+        f"---\n### IDEA {i}: {custom_id} idea {i}\n\n"
+        f"**Description:**\nA description of idea {i}.\n\n"
+        f"**How it addresses the opportunity:**\nIt helps.\n\n"
+        f"**Expected impact:**\nHigh.\n\n"
+        f"**Implementation considerations:**\nFew.\n\n"
+        for i in range(1, 4)
+    )
+
+
+class BatchStub:
+    """A message batch API on 127.0.0.1 that answers every request at once.
+
+    A batch reports "in_progress" for its first polls_until_ended retrievals
+    and "ended" after that. respond(custom_id, params) gives the text of
+    each request's result; return None to make that request error.
+    """
+
+    def __init__(
+        self,
+        respond: Callable[[str, Dict[str, Any]], Optional[str]] = default_response,
+        polls_until_ended: int = 0
+    ):
+        self.respond = respond
+        self.polls_until_ended = polls_until_ended
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.created: List[List[str]] = []  # custom_ids of each created batch, in order
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self) -> "BatchStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+    def create(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            batch_id = f"msgbatch_{len(self.batches) + 1}"
+            self.batches[batch_id] = {"requests": body["requests"], "polls": 0}
+            self.created.append([request["custom_id"] for request in body["requests"]])
+        return self._batch_object(batch_id)
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        with self._lock:
+            self.batches[batch_id]["polls"] += 1
+        return self._batch_object(batch_id)
+
+    def results(self, batch_id: str) -> bytes:
+        lines = []
+        for request in self.batches[batch_id]["requests"]:
+            text = self.respond(request["custom_id"], request["params"])
+            if text is None:
+                result = {"type": "errored", "error": {"type": "error", "error": {
+                    "type": "api_error", "message": "stub error"}}}
+            else:
+                result = {"type": "succeeded", "message": {
+                    "id": f"msg_{request['custom_id']}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": request["params"]["model"],
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 1000, "output_tokens": len(text) // 4},
+                }}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _batch_object(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.batches[batch_id]
+        ended = batch["polls"] > self.polls_until_ended
+        count = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0, "canceled": 0, "expired": 0,
+            },
+            "created_at": TIMESTAMP,
+            "expires_at": TIMESTAMP,
+            "ended_at": TIMESTAMP if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _handler_class(self) -> Any:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/v1/messages/batches":
+                    self._send(200, json.dumps(stub.create(body)).encode("utf-8"))
+                else:
+                    self._send(404, b'{"type": "error", "error": {"type": "not_found_error", "message": "no route"}}')
+
+            def do_GET(self):
+                match = BATCH_PATH.match(self.path.split("?")[0])
+                if not match or match.group(1) not in stub.batches:
+                    self._send(404, b'{"type": "error", "error": {"type": "not_found_error", "message": "no batch"}}')
+                elif match.group(2):
+                    self._send(200, stub.results(match.group(1)), "application/binary")
+                else:
+                    self._send(200, json.dumps(stub.retrieve(match.group(1))).encode("utf-8"))
+
+            def _send(self, status: int, payload: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any):
+                pass
+
+        return Handler
@@ -0,0 +1,27 @@
+"""
+Shared test setup: the agent's modules live at the repository root
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings a test must not inherit from the developer's environment
+CREDENTIALS = ("MY_API_KEY", "ANTHROPIC_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_BASE_URL", "OPENAI_BASE_URL")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A temporary working directory, with no provider credentials or IDEATION_* settings."""
+    from client_pool import close_all
+
+    monkeypatch.chdir(tmp_path)
+    for name in list(os.environ):
+        if name.startswith("IDEATION_") or name in CREDENTIALS:
+            monkeypatch.delenv(name)
+    close_all()
+    yield tmp_path
+    close_all()
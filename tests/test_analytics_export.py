@@ -0,0 +1,99 @@
+"""
+Tests for the partitioned analytics dataset and its compaction
+"""
+
+import csv
+import gzip
+from datetime import datetime
+
+import pytest
+
+from analytics_export import AnalyticsExporter, write_rows
+from config import Config
+from idea_model import Idea
+
+
+OPPORTUNITY = {"description": "Users abandon onboarding"}
+CRITERIA = {"weights": {"Impact": 5, "Effort": 2}}
+
+
+def summaries(count):
+    return [
+        Idea(title=f"Idea {i}", content="x" * (10 * i), score=50.0 + i, rank=i if i <= 3 else None,
+             sub_scores={"Impact": 4, "Effort": 2}).summary()
+        for i in range(1, count + 1)
+    ]
+
+
+def make_exporter(workdir, file_format):
+    config = Config()
+    config.output_dir = str(workdir)
+    config.analytics_format = file_format
+    return AnalyticsExporter(config)
+
+
+def read_csv_rows(partition):
+    rows = []
+    for path in sorted(partition.glob("part-*.csv.gz")):
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def partitions(root, table):
+    return list((root / table).iterdir())
+
+
+def test_each_session_adds_files_to_date_partitions(workdir):
+    exporter = make_exporter(workdir, "csv")
+    exporter.export("s1", summaries(3), OPPORTUNITY, CRITERIA, {"input_tokens": 100, "output_tokens": 50, "calls": 1})
+    exporter.export("s2", summaries(2), OPPORTUNITY, CRITERIA)
+
+    root = workdir / "analytics"
+    today = f"date={datetime.now():%Y-%m-%d}"
+    for table in ("sessions", "ideas", "scores"):
+        assert [path.name for path in partitions(root, table)] == [today]
+
+    sessions = read_csv_rows(root / "sessions" / today)
+    assert sorted((row["session_id"], row["idea_count"]) for row in sessions) == [("s1", "3"), ("s2", "2")]
+    assert len(read_csv_rows(root / "ideas" / today)) == 5
+    # One score row per idea and criterion
+    assert len(read_csv_rows(root / "scores" / today)) == 10
+
+
+def test_rows_land_in_the_partition_of_their_date(tmp_path):
+    rows = [{"session_id": "s1", "generated_at": datetime(2026, 3, 4, 12, 0, 0), "idea_index": 1}]
+    path = write_rows(str(tmp_path), "ideas", rows, "csv", "one")
+    assert path.endswith("ideas/date=2026-03-04/part-one.csv.gz")
+    assert write_rows(str(tmp_path), "ideas", [], "csv", "empty") is None
+
+
+def test_compaction_merges_small_files_and_keeps_rows(workdir):
+    exporter = make_exporter(workdir, "csv")
+    for i in range(3):
+        exporter.export(f"s{i}", summaries(2), OPPORTUNITY, CRITERIA)
+    partition = partitions(workdir / "analytics", "ideas")[0]
+    before = read_csv_rows(partition)
+
+    # Three files in each of the three tables
+    assert exporter.compact() == 9
+    assert len(list(partition.glob("part-*"))) == 1
+    assert sorted(map(sorted, (row.items() for row in read_csv_rows(partition)))) == \
+        sorted(map(sorted, (row.items() for row in before)))
+    # Nothing left to merge
+    assert exporter.compact() == 0
+
+
+def test_parquet_tables_have_the_schema_and_compact(workdir):
+    pq = pytest.importorskip("pyarrow.parquet")
+    exporter = make_exporter(workdir, "parquet")
+    exporter.export("s1", summaries(3), OPPORTUNITY, CRITERIA)
+    exporter.export("s2", summaries(1), OPPORTUNITY, CRITERIA)
+
+    partition = partitions(workdir / "analytics", "ideas")[0]
+    assert exporter.compact() == 6
+    (merged,) = partition.glob("part-*.parquet")
+    table = pq.read_table(merged)
+    assert table.num_rows == 4
+    assert str(table.schema.field("rank").type) == "int64"
+    assert sorted(table.column("title").to_pylist()) == ["Idea 1", "Idea 1", "Idea 2", "Idea 3"]
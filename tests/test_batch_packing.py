@@ -0,0 +1,92 @@
+"""
+Tests for packed batch requests, run against the local batch endpoint stub
+"""
+
+import json
+import re
+
+import pytest
+
+import batch_runner
+from batch_runner import STATE_FILENAME, BatchRunner
+from batch_stub import BatchStub, default_response
+from config import Config
+from opportunity_pack import OpportunityPacker, SECTION_MARKER
+from spend_ledger import BudgetExceededError
+
+
+PAYLOAD = {
+    "context": {"icp": "SMB finance teams"},
+    "criteria": {"weights": {"Impact": 5, "Effort": 3}},
+    "competitive_insights": [],
+    "example_ideas": [],
+}
+
+
+@pytest.fixture
+def queue_dir(workdir, monkeypatch):
+    monkeypatch.setattr(batch_runner.time, "sleep", lambda seconds: None)
+    path = workdir / "queue"
+    path.mkdir()
+    for i in range(1, 4):
+        payload = dict(PAYLOAD, opportunity={"description": f"Opportunity {i}"})
+        (path / f"s{i}.json").write_text(json.dumps(payload))
+    return path
+
+
+def run(stub, monkeypatch, queue_dir):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+    return BatchRunner(Config(), poll_interval=1.0, pack=True).run(str(queue_dir))
+
+
+def read_state(queue_dir):
+    return json.loads((queue_dir / STATE_FILENAME).read_text())
+
+
+def pack_response(skip=()):
+    """Answer packed prompts section by section, leaving out the labels in skip."""
+    def respond(custom_id, params):
+        content = params["messages"][0]["content"]
+        prompt = content if isinstance(content, str) else "".join(block.get("text", "") for block in content)
+        labels = re.findall(r"=== OPPORTUNITY (O\d+) ===", prompt)
+        if not labels:
+            return default_response(custom_id, params)
+        return "\n".join(
+            SECTION_MARKER.format(label=label) + "\n" + default_response(label, params)
+            for label in dict.fromkeys(labels) if label not in skip
+        )
+    return respond
+
+
+def test_packed_sessions_share_one_request(queue_dir, monkeypatch):
+    with BatchStub(respond=pack_response()) as stub:
+        assert run(stub, monkeypatch, queue_dir) == 3
+
+    assert len(stub.created) == 1 and len(stub.created[0]) == 1
+    completed = read_state(queue_dir)["completed"]
+    assert sorted(completed) == ["s1", "s2", "s3"]
+    with open(completed["s2"], encoding="utf-8") as f:
+        content = f.read()
+    assert "O2 idea 1" in content and "O1 idea" not in content
+
+
+def test_missing_section_is_retried_on_its_own(queue_dir, monkeypatch):
+    with BatchStub(respond=pack_response(skip={"O2"})) as stub:
+        assert run(stub, monkeypatch, queue_dir) == 3
+
+    assert stub.created[1] == ["s2"]
+    state = read_state(queue_dir)
+    assert state["failed"] == {} and state["unpack"] == []
+
+
+def test_over_budget_pack_fails_each_session(queue_dir, monkeypatch):
+    def refuse(self, pack):
+        raise BudgetExceededError("no budget left")
+
+    monkeypatch.setattr(OpportunityPacker, "params", refuse)
+    with BatchStub() as stub:
+        assert run(stub, monkeypatch, queue_dir) == 0
+
+    assert stub.created == []
+    assert read_state(queue_dir)["failed"] == {"s1": "over_budget", "s2": "over_budget", "s3": "over_budget"}
@@ -0,0 +1,138 @@
+"""
+Tests for batch mode, run through the SDK against a local batch endpoint stub
+"""
+
+import glob
+import json
+import os
+
+import pytest
+
+import batch_runner
+from batch_runner import STATE_FILENAME, BatchRunner
+from batch_stub import BatchStub, default_response
+from config import Config
+
+
+PAYLOAD = {
+    "opportunity": {"description": "Users abandon onboarding"},
+    "context": {"icp": "SMB finance teams"},
+    "criteria": {"weights": {"Impact": 5, "Effort": 3}},
+    "competitive_insights": [],
+    "example_ideas": [],
+}
+
+
+@pytest.fixture
+def queue_dir(workdir):
+    path = workdir / "queue"
+    path.mkdir()
+    return path
+
+
+def add_sessions(queue_dir, count):
+    for i in range(1, count + 1):
+        payload = dict(PAYLOAD, opportunity={"description": f"Opportunity {i}"})
+        (queue_dir / f"s{i}.json").write_text(json.dumps(payload))
+
+
+def make_runner(stub, monkeypatch, chunk_size=1000, **kwargs):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+    config = Config()
+    config.batch_chunk_size = chunk_size
+    config.batch_poll_max = 2.0
+    return BatchRunner(config, poll_interval=1.0, **kwargs)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Poll waits, recorded instead of slept."""
+    waits = []
+    monkeypatch.setattr(batch_runner.time, "sleep", waits.append)
+    return waits
+
+
+def read_state(queue_dir):
+    return json.loads((queue_dir / STATE_FILENAME).read_text())
+
+
+def test_sessions_are_submitted_in_chunks(queue_dir, monkeypatch, sleeps):
+    add_sessions(queue_dir, 5)
+    with BatchStub() as stub:
+        saved = make_runner(stub, monkeypatch, chunk_size=2).run(str(queue_dir))
+
+    assert saved == 5
+    assert stub.created == [["s1", "s2"], ["s3", "s4"], ["s5"]]
+    assert [batch["collected"] for batch in read_state(queue_dir)["batches"]] == [True] * 3
+
+
+def test_polling_backs_off_to_the_maximum(queue_dir, monkeypatch, sleeps):
+    add_sessions(queue_dir, 1)
+    with BatchStub(polls_until_ended=4) as stub:
+        make_runner(stub, monkeypatch).run(str(queue_dir))
+
+    assert sleeps == [1.0, 1.5, 2.0, 2.0]
+
+
+def test_each_session_gets_its_own_output(queue_dir, monkeypatch, sleeps):
+    add_sessions(queue_dir, 3)
+    with BatchStub() as stub:
+        make_runner(stub, monkeypatch).run(str(queue_dir))
+
+    completed = read_state(queue_dir)["completed"]
+    assert sorted(completed) == ["s1", "s2", "s3"]
+    for session_id, filepath in completed.items():
+        assert filepath.endswith(f"_{session_id}.md")
+        with open(filepath, encoding="utf-8") as f:
+            content = f.read()
+        assert f"Opportunity {session_id[1:]}" in content
+        assert f"{session_id} idea 3" in content
+        other = "s1" if session_id != "s1" else "s2"
+        assert f"{other} idea" not in content
+        sidecar = os.path.splitext(filepath)[0] + ".jsonl"
+        with open(sidecar, encoding="utf-8") as f:
+            ideas = [json.loads(line) for line in f if json.loads(line).get("type") == "idea"]
+        assert len(ideas) == 3
+
+
+def test_errored_results_are_failed_and_retried_next_run(queue_dir, monkeypatch, sleeps):
+    add_sessions(queue_dir, 2)
+    flaky = {"s2"}
+
+    def respond(custom_id, params):
+        return None if custom_id in flaky else default_response(custom_id, params)
+
+    with BatchStub(respond=respond) as stub:
+        assert make_runner(stub, monkeypatch).run(str(queue_dir)) == 1
+        assert read_state(queue_dir)["failed"] == {"s2": "errored"}
+
+        flaky.clear()
+        assert make_runner(stub, monkeypatch).run(str(queue_dir)) == 1
+    assert stub.created == [["s1", "s2"], ["s2"]]
+    assert read_state(queue_dir)["failed"] == {}
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(queue_dir, monkeypatch):
+    add_sessions(queue_dir, 3)
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+
+    with BatchStub(polls_until_ended=1) as stub:
+        monkeypatch.setattr(batch_runner.time, "sleep", interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            make_runner(stub, monkeypatch, chunk_size=2).run(str(queue_dir))
+
+        state = read_state(queue_dir)
+        assert [batch["custom_ids"] for batch in state["batches"]] == [["s1", "s2"], ["s3"]]
+        assert state["completed"] == {}
+
+        monkeypatch.setattr(batch_runner.time, "sleep", lambda seconds: None)
+        assert make_runner(stub, monkeypatch, chunk_size=2).run(str(queue_dir)) == 3
+        # Nothing was submitted twice, and a further run has nothing to do
+        assert len(stub.created) == 2
+        assert make_runner(stub, monkeypatch, chunk_size=2).run(str(queue_dir)) == 0
+        assert len(stub.created) == 2
+
+    assert len(glob.glob(os.path.join("ideation_outputs", "ideation_session_*.md"))) == 3
@@ -0,0 +1,150 @@
+"""
+Tests for BudgetController planning and learning
+"""
+
+from types import SimpleNamespace
+
+import threading
+
+import pytest
+
+from budget_controller import DEFAULT_STATS, MIN_THINKING_BUDGET, BudgetController, thinking_params
+
+
+def make_controller(tmp_path, **overrides):
+    settings = {
+        "output_dir": str(tmp_path),
+        "max_tokens": 16000,
+        "max_thinking_budget": 10000,
+        "latency_slo_seconds": 600,
+    }
+    settings.update(overrides)
+    return BudgetController(SimpleNamespace(**settings))
+
+
+def ideas_text(count, chars_per_idea=1800):
+    return "".join(f"### IDEA {i}: Title {i}\n" + "x" * chars_per_idea + "\n" for i in range(1, count + 1))
+
+
+@pytest.mark.parametrize("cap", [2048, 3000, 8000, 16000])
+def test_plan_stays_under_output_cap(tmp_path, cap):
+    controller = make_controller(tmp_path, max_tokens=cap)
+    plan = controller.plan("x" * 40000, 10)
+    assert plan["max_tokens"] <= cap
+    assert plan["thinking_budget"] >= MIN_THINKING_BUDGET
+    assert plan["max_tokens"] > plan["thinking_budget"]
+
+
+@pytest.mark.parametrize("cap", [512, 1024, 1500, 2047])
+def test_small_output_cap_turns_thinking_off(tmp_path, cap):
+    controller = make_controller(tmp_path, max_tokens=cap)
+    plan = controller.plan("x" * 40000, 10)
+    assert plan["thinking_budget"] == 0
+    assert 0 < plan["max_tokens"] <= cap
+    assert thinking_params(plan, 0.7) == {"temperature": 0.7}
+
+
+def test_plan_max_tokens_override_is_a_cap(tmp_path):
+    controller = make_controller(tmp_path, max_tokens=64000)
+    plan = controller.plan("x" * 40000, 10, max_tokens=4000)
+    assert plan["max_tokens"] <= 4000
+    assert plan["max_tokens"] - plan["thinking_budget"] >= MIN_THINKING_BUDGET
+
+
+def test_plan_scales_with_idea_count(tmp_path):
+    controller = make_controller(tmp_path)
+    assert controller.plan("prompt", 10)["max_tokens"] > controller.plan("prompt", 3)["max_tokens"]
+
+
+def test_record_short_output_raises_thinking_ratio(tmp_path):
+    controller = make_controller(tmp_path)
+    plan = controller.plan("x" * 8000, 10)
+    before = controller.stats["thinking_per_prompt_token"]
+
+    text = ideas_text(4)
+    controller.record(plan, SimpleNamespace(output_tokens=plan["max_tokens"]), "end_turn", 10.0, text, ideas_parsed=4)
+
+    assert controller.stats["thinking_per_prompt_token"] > before
+
+
+def test_record_unparseable_output_raises_thinking_ratio(tmp_path):
+    controller = make_controller(tmp_path)
+    plan = controller.plan("x" * 8000, 10)
+    before = controller.stats["thinking_per_prompt_token"]
+
+    controller.record(plan, SimpleNamespace(output_tokens=3000), "end_turn", 10.0, "no ideas here", ideas_parsed=0)
+
+    assert controller.stats["thinking_per_prompt_token"] > before
+
+
+def test_record_capped_thinking_does_not_lower_ratio(tmp_path):
+    controller = make_controller(tmp_path, max_thinking_budget=MIN_THINKING_BUDGET)
+    plan = controller.plan("x" * 8000, 5)
+    before = controller.stats["thinking_per_prompt_token"]
+
+    # Thinking used its whole (plan-capped) budget; the ratio it implies is low
+    text = ideas_text(5)
+    usage = SimpleNamespace(output_tokens=plan["thinking_budget"] + len(text) // 4)
+    controller.record(plan, usage, "end_turn", 10.0, text, ideas_parsed=5)
+
+    assert controller.stats["thinking_per_prompt_token"] >= before
+
+
+def test_record_uncapped_low_thinking_lowers_ratio(tmp_path):
+    controller = make_controller(tmp_path)
+    plan = controller.plan("x" * 8000, 5)
+    assert plan["thinking_budget"] > MIN_THINKING_BUDGET
+
+    text = ideas_text(5)
+    usage = SimpleNamespace(output_tokens=len(text) // 4 + 100)
+    controller.record(plan, usage, "end_turn", 10.0, text, ideas_parsed=5)
+
+    assert controller.stats["thinking_per_prompt_token"] < DEFAULT_STATS["thinking_per_prompt_token"]
+
+
+def test_record_truncation_widens_safety_margin(tmp_path):
+    controller = make_controller(tmp_path)
+    plan = controller.plan("x" * 8000, 5)
+    before = controller.stats["safety_margin"]
+
+    controller.record(plan, SimpleNamespace(output_tokens=plan["max_tokens"]), "max_tokens", 10.0, ideas_text(5), 5)
+
+    assert controller.stats["safety_margin"] > before
+
+
+def test_learned_stats_persist(tmp_path):
+    controller = make_controller(tmp_path)
+    plan = controller.plan("x" * 8000, 5)
+    controller.record(plan, SimpleNamespace(output_tokens=3000), "end_turn", 10.0, ideas_text(5), ideas_parsed=5)
+
+    reloaded = make_controller(tmp_path)
+    assert reloaded.stats == controller.stats
+
+
+def test_record_without_thinking_leaves_thinking_ratio(tmp_path):
+    controller = make_controller(tmp_path)
+    plan = dict(controller.plan("x" * 8000, 10), thinking_budget=0)
+    before = controller.stats["thinking_per_prompt_token"]
+
+    controller.record(plan, SimpleNamespace(output_tokens=3000), "tool_use", 10.0, ideas_text(4), ideas_parsed=4)
+
+    assert controller.stats["thinking_per_prompt_token"] == before
+    assert controller.stats["samples"] == 1
+
+
+def test_concurrent_saves_leave_only_the_history(tmp_path):
+    controllers = [make_controller(tmp_path) for _ in range(8)]
+    plan = controllers[0].plan("x" * 8000, 5)
+
+    def learn(controller):
+        for _ in range(20):
+            controller.record(plan, SimpleNamespace(output_tokens=3000), "end_turn", 10.0, ideas_text(5), 5)
+
+    threads = [threading.Thread(target=learn, args=(controller,)) for controller in controllers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [path.name for path in tmp_path.iterdir()] == [".usage_history.json"]
+    assert make_controller(tmp_path).stats["samples"] == 20
@@ -0,0 +1,61 @@
+"""
+Tests for generating and saving a session offline from a recorded cassette
+"""
+
+import json
+import os
+
+import pytest
+
+import client_pool
+from config import Config
+from output_manifest import OutputManifest
+from phase6_generation import IdeaGeneration
+from phase7_output import OutputGeneration
+
+
+CASSETTE = os.path.join(os.path.dirname(__file__), "fixtures", "anthropic_generation.jsonl.gz")
+
+OPPORTUNITY = {"description": "New admins abandon onboarding before inviting their team", "who": "New admins"}
+CONTEXT = {"icp": "SMB finance teams", "primary_metric": "Onboarding completion rate"}
+CRITERIA = {"weights": {"Impact": 5, "Effort": 3}}
+
+RANKED_TITLES = ["Guided Setup Checklist", "Sample Data Workspace", "Inline Help Assistant"]
+
+
+@pytest.fixture
+def replay(workdir, monkeypatch):
+    monkeypatch.setenv("IDEATION_CASSETTE", CASSETTE)
+    monkeypatch.setenv("IDEATION_REPLAY_SPEED", "0")
+    config = Config()
+    config.output_dir = str(workdir)
+    yield config
+    client_pool.close_all()
+
+
+def test_generation_and_output_replay_offline(replay):
+    assert replay.get_model_provider() == "anthropic"
+
+    ideas = IdeaGeneration(replay).execute(OPPORTUNITY, CONTEXT, CRITERIA, [], [])
+
+    assert len(ideas) == 5
+    ranked = sorted((idea for idea in ideas if idea["rank"]), key=lambda idea: idea["rank"])
+    assert [idea["title"] for idea in ranked] == RANKED_TITLES
+    assert all(idea["rank"] is None for idea in ideas[3:])
+
+    filepath = OutputGeneration(replay).save(ideas, OPPORTUNITY, CONTEXT, CRITERIA)
+    entry = next(OutputManifest(replay.output_dir).entries())
+    assert entry["idea_count"] == 5
+    assert entry["top_titles"] == RANKED_TITLES
+    with open(os.path.splitext(filepath)[0] + ".jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["title"] for record in records if record["type"] == "idea"] == [idea["title"] for idea in ideas]
+
+
+def test_unrecorded_request_fails_without_network(replay, capsys):
+    generator = IdeaGeneration(replay)
+    generator.execute(OPPORTUNITY, CONTEXT, CRITERIA, [], [])
+
+    # The cassette holds one response, and it has been served
+    generator.execute(OPPORTUNITY, CONTEXT, CRITERIA, [], [])
+    assert "No recorded interaction for POST /v1/messages" in capsys.readouterr().out
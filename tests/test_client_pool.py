@@ -0,0 +1,137 @@
+"""
+Tests for the shared, pooled provider clients
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from client_pool import ClientPool
+from config import Config
+
+
+class MessagesServer:
+    """Answers /v1/messages on 127.0.0.1 and notes which connection each request used."""
+
+    def __init__(self):
+        self.ports = []
+        self.methods = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_HEAD(self):
+                server.methods.append("HEAD")
+                server.ports.append(self.client_address[1])
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                server.methods.append("POST")
+                server.ports.append(self.client_address[1])
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                payload = json.dumps({
+                    "id": "msg_1", "type": "message", "role": "assistant", "model": body["model"],
+                    "content": [{"type": "text", "text": "ok"}],
+                    "stop_reason": "end_turn", "stop_sequence": None,
+                    "usage": {"input_tokens": 1, "output_tokens": 1},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def server(workdir, monkeypatch):
+    server = MessagesServer()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.url)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def pool():
+    pool = ClientPool()
+    yield pool
+    pool.close_all()
+
+
+def anthropic_config(api_key="test-key"):
+    config = Config()
+    config.anthropic_api_key = api_key
+    return config
+
+
+def send(client):
+    return client.messages.create(
+        model="claude-test", max_tokens=10, messages=[{"role": "user", "content": "hi"}]
+    )
+
+
+def test_client_is_shared_per_provider_and_key(server, pool):
+    config = anthropic_config()
+    client = pool.get_client(config, "anthropic")
+    assert pool.get_client(anthropic_config(), "anthropic") is client
+    assert pool.get_client(anthropic_config("other-key"), "anthropic") is not client
+
+
+def test_concurrent_first_use_creates_one_client(server, pool):
+    config = anthropic_config()
+    start = threading.Barrier(8)
+    clients = []
+
+    def get():
+        start.wait()
+        clients.append(pool.get_client(config, "anthropic"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_calls_reuse_one_connection(server, pool):
+    client = pool.get_client(anthropic_config(), "anthropic")
+    send(client)
+    send(pool.get_client(anthropic_config(), "anthropic"))
+    assert len(server.ports) == 2 and len(set(server.ports)) == 1
+
+
+def test_prewarm_opens_the_connection_the_first_call_uses(server, pool):
+    config = anthropic_config()
+    pool.prewarm(config, "anthropic").join(5)
+    send(pool.get_client(config, "anthropic"))
+    assert server.methods == ["HEAD", "POST"]
+    assert len(set(server.ports)) == 1
+
+
+def test_prewarm_skips_providers_without_clients(pool):
+    assert pool.prewarm(Config(), "synthetic") is None
+
+
+def test_close_all_forgets_clients(server, pool):
+    config = anthropic_config()
+    client = pool.get_client(config, "anthropic")
+    pool.close_all()
+    assert pool.get_client(config, "anthropic") is not client
+
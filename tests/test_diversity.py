@@ -0,0 +1,72 @@
+"""
+Tests for idea vectors, k-means clustering and MMR slate selection
+"""
+
+import numpy as np
+
+from diversity import hash_vectors, kmeans, mmr_select, select_diverse_slate
+
+
+THEMES = {
+    "pricing": "pricing trial discount plan upgrade billing invoice",
+    "onboarding": "onboarding checklist guided setup tour welcome wizard",
+    "alerts": "alert notification reminder digest email push schedule",
+}
+
+
+def themed_texts(per_theme=4):
+    return [f"{words} variant {i}" for words in THEMES.values() for i in range(per_theme)]
+
+
+def test_vectors_are_unit_length_and_deterministic():
+    vectors = hash_vectors(["guided setup checklist", "", "pricing trial"])
+    assert vectors.shape == (3, 256)
+    assert np.allclose(np.linalg.norm(vectors[[0, 2]], axis=1), 1.0)
+    assert not vectors[1].any()
+    assert np.array_equal(vectors, hash_vectors(["guided setup checklist", "", "pricing trial"]))
+
+
+def test_similar_texts_are_closer_than_unrelated_ones():
+    a, b, c = hash_vectors([THEMES["pricing"], THEMES["pricing"] + " annual", THEMES["alerts"]])
+    assert a @ b > a @ c
+
+
+def test_kmeans_groups_texts_by_theme():
+    labels = kmeans(hash_vectors(themed_texts()), 3)
+    groups = [set(labels[i:i + 4]) for i in range(0, 12, 4)]
+    assert all(len(group) == 1 for group in groups)
+    assert len(set.union(*groups)) == 3
+
+
+def test_kmeans_never_asks_for_more_clusters_than_rows():
+    labels = kmeans(hash_vectors(["one idea", "another idea"]), 5)
+    assert len(labels) == 2 and set(labels) <= {0, 1}
+
+
+def test_mmr_prefers_a_new_theme_over_a_near_duplicate():
+    vectors = hash_vectors([THEMES["pricing"], THEMES["pricing"] + " annual", THEMES["alerts"], THEMES["onboarding"]])
+    scores = np.array([90.0, 89.0, 85.0, 50.0])
+    assert mmr_select(vectors, scores, 2, relevance_weight=0.5) == [0, 2]
+    # With relevance only, the two best scores win
+    assert mmr_select(vectors, scores, 2, relevance_weight=1.0) == [0, 1]
+
+
+def test_mmr_handles_empty_and_small_pools():
+    assert mmr_select(np.zeros((0, 256)), np.array([]), 3) == []
+    assert mmr_select(hash_vectors(["only"]), np.array([1.0]), 3) == [0]
+
+
+def test_slate_drops_duplicate_titles_and_spans_themes():
+    ideas = [
+        {"title": f"{theme.title()} idea {i}", "content": text, "score": 90.0 - i}
+        for theme, words in THEMES.items()
+        for i, text in enumerate([f"{words} variant {i}" for i in range(4)])
+    ]
+    ideas.append({"title": "pricing IDEA 0!", "content": "duplicate", "score": 99.0})
+
+    slate = select_diverse_slate(ideas, 3, relevance_weight=0.5)
+
+    assert len(slate) == 3
+    assert all(idea["content"] != "duplicate" for idea in slate)
+    assert {idea["title"].split()[0] for idea in slate} == {"Pricing", "Onboarding", "Alerts"}
+    assert all("cluster" in idea for idea in ideas[:12])
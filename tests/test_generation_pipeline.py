@@ -0,0 +1,109 @@
+"""
+Tests for the background generation queue and its per-job console routing
+"""
+
+import io
+import sys
+import threading
+
+import pytest
+
+import generation_pipeline
+from config import Config
+from generation_pipeline import GenerationPipeline, _capture, _RoutedStream
+
+
+CONTEXT = {"product": "A team task tracker"}
+CRITERIA = {"weights": {"Impact": 5, "Effort": 3}, "criteria_list": ["Impact", "Effort"]}
+
+
+@pytest.fixture
+def synthetic(workdir, monkeypatch):
+    """Generation by the synthetic provider, slow enough for jobs to overlap."""
+    monkeypatch.setenv("IDEATION_PROVIDER", "synthetic")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_IDEAS", "5")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_WORDS", "40")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_LATENCY_MS", "50")
+    return workdir
+
+
+def opportunity(number):
+    return {"description": f"Opportunity number {number}", "problem": "Teams lose track of work"}
+
+
+def test_routed_streams_keep_each_threads_output_apart():
+    terminal = io.StringIO()
+    stream = _RoutedStream(terminal)
+    logs = [io.StringIO() for _ in range(4)]
+    start = threading.Barrier(4)
+
+    def job(log, number):
+        _capture.set(log)
+        start.wait()
+        for line in range(50):
+            stream.write(f"job {number} line {line}\n")
+        stream.flush()
+
+    threads = [threading.Thread(target=job, args=(log, number)) for number, log in enumerate(logs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stream.write("terminal line\n")
+
+    assert terminal.getvalue() == "terminal line\n"
+    for number, log in enumerate(logs):
+        lines = log.getvalue().splitlines()
+        assert len(lines) == 50 and all(line.startswith(f"job {number} ") for line in lines)
+    assert stream.getvalue() == "terminal line\n"
+
+
+def test_queued_opportunities_are_saved_and_reported(synthetic, capsys):
+    stdout, stderr = sys.stdout, sys.stderr
+    with GenerationPipeline(Config(), CONTEXT, CRITERIA, [], []) as pipeline:
+        for number in range(1, 4):
+            pipeline.submit(opportunity(number))
+        pipeline.report(wait=True)
+    assert (sys.stdout, sys.stderr) == (stdout, stderr)
+
+    terminal = capsys.readouterr().out
+    for number in range(1, 4):
+        assert f"✓ Opportunity {number} queued" in terminal
+        assert f"✓ Opportunity {number} (Opportunity number {number}): 5 ideas saved to" in terminal
+    # Generation progress went to each job's log, not the terminal
+    assert "Generating ideas using AI" not in terminal
+    assert all("Generating ideas using AI" in job["log"].getvalue() for job in pipeline.jobs)
+    assert len(pipeline.all_ideas()) == 15
+    assert all(job["filepath"] and (synthetic / job["filepath"]).exists() for job in pipeline.jobs)
+
+
+def test_reports_are_printed_once_per_job(synthetic, capsys):
+    with GenerationPipeline(Config(), CONTEXT, CRITERIA, [], []) as pipeline:
+        pipeline.submit(opportunity(1))
+        pipeline.jobs[0]["future"].result()
+        pipeline.report()
+        pipeline.report(wait=True)
+    assert capsys.readouterr().out.count("✓ Opportunity 1 (") == 1
+
+
+def test_a_failed_job_reports_its_error_and_log_tail(synthetic, capsys, monkeypatch):
+    execute = generation_pipeline.IdeaGeneration.execute
+
+    def failing_execute(self, opportunity, *args):
+        if opportunity["description"].endswith("2"):
+            for step in range(30):
+                print(f"step {step}")
+            raise RuntimeError("provider unavailable")
+        return execute(self, opportunity, *args)
+
+    monkeypatch.setattr(generation_pipeline.IdeaGeneration, "execute", failing_execute)
+    with GenerationPipeline(Config(), CONTEXT, CRITERIA, [], []) as pipeline:
+        pipeline.submit(opportunity(1))
+        pipeline.submit(opportunity(2))
+        pipeline.report(wait=True)
+
+    terminal = capsys.readouterr().out
+    assert "✓ Opportunity 1 (" in terminal
+    assert "✗ Opportunity 2 (Opportunity number 2) failed: RuntimeError: provider unavailable" in terminal
+    assert "    step 29" in terminal and "    step 15" in terminal and "step 14" not in terminal
+    assert len(pipeline.all_ideas()) == 5
@@ -0,0 +1,107 @@
+"""
+Tests for expanding idea outlines on demand and the write-up cache
+"""
+
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import idea_expansion
+from idea_expansion import IdeaExpander
+
+
+class FakeGenerator:
+    """Writes up outlines by echoing them and counts the calls."""
+
+    def __init__(self, output_dir, fail_on=None):
+        self.config = SimpleNamespace(output_dir=str(output_dir), expansion_workers=2)
+        self.fail_on = fail_on
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def _complete_text(self, prompt, max_tokens, purpose="auxiliary"):
+        with self._lock:
+            self.prompts.append(prompt)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("provider down")
+        title = prompt.split("Title: ", 1)[1].split("\n", 1)[0]
+        return f"**Description:**\nFull write-up of {title}.\n"
+
+    def _calculate_idea_score(self, content, criteria):
+        return float(len(content))
+
+    def _apply_score_ranking(self, ideas):
+        for rank, idea in enumerate(sorted(ideas, key=lambda idea: idea["score"], reverse=True)[:3], 1):
+            idea["rank"] = rank
+
+
+def outlines(*titles):
+    return [{"title": title, "outline": f"Outline of {title}", "content": f"**Outline:**\nOutline of {title}",
+             "score": 0.0, "rank": None, "expanded": False} for title in titles]
+
+
+@pytest.fixture
+def expander_for(tmp_path):
+    expanders = []
+
+    def make(generator=None):
+        expander = IdeaExpander(generator or FakeGenerator(tmp_path), "Shared context", {"weights": {}})
+        expanders.append(expander)
+        return expander
+
+    yield make
+    for expander in expanders:
+        expander.shutdown()
+
+
+def test_expand_writes_up_each_outline_once(expander_for):
+    expander = expander_for()
+    ideas = outlines("Alpha", "Beta")
+    expander.prefetch(ideas[:1])
+    expander.expand(ideas)
+
+    assert [idea["content"] for idea in ideas] == [
+        "**Description:**\nFull write-up of Alpha.", "**Description:**\nFull write-up of Beta."
+    ]
+    assert all(idea["expanded"] for idea in ideas)
+    assert len(expander.generator.prompts) == 2
+    # Unranked ideas are ranked by their new scores
+    assert sorted(idea["rank"] for idea in ideas) == [1, 2]
+
+
+def test_write_ups_are_reused_from_disk(tmp_path, expander_for):
+    expander_for().expand(outlines("Alpha"))
+
+    generator = FakeGenerator(tmp_path)
+    ideas = expander_for(generator).expand(outlines("Alpha"))
+    assert generator.prompts == []
+    assert ideas[0]["content"].endswith("Full write-up of Alpha.")
+
+
+def test_failed_expansion_keeps_the_outline(tmp_path, expander_for):
+    ideas = expander_for(FakeGenerator(tmp_path, fail_on="Beta")).expand(outlines("Alpha", "Beta"))
+    assert ideas[0]["expanded"] and not ideas[1]["expanded"]
+    assert ideas[1]["content"] == "**Outline:**\nOutline of Beta"
+
+
+def test_shutdown_keeps_only_the_most_recently_used_write_ups(tmp_path, expander_for, monkeypatch):
+    monkeypatch.setattr(idea_expansion, "MAX_CACHED_EXPANSIONS", 2)
+    expander = expander_for()
+    expander.expand(outlines("A", "B", "C"))
+    cache_dir = tmp_path / ".expansion_cache"
+    paths = sorted(cache_dir.iterdir())
+    for age, path in enumerate(paths):
+        os.utime(path, (1000 + age, 1000 + age))
+
+    expander.shutdown()
+
+    assert sorted(cache_dir.iterdir()) == paths[1:]
+
+
+def test_shutdown_stops_new_expansions(expander_for):
+    expander = expander_for()
+    expander.shutdown()
+    with pytest.raises(RuntimeError):
+        expander.prefetch(outlines("Late"))
@@ -0,0 +1,71 @@
+"""
+Tests for the judge's score aggregation and its bounded cache
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import idea_judge
+from idea_judge import IdeaJudge, JudgeCache
+
+
+CRITERIA = {"weights": {"Impact": 5, "Effort": 1}}
+
+
+class FakeGenerator:
+    """Answers judging prompts with fixed scores and counts the calls."""
+
+    def __init__(self, output_dir):
+        self.config = SimpleNamespace(
+            output_dir=str(output_dir), judge_batch_size=10, judge_batch_chars=30000,
+            judge_max_calls=5, judge_workers=2,
+        )
+        self.calls = 0
+
+    def _complete_text(self, prompt, max_tokens, purpose="auxiliary"):
+        self.calls += 1
+        count = prompt.count("### Idea ")
+        return json.dumps({"scores": [{"id": i, "scores": {"Impact": 5, "Effort": 1}} for i in range(1, count + 1)]})
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(idea_judge, "_caches", {})
+
+
+def ideas(count):
+    return [{"title": f"Idea {i}", "content": f"Content {i}", "score": 0.0} for i in range(count)]
+
+
+def test_scores_are_weighted_and_cached(tmp_path):
+    generator = FakeGenerator(tmp_path)
+    judged = IdeaJudge(generator, CRITERIA).score(ideas(3))
+    # (5 * 5 + 1 * 1) / (6 * 5)
+    assert [idea["score"] for idea in judged] == [86.7] * 3
+    assert generator.calls == 1
+
+    IdeaJudge(generator, CRITERIA).score(ideas(3))
+    assert generator.calls == 1
+
+
+def test_cache_is_loaded_once_per_process(tmp_path):
+    path = str(tmp_path / ".judge_cache.jsonl")
+    assert JudgeCache.for_path(path) is JudgeCache.for_path(path)
+
+
+def test_cache_keeps_only_the_newest_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(idea_judge, "MAX_CACHED_JUDGEMENTS", 5)
+    path = tmp_path / ".judge_cache.jsonl"
+    cache = JudgeCache(str(path))
+    for i in range(12):
+        cache.put(f"k{i}", {"Impact": 3.0})
+
+    assert "k0" not in cache and "k11" in cache
+    lines = path.read_text().splitlines()
+    assert len(lines) < 10
+    # A new process sees the same newest entries
+    reloaded = JudgeCache(str(path))
+    assert [f"k{i}" in reloaded for i in range(12)] == [False] * 7 + [True] * 5
+    assert len(path.read_text().splitlines()) == 5
@@ -0,0 +1,123 @@
+"""
+Tests for slotted idea records, session state sharing and the blob store
+"""
+
+import json
+import sys
+
+import pytest
+
+import idea_model
+from idea_model import BLOB_MIN_CHARS, BlobStore, Idea, SessionState, blob_hash, intern_criteria
+
+
+def runtime_string(*parts):
+    """An equal string that is a new object (not a shared literal)."""
+    return "".join(parts)
+
+
+def test_ideas_behave_like_dicts():
+    idea = Idea(title="Guided Setup", content="Text", score=71.5, rank=None)
+    idea["cluster"] = 2
+    idea["source"] = "judge"
+
+    assert idea["title"] == "Guided Setup" and idea.get("expanded") is None
+    assert "expanded" not in idea and "cluster" in idea and "source" in idea
+    assert list(idea) == ["title", "content", "score", "rank", "cluster", "source"]
+    assert len(idea) == 6
+    assert {**idea}["source"] == "judge"
+    assert json.loads(json.dumps(idea.to_dict()))["score"] == 71.5
+
+    del idea["cluster"], idea["source"]
+    assert "cluster" not in idea and idea._extra == {}
+    with pytest.raises(KeyError):
+        idea["cluster"]
+    with pytest.raises(KeyError):
+        del idea["refined"]
+
+
+def test_ideas_have_no_instance_dict():
+    idea = Idea(title="A", content="B", score=1.0, rank=1)
+    assert not hasattr(idea, "__dict__")
+    assert idea._extra is None
+    with pytest.raises(AttributeError):
+        idea.other = 1
+
+
+def test_copy_is_shallow_and_independent():
+    sub_scores = {"Impact": 4}
+    idea = Idea(title="A", content="B", score=1.0, rank=1, sub_scores=sub_scores, note="x")
+    copied = idea.copy()
+    copied["title"] = "C"
+    assert idea["title"] == "A" and copied["note"] == "x"
+    assert copied["sub_scores"] is sub_scores
+    assert copied == idea.to_dict() | {"title": "C"}
+
+
+def test_summary_keeps_everything_but_the_text():
+    idea = Idea(title="A", content="x" * 40, score=3.0, rank=None, cluster=1, expanded=True)
+    summary = idea.summary()
+    assert summary.to_dict() == {"title": "A", "score": 3.0, "rank": None, "cluster": 1, "content_chars": 40}
+
+
+def test_session_state_starts_with_empty_inputs():
+    state = SessionState(phase=3)
+    assert state["phase"] == 3
+    assert state["opportunity"] == {} and state["generated_ideas"] == []
+    assert SessionState()["criteria"] is not SessionState()["criteria"]
+
+
+def test_sessions_share_one_copy_of_large_inputs():
+    body = "Product context paragraph. " * 20
+    first = SessionState(context={"documents": [runtime_string(body, "end")]})
+    second = SessionState()
+    second["context"] = {"documents": [runtime_string(body, "end")]}
+
+    assert first["context"]["documents"][0] is second["context"]["documents"][0]
+    short = SessionState(opportunity={"description": runtime_string("short ", "text")})
+    assert short["opportunity"]["description"] == "short text"
+
+
+def test_criterion_names_are_interned():
+    name = runtime_string("Customer ", "Impact")
+    state = SessionState(criteria={"weights": {name: 5}, "criteria_list": [runtime_string("Customer ", "Impact")]})
+    (weight_name,) = state["criteria"]["weights"]
+    assert weight_name is sys.intern("Customer Impact")
+    assert state["criteria"]["criteria_list"][0] is weight_name
+    assert intern_criteria({"description": "no weights"}) == {"description": "no weights"}
+
+
+def test_blob_store_shares_equal_large_strings_only():
+    store = BlobStore()
+    text = "y" * BLOB_MIN_CHARS
+    assert store.share(runtime_string(text)) is store.share(runtime_string(text))
+    assert store.get(blob_hash(text)) == text
+    small = "z" * (BLOB_MIN_CHARS - 1)
+    assert store.share(small) is small and len(store) == 1
+
+
+def test_blob_store_forgets_the_least_recently_shared_first():
+    store = BlobStore(max_chars=3 * BLOB_MIN_CHARS)
+    a, b, c, d = ("abcd"[i] * BLOB_MIN_CHARS for i in range(4))
+    for text in (a, b, c):
+        store.share(text)
+    store.share(runtime_string(a))
+    store.share(d)
+
+    assert len(store) == 3
+    assert store.get(blob_hash(b)) is None
+    assert store.get(blob_hash(a)) is a
+
+
+def test_blob_store_keeps_a_single_oversized_string():
+    store = BlobStore(max_chars=BLOB_MIN_CHARS)
+    large = "q" * (BLOB_MIN_CHARS * 4)
+    store.share(large)
+    assert len(store) == 1 and store.get(blob_hash(large)) is large
+
+
+def test_sessions_use_the_process_wide_store(monkeypatch):
+    monkeypatch.setattr(idea_model, "_store", BlobStore())
+    text = "w" * BLOB_MIN_CHARS
+    assert idea_model.share_text(runtime_string(text)) is idea_model.share_text(runtime_string(text))
+    assert len(idea_model._store) == 1
@@ -0,0 +1,117 @@
+"""
+Tests for accepting streamed ideas and stopping once enough have arrived
+"""
+
+import pytest
+
+from config import Config
+from idea_stream import StreamingIdeaCollector, count_idea_sections, is_complete
+from phase6_generation import IdeaGeneration
+
+
+SECTIONS = (
+    "**Description:**\nWhat it is.\n\n"
+    "**How it addresses the opportunity:**\nWhy it helps.\n\n"
+    "**Expected impact:**\nMore activation.\n\n"
+    "**Implementation considerations:**\nSmall team.\n"
+)
+
+
+def idea_block(number, title, body=SECTIONS):
+    return f"---\n### IDEA {number}: {title}\n\n{body}\n"
+
+
+def parse(section):
+    title, _, content = section.partition("\n")
+    title = title.split(":", 1)[-1].strip()
+    return {"title": title, "content": content.strip(), "score": 80.0 if "low score" not in title else 10.0}
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def feed_all(collector, text, size=7):
+    for chunk in chunks(text, size):
+        if collector.feed(chunk):
+            return True
+    return False
+
+
+def test_stops_once_target_ideas_are_complete():
+    text = "".join(idea_block(i, f"Idea {i}") for i in range(1, 6))
+    collector = StreamingIdeaCollector(parse, target=2)
+
+    assert feed_all(collector, text)
+    assert [idea["title"] for idea in collector.finish(stopped_early=True)] == ["Idea 1", "Idea 2"]
+
+
+def test_an_idea_is_accepted_only_after_the_next_marker():
+    collector = StreamingIdeaCollector(parse, target=1)
+    assert not collector.feed(idea_block(1, "First"))
+    assert collector.accepted == []
+    assert collector.feed("### IDEA 2")
+    assert [idea["title"] for idea in collector.accepted] == ["First"]
+
+
+@pytest.mark.parametrize("size", [1, 3, 64])
+def test_markers_split_across_chunks_are_found(size):
+    text = "".join(idea_block(i, f"Idea {i}") for i in range(1, 4)) + "## TOP 3 FORCE RANKED IDEAS\n1. Idea 1\n"
+    collector = StreamingIdeaCollector(parse, target=5)
+
+    assert not feed_all(collector, text, size)
+    ideas = collector.finish(stopped_early=False)
+    assert [idea["title"] for idea in ideas] == ["Idea 1", "Idea 2", "Idea 3"]
+    assert collector.ranking_text.startswith("## TOP 3 FORCE RANKED IDEAS")
+
+
+def test_quality_gate_rejects_incomplete_duplicate_and_low_score_ideas():
+    text = (
+        idea_block(1, "Kept")
+        + idea_block(2, "Missing sections", "**Description:**\nOnly this.\n")
+        + idea_block(3, "kept!")
+        + idea_block(4, "A low score idea")
+        + idea_block(5, "Also kept")
+    )
+    collector = StreamingIdeaCollector(parse, target=10, min_score=50)
+
+    feed_all(collector, text)
+    ideas = collector.finish(stopped_early=False)
+    assert [idea["title"] for idea in ideas] == ["Kept", "Also kept"]
+    assert collector.rejected == 3
+
+
+def test_trailing_idea_is_dropped_when_stopped_early():
+    collector = StreamingIdeaCollector(parse, target=3)
+    feed_all(collector, idea_block(1, "One") + idea_block(2, "Two"))
+    assert [idea["title"] for idea in collector.finish(stopped_early=True)] == ["One"]
+
+
+def test_completeness_needs_every_section_filled():
+    assert is_complete(SECTIONS)
+    assert not is_complete(SECTIONS.replace("More activation.", ""))
+
+
+def test_count_idea_sections_needs_title_and_body():
+    text = idea_block(1, "One") + idea_block(2, "Two") + "### IDEA 3: Cut off after the title\n"
+    assert count_idea_sections(text) == 2
+
+
+def test_generation_stops_streaming_at_the_target(workdir, monkeypatch):
+    monkeypatch.setenv("IDEATION_PROVIDER", "synthetic")
+    monkeypatch.setenv("IDEATION_TARGET_IDEAS", "4")
+    generator = IdeaGeneration(Config())
+    streamed = []
+    original = generator.synthetic.stream
+
+    def stream(prompt):
+        for chunk in original(prompt):
+            streamed.append(chunk)
+            yield chunk
+
+    generator.synthetic.stream = stream
+    ideas = generator.execute({"description": "Users abandon onboarding"}, {}, {"weights": {"Impact": 5}}, [], [])
+
+    assert len(ideas) == 4
+    # Far less than the 50-idea response was read
+    assert count_idea_sections("".join(streamed)) < 10
@@ -0,0 +1,45 @@
+"""
+Tests for splitting packed responses by opportunity
+"""
+
+from opportunity_pack import SECTION_MARKER, split_pack_response
+
+
+def packed(*sections):
+    return "\n".join(SECTION_MARKER.format(label=label) + "\n" + body for label, body in sections)
+
+
+def test_splits_each_labelled_section():
+    text = packed(("O1", "### IDEA 1: First\nbody one"), ("O2", "### IDEA 1: Second\nbody two"))
+    sections = split_pack_response(text, ["O1", "O2"])
+    assert list(sections) == ["O1", "O2"]
+    assert "First" in sections["O1"] and "Second" not in sections["O1"]
+    assert "Second" in sections["O2"]
+
+
+def test_missing_label_is_left_out():
+    sections = split_pack_response(packed(("O1", "one"), ("O3", "three")), ["O1", "O2", "O3"])
+    assert set(sections) == {"O1", "O3"}
+
+
+def test_first_duplicate_section_is_kept():
+    sections = split_pack_response(packed(("O1", "first"), ("O1", "second")), ["O1"])
+    assert sections["O1"].strip() == "first"
+
+
+def test_unrequested_labels_end_the_previous_section():
+    sections = split_pack_response(packed(("O1", "mine"), ("O9", "not mine")), ["O1"])
+    assert list(sections) == ["O1"]
+    assert sections["O1"].strip() == "mine"
+
+
+def test_decorated_markers_are_recognized():
+    text = "Preamble\n## === OPPORTUNITY O1 ===\none\n**=== OPPORTUNITY O2 ===**\ntwo\n"
+    sections = split_pack_response(text, ["O1", "O2"])
+    assert sections["O1"].strip() == "one"
+    assert sections["O2"].strip() == "two"
+
+
+def test_marker_inside_a_line_is_ignored():
+    text = packed(("O1", "see === OPPORTUNITY O2 === above"))
+    assert set(split_pack_response(text, ["O1", "O2"])) == {"O1"}
@@ -0,0 +1,86 @@
+"""
+Tests for the append-only session manifest and reading it backwards
+"""
+
+import threading
+
+import pytest
+
+import output_manifest
+from output_manifest import OutputManifest, top_titles
+
+
+def entry(number, opportunity_hash="aaaa1111", **fields):
+    return {"session_id": f"ideation_session_{number:04d}", "opportunity_hash": opportunity_hash,
+            "path": f"ideation_session_{number:04d}.md", **fields}
+
+
+def test_entries_are_read_newest_first(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    for number in range(5):
+        manifest.append(entry(number))
+    assert [e["session_id"][-1] for e in manifest.entries()] == ["4", "3", "2", "1", "0"]
+
+
+def test_lines_spanning_read_blocks_are_joined(tmp_path, monkeypatch):
+    monkeypatch.setattr(output_manifest, "READ_BLOCK_SIZE", 16)
+    manifest = OutputManifest(str(tmp_path))
+    for number in range(20):
+        manifest.append(entry(number, notes="é" * number))
+    assert [e["notes"] for e in manifest.entries()] == ["é" * number for number in reversed(range(20))]
+
+
+def test_missing_manifest_has_no_entries(tmp_path):
+    assert list(OutputManifest(str(tmp_path)).entries()) == []
+
+
+def test_torn_and_blank_lines_are_skipped(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    manifest.append(entry(1))
+    with open(manifest.path, "ab") as f:
+        f.write(b"\n[1, 2]\n{\"session_id\": \"torn")
+    assert [e["session_id"] for e in manifest.entries()] == ["ideation_session_0001"]
+
+
+def test_recent_filters_by_opportunity_prefix(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    for number in range(6):
+        manifest.append(entry(number, "aaaa1111" if number % 2 else "bbbb2222"))
+    assert [e["session_id"][-1] for e in manifest.recent(2, "aaaa")] == ["5", "3"]
+    assert len(manifest.recent(10)) == 6
+
+
+def test_find_matches_id_prefix_newest_first(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    manifest.append(entry(12, marker="old"))
+    manifest.append(entry(12, marker="new"))
+    assert manifest.find("ideation_session_001")["marker"] == "new"
+    assert manifest.find("nope") is None
+    assert manifest.resolve(manifest.find("ideation_session_0012")) == str(tmp_path / "ideation_session_0012.md")
+
+
+def test_concurrent_appends_never_interleave(tmp_path):
+    manifest = OutputManifest(str(tmp_path))
+    start = threading.Barrier(8)
+
+    def append(worker):
+        start.wait()
+        for number in range(25):
+            manifest.append(entry(worker * 100 + number, notes="x" * 2000))
+
+    threads = [threading.Thread(target=append, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(list(manifest.entries())) == 200
+
+
+@pytest.mark.parametrize("ideas, expected", [
+    ([{"title": "A", "score": 1, "rank": 2}, {"title": "B", "score": 9, "rank": 1}, {"title": "C", "score": 5}],
+     ["B", "A"]),
+    ([{"title": "A", "score": 1}, {"title": "B", "score": 9}, {"title": "C", "score": 5}], ["B", "C", "A"]),
+])
+def test_top_titles_prefer_the_force_ranking(ideas, expected):
+    assert top_titles(ideas) == expected
@@ -0,0 +1,79 @@
+"""
+Tests for the incremental session writer and output file naming
+"""
+
+import json
+import os
+
+import pytest
+
+import phase7_output
+from config import Config
+from idea_model import Idea
+from output_writer import PARTIAL_SUFFIX, IdeaOutputWriter, read_idea, reserve_output_path
+from phase7_output import OutputGeneration
+
+
+OPPORTUNITY = {"description": "Users abandon onboarding"}
+CONTEXT = {"icp": "SMB finance teams"}
+CRITERIA = {"weights": {"Impact": 5}}
+
+
+def ideas(count):
+    return [Idea(title=f"Idea {i}", content=f"Content {i}", score=50.0 + i, rank=i if i <= 3 else None)
+            for i in range(1, count + 1)]
+
+
+def test_reserved_paths_are_numbered(tmp_path):
+    first = reserve_output_path(str(tmp_path), "session")
+    second = reserve_output_path(str(tmp_path), "session")
+    assert os.path.basename(first) == "session.md"
+    assert os.path.basename(second) == "session_2.md"
+
+
+def test_saves_in_the_same_second_keep_both_files(workdir, monkeypatch):
+    class FrozenTime:
+        @staticmethod
+        def now():
+            from datetime import datetime
+            return datetime(2026, 1, 1, 12, 0, 0)
+
+    monkeypatch.setattr(phase7_output, "datetime", FrozenTime)
+    output = OutputGeneration(Config())
+    first = output.save(ideas(2), OPPORTUNITY, CONTEXT, CRITERIA)
+    second = output.save(ideas(4), OPPORTUNITY, CONTEXT, CRITERIA)
+
+    assert first != second
+    with open(first, encoding="utf-8") as f:
+        assert "Idea 2" in f.read()
+    with open(second, encoding="utf-8") as f:
+        assert "Idea 4" in f.read()
+
+
+def test_offsets_read_back_each_idea(tmp_path):
+    path = str(tmp_path / "session.md")
+    writer = IdeaOutputWriter(path)
+    with writer.open(OPPORTUNITY, CONTEXT, CRITERIA):
+        for idea in ideas(3):
+            writer.add_idea(idea)
+        writer.finish()
+
+    for i, item in enumerate(writer.offsets, 1):
+        assert read_idea(path, item["offset"], item["length"]).startswith(f"\n### Idea {i}: Idea {i}")
+    with open(writer.jsonl_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["type"] for record in records] == ["session", "idea", "idea", "idea", "ranking"]
+
+
+def test_crash_leaves_partial_files_with_every_idea_written(tmp_path):
+    path = str(tmp_path / "session.md")
+    writer = IdeaOutputWriter(path)
+    with pytest.raises(RuntimeError):
+        with writer.open(OPPORTUNITY, CONTEXT, CRITERIA):
+            for idea in ideas(2):
+                writer.add_idea(idea)
+            raise RuntimeError("crash")
+
+    assert not os.path.exists(path)
+    with open(path + PARTIAL_SUFFIX, encoding="utf-8") as f:
+        assert "Idea 2" in f.read()
@@ -0,0 +1,75 @@
+"""
+Tests for the per-phase CPU and memory profiles written by --profile
+"""
+
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from phase_profiler import PhaseProfiler
+
+
+def busy_phase_work():
+    """Allocate about 2 MB and keep it."""
+    return [bytearray(1000) for _ in range(2000)]
+
+
+def test_each_phase_gets_a_profile_file_and_figures(tmp_path):
+    profiler = PhaseProfiler(str(tmp_path), top_n=5)
+    with profiler.phase("opportunity"):
+        kept = busy_phase_work()
+    with profiler.phase("generation"):
+        pass
+
+    first, second = profiler.results
+    assert [first["profile_file"], second["profile_file"]] == ["01_opportunity.prof", "02_generation.prof"]
+    stats = pstats.Stats(os.path.join(profiler.directory, first["profile_file"]))
+    assert any(function == "busy_phase_work" for _, _, function in stats.stats)
+    assert "busy_phase_work" in first["hotspots"]
+    assert first["net"] >= 2_000_000 and first["peak"] >= first["net"]
+    assert second["net"] < 100_000
+    del kept
+
+
+def test_a_failing_phase_is_still_recorded_and_tracing_stops(tmp_path):
+    assert not tracemalloc.is_tracing()
+    profiler = PhaseProfiler(str(tmp_path))
+    with pytest.raises(ValueError):
+        with profiler.phase("criteria"):
+            raise ValueError("bad input")
+
+    assert [result["name"] for result in profiler.results] == ["criteria"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running(tmp_path):
+    tracemalloc.start()
+    try:
+        profiler = PhaseProfiler(str(tmp_path))
+        with profiler.phase("context"):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_summary_lists_every_phase(tmp_path, capsys):
+    profiler = PhaseProfiler(str(tmp_path), top_n=3)
+    with profiler.phase("opportunity"):
+        busy_phase_work()
+    with profiler.phase("output"):
+        pass
+
+    path = profiler.write_summary()
+
+    assert path == os.path.join(profiler.directory, "summary.txt")
+    assert profiler.directory.startswith(str(tmp_path / "profiles"))
+    with open(path, encoding="utf-8") as f:
+        summary = f.read()
+    table = summary.split("\n\n", 1)[0].splitlines()
+    assert [line.split()[0] for line in table[2:]] == ["opportunity", "output"]
+    assert "opportunity  (profile: 01_opportunity.prof)" in summary
+    assert "Top 3 allocation sites" in summary
+    assert "Profiles written to" in capsys.readouterr().out
@@ -0,0 +1,107 @@
+"""
+Tests for input fingerprints, changed-section detection and session reuse
+"""
+
+import copy
+
+from config import Config
+from idea_model import Idea
+from phase6_generation import IdeaGeneration
+from phase7_output import OutputGeneration
+from regeneration import IncrementalRegeneration, changed_sections, input_fingerprint
+
+
+OPPORTUNITY = {"description": "Users abandon onboarding", "who": "New admins", "evidence": ""}
+CONTEXT = {"icp": "SMB finance teams", "constraints": "No new headcount", "vision": None}
+CRITERIA = {"weights": {"Impact": 5, "Effort": 3}, "notes": "ignored"}
+INSIGHTS = [{"url": "https://example.com", "notes": "Competitor onboarding"}]
+EXAMPLES = [{"description": "Guided setup checklist"}]
+
+
+def fingerprint(**changes):
+    inputs = {
+        "opportunity": copy.deepcopy(OPPORTUNITY),
+        "context": copy.deepcopy(CONTEXT),
+        "criteria": copy.deepcopy(CRITERIA),
+        "competitive_insights": copy.deepcopy(INSIGHTS),
+        "example_ideas": copy.deepcopy(EXAMPLES),
+    }
+    inputs.update(changes)
+    return input_fingerprint(**inputs)
+
+
+def test_fingerprint_is_stable():
+    assert fingerprint() == fingerprint()
+
+
+def test_empty_fields_are_left_out():
+    keys = set(fingerprint())
+    assert "opportunity.evidence" not in keys
+    assert "context.vision" not in keys
+    assert {"opportunity.description", "context.icp", "criteria", "competitive_insights", "example_ideas"} <= keys
+
+
+def test_blank_field_matches_missing_field():
+    context = dict(CONTEXT, vision="")
+    del context["vision"]
+    assert fingerprint(context=context) == fingerprint()
+
+
+def test_only_criteria_weights_count():
+    assert fingerprint(criteria=dict(CRITERIA, notes="changed")) == fingerprint()
+    assert fingerprint(criteria={"weights": {"Impact": 4, "Effort": 3}}) != fingerprint()
+
+
+def test_edit_changes_only_its_section():
+    old = fingerprint()
+    new = fingerprint(context=dict(CONTEXT, constraints="Two engineers"))
+    assert changed_sections(old, new) == ["context.constraints"]
+
+
+def test_added_and_removed_sections_are_changes():
+    old = fingerprint()
+    new = fingerprint(competitive_insights=[], context=dict(CONTEXT, vision="Self-serve finance"))
+    assert changed_sections(old, new) == ["competitive_insights", "context.vision"]
+
+
+def test_no_changes():
+    assert changed_sections(fingerprint(), fingerprint()) == []
+
+
+def save_session(ideas, opportunity, complete=True):
+    output = OutputGeneration(Config(), fingerprint=input_fingerprint(opportunity, CONTEXT, CRITERIA, [], []))
+    return output._save_ideas_to_file(ideas, opportunity, CONTEXT, CRITERIA, complete=complete)
+
+
+def rerun(opportunity):
+    generator = IdeaGeneration(Config())
+    fingerprint = input_fingerprint(opportunity, CONTEXT, CRITERIA, [], [])
+    return IncrementalRegeneration(generator).execute(fingerprint, opportunity, CONTEXT, CRITERIA, [], [])
+
+
+def saved_ideas(count):
+    return [Idea(title=f"Idea {i}", content=f"Content {i}", score=50.0 + i) for i in range(1, count + 1)]
+
+
+def test_unchanged_rerun_reuses_a_complete_session(workdir):
+    save_session(saved_ideas(4), OPPORTUNITY)
+    ideas = rerun(OPPORTUNITY)
+    assert [idea["title"] for idea in ideas] == [f"Idea {i}" for i in range(1, 5)]
+
+
+def test_selection_is_not_reused(workdir):
+    save_session(saved_ideas(4), OPPORTUNITY)
+    save_session(saved_ideas(1), OPPORTUNITY, complete=False)
+    # The newest complete session is used instead
+    assert len(rerun(OPPORTUNITY)) == 4
+
+
+def test_only_a_selection_means_full_generation(workdir):
+    save_session(saved_ideas(2), OPPORTUNITY, complete=False)
+    assert rerun(OPPORTUNITY) is None
+
+
+def test_opportunity_without_description_is_never_matched(workdir):
+    blank = dict(OPPORTUNITY, description="")
+    save_session(saved_ideas(3), dict(OPPORTUNITY, description="", who="Someone else"))
+    assert rerun(blank) is None
@@ -0,0 +1,104 @@
+"""
+Tests for coalescing identical in-flight requests
+"""
+
+import threading
+
+import pytest
+
+from config import Config
+from phase6_generation import IdeaGeneration
+from single_flight import SingleFlight, request_key
+
+
+def run_together(flight, key, fn, callers):
+    """Call flight.do from several threads at once and collect their results."""
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            result = flight.do(key, fn)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        else:
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_identical_requests_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def request():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "response"
+
+    threads, results, errors = run_together(flight, "key", request, 5)
+    started.wait(5)
+    # Give the followers time to join the running request
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    assert all(result == "response" for result, _ in results)
+    assert not errors and flight.in_flight() == 0
+
+
+def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def request():
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    threads, results, errors = run_together(flight, "key", request, 3)
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not results
+    assert [str(e) for e in errors] == ["provider down"] * 3
+    assert flight.in_flight() == 0
+
+
+def test_finished_requests_are_not_cached():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+
+
+def test_key_covers_every_request_parameter():
+    base = dict(provider="anthropic", model="m", prompt="p", max_tokens=1000, thinking_budget=500, temperature=1.0)
+    key = request_key(**base)
+    assert request_key(**base) == key
+    for name, value in [("provider", "openai"), ("model", "m2"), ("prompt", "q"), ("max_tokens", 2000),
+                        ("thinking_budget", 600), ("temperature", 0.5)]:
+        assert request_key(**dict(base, **{name: value})) != key
+    assert request_key(**base, stream=True) != key
+
+
+@pytest.mark.parametrize("setting, value", [("model", "other-model"), ("temperature", 0.2)])
+def test_generator_keys_follow_config(workdir, setting, value):
+    generator = IdeaGeneration(Config())
+    other = IdeaGeneration(Config())
+    setattr(other.config, setting, value)
+    key = generator._flight_key("anthropic", "prompt", 4000, stream=True)
+    assert key != other._flight_key("anthropic", "prompt", 4000, stream=True)
+    assert key != generator._flight_key("anthropic", "prompt", 5000, stream=True)
@@ -0,0 +1,108 @@
+"""
+Tests for SpendLedger reservations and budgets
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import spend_ledger
+from spend_ledger import BudgetExceededError, SpendLedger
+
+
+def make_ledger(tmp_path, **overrides):
+    settings = {
+        "output_dir": str(tmp_path),
+        "session_budget_usd": 0,
+        "daily_budget_usd": 0,
+        "ledger_enabled": True,
+        "budget_action": "degrade",
+        "price_overrides": {},
+    }
+    settings.update(overrides)
+    return SpendLedger(SimpleNamespace(**settings))
+
+
+def test_concurrent_reservations_never_exceed_budget(tmp_path):
+    ledger = make_ledger(tmp_path, session_budget_usd=1.0)
+    threads = 20
+    start = threading.Barrier(threads)
+    attempted = threading.Semaphore(0)
+    release = threading.Event()
+    admitted = []
+
+    def call():
+        start.wait()
+        try:
+            with ledger.reserve(0.1):
+                admitted.append(1)
+                attempted.release()
+                # Hold the reservation until every thread has tried
+                release.wait()
+        except BudgetExceededError:
+            attempted.release()
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for _ in range(threads):
+        attempted.acquire()
+    release.set()
+    for worker in workers:
+        worker.join()
+
+    assert len(admitted) == 10
+    assert ledger.reserved == pytest.approx(0.0)
+
+
+def test_reservation_is_released_on_error(tmp_path):
+    ledger = make_ledger(tmp_path, session_budget_usd=1.0)
+    with pytest.raises(RuntimeError):
+        with ledger.reserve(0.5):
+            raise RuntimeError("call failed")
+    assert ledger.reserved == 0
+    assert ledger.remaining() == pytest.approx(1.0)
+
+
+def test_record_charges_and_writes_ledger(tmp_path):
+    ledger = make_ledger(tmp_path, daily_budget_usd=10.0)
+    usage = SimpleNamespace(input_tokens=1_000_000, output_tokens=0)
+    cost = ledger.record(usage, "claude-sonnet-4-5", "anthropic", "generation")
+
+    assert cost == pytest.approx(3.0)
+    assert ledger.remaining() == pytest.approx(7.0)
+    # A second ledger on the same directory sees the spend through the file
+    assert make_ledger(tmp_path, daily_budget_usd=10.0).remaining() == pytest.approx(7.0)
+
+
+def test_daily_budget_counts_process_spend_without_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(spend_ledger, "_process_spend", {})
+    ledger = make_ledger(tmp_path, daily_budget_usd=10.0, ledger_enabled=False)
+    ledger.record(SimpleNamespace(input_tokens=1_000_000, output_tokens=0), "claude-sonnet-4-5", "anthropic", "generation")
+
+    assert ledger.remaining() == pytest.approx(7.0)
+    assert make_ledger(tmp_path, daily_budget_usd=10.0, ledger_enabled=False).remaining() == pytest.approx(7.0)
+    assert not (tmp_path / spend_ledger.LEDGER_DIRNAME).exists()
+
+
+def test_fit_degrades_then_refuses(tmp_path):
+    ledger = make_ledger(tmp_path, session_budget_usd=0.05)
+    plan = {"thinking_budget": 4000, "max_tokens": 9000, "prompt_tokens": 2000, "idea_count": 10}
+
+    fitted = ledger.fit(plan, "claude-sonnet-4-5")
+    assert fitted["degraded"]
+    assert fitted["max_tokens"] < plan["max_tokens"]
+
+    ledger.config.budget_action = "refuse"
+    with pytest.raises(BudgetExceededError):
+        ledger.fit(plan, "claude-sonnet-4-5")
+
+
+def test_fit_keeps_a_plan_without_thinking_free_of_thinking(tmp_path):
+    ledger = make_ledger(tmp_path, session_budget_usd=0.02)
+    plan = {"thinking_budget": 0, "max_tokens": 1200, "prompt_tokens": 2000, "idea_count": 4}
+
+    fitted = ledger.fit(plan, "claude-sonnet-4-5")
+    assert fitted["degraded"] and fitted["thinking_budget"] == 0
+    assert fitted["idea_count"] == 3 and fitted["max_tokens"] == 900
@@ -0,0 +1,28 @@
+"""
+Tests for the lazy startup path: deferred imports and reading .env once
+"""
+
+import config
+import startup_benchmark
+from config import Config
+
+
+def test_importing_the_cli_leaves_deferred_modules_unloaded(workdir):
+    assert startup_benchmark.loaded_deferred_modules() == []
+
+
+def test_cli_reaches_its_first_prompt(workdir):
+    assert 0 < startup_benchmark.time_to_first_prompt(timeout=20.0) < 20.0
+
+
+def test_env_file_is_parsed_once_per_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "__file__", str(tmp_path / "config.py"))
+    monkeypatch.setattr(config, "_env_file_loaded", False)
+    for name in ("IDEATION_TARGET_IDEAS", "IDEATION_MIN_IDEA_SCORE"):
+        monkeypatch.delenv(name, raising=False)
+
+    (tmp_path / ".env").write_text("# settings\nIDEATION_TARGET_IDEAS='7'\n")
+    assert Config().target_ideas == 7
+
+    (tmp_path / ".env").write_text("IDEATION_MIN_IDEA_SCORE=5\n")
+    assert Config().min_idea_score == 0
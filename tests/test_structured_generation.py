@@ -0,0 +1,80 @@
+"""
+Tests for structured output sizing through the budget plan
+"""
+
+from types import SimpleNamespace
+
+import phase6_generation
+from config import Config
+from phase6_generation import IdeaGeneration
+
+
+OPPORTUNITY = {"description": "Users abandon onboarding"}
+CRITERIA = {"weights": {"Impact": 5, "Effort": 1}}
+
+
+def structured_ideas(count):
+    return {"ideas": [{
+        "id": i,
+        "title": f"Idea {i}",
+        "description": "A description.",
+        "addresses_opportunity": "It helps.",
+        "expected_impact": "High.",
+        "implementation_considerations": "Few.",
+        "sub_scores": {"Impact": 4, "Effort": 2},
+    } for i in range(1, count + 1)]}
+
+
+class FakeAnthropic:
+    """Returns a forced tool call and keeps the request parameters."""
+
+    def __init__(self, count):
+        self.count = count
+        self.requests = []
+        self.messages = self
+
+    def create(self, **params):
+        self.requests.append(params)
+        tool = params["tools"][0]["name"]
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="tool_use", name=tool, input=structured_ideas(self.count))],
+            usage=SimpleNamespace(input_tokens=2000, output_tokens=1500),
+            stop_reason="tool_use",
+        )
+
+
+def make_generator(monkeypatch, client, **settings):
+    config = Config()
+    config.anthropic_api_key = "test-key"
+    config.output_mode = "structured"
+    for name, value in settings.items():
+        setattr(config, name, value)
+    monkeypatch.setattr(phase6_generation, "get_client", lambda config, provider: client)
+    return IdeaGeneration(config)
+
+
+def test_structured_request_is_sized_by_the_plan(workdir, monkeypatch):
+    client = FakeAnthropic(5)
+    generator = make_generator(monkeypatch, client)
+    samples = generator.budget.stats.get("samples", 0)
+
+    ideas = generator.execute(OPPORTUNITY, {}, CRITERIA, [], [])
+
+    assert len(ideas) == 5
+    request = client.requests[0]
+    assert "thinking" not in request
+    assert request["max_tokens"] <= generator.config.max_tokens
+    # Usage feeds the budget history like any other generation call
+    assert generator.budget.stats["samples"] == samples + 1
+
+
+def test_structured_request_degrades_instead_of_refusing(workdir, monkeypatch):
+    client = FakeAnthropic(3)
+    generator = make_generator(monkeypatch, client, session_budget_usd=0.08, budget_action="degrade")
+
+    ideas = generator.execute(OPPORTUNITY, {}, CRITERIA, [], [])
+
+    assert len(ideas) == 3
+    request = client.requests[0]
+    assert request["max_tokens"] < generator.config.max_tokens
+    assert "Generate only" in request["messages"][0]["content"]
@@ -0,0 +1,87 @@
+"""
+Tests for the deterministic synthetic generation provider
+"""
+
+import pytest
+
+import synthetic_provider
+from config import Config
+from idea_stream import iter_idea_sections, is_complete
+from synthetic_provider import SyntheticProvider
+
+
+def titled_complete_ideas(text):
+    """Titles of the idea sections a parser would accept."""
+    titles = []
+    for section in iter_idea_sections(text):
+        header = section.split("\n", 1)[0]
+        if ":" in header and is_complete(section):
+            titles.append(header.split(":", 1)[1].strip())
+    return titles
+
+
+def test_clean_responses_have_the_requested_ideas_and_ranking():
+    text = SyntheticProvider(idea_count=12, mean_words=60).response()
+    titles = titled_complete_ideas(text.split("## TOP 3 FORCE RANKED IDEAS")[0])
+    assert len(titles) == 12 and len(set(titles)) == 12
+    ranking = text.split("## TOP 3 FORCE RANKED IDEAS", 1)[1]
+    assert [f"**{title}**" in ranking for title in titles[:4]] == [True, True, True, False]
+
+
+def test_output_depends_only_on_the_seed_and_call_number():
+    first, second = SyntheticProvider(idea_count=5, seed=3), SyntheticProvider(idea_count=5, seed=3)
+    responses = [first.response() for _ in range(3)]
+    assert responses == [second.response() for _ in range(3)]
+    assert len(set(responses)) == 3
+    assert SyntheticProvider(idea_count=5, seed=4).response() != responses[0]
+
+
+def test_duplicate_rate_repeats_earlier_titles():
+    text = SyntheticProvider(idea_count=10, duplicate_rate=1.0).response()
+    assert len(set(titled_complete_ideas(text))) == 1
+
+
+def test_malformed_rate_breaks_idea_blocks():
+    text = SyntheticProvider(idea_count=40, malformed_rate=1.0).response()
+    assert len(list(iter_idea_sections(text))) == 40
+    assert len(titled_complete_ideas(text)) <= 40 // 4
+
+
+def test_stream_yields_the_same_text_in_paced_chunks(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(synthetic_provider.time, "sleep", sleeps.append)
+    expected = SyntheticProvider(idea_count=8, seed=1).response()
+
+    provider = SyntheticProvider(idea_count=8, seed=1, latency_ms=200, chars_per_second=1000, chunk_chars=100)
+    chunks = list(provider.stream("prompt"))
+
+    assert "".join(chunks) == expected
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert sleeps[0] == pytest.approx(0.2)
+    assert len(sleeps) == 1 + len(chunks)
+    assert sum(sleeps) == pytest.approx(0.2 + len(expected) / 1000)
+
+
+def test_complete_waits_for_latency_and_transfer(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(synthetic_provider.time, "sleep", sleeps.append)
+    provider = SyntheticProvider(idea_count=3, latency_ms=50, chars_per_second=2000)
+    text = provider.complete("prompt")
+    assert sleeps == [pytest.approx(0.05 + len(text) / 2000)]
+
+    SyntheticProvider(idea_count=3).complete("prompt")
+    assert len(sleeps) == 1
+
+
+def test_usage_estimates_tokens_from_characters():
+    usage = SyntheticProvider().usage("p" * 400, "t" * 1000)
+    assert (usage.input_tokens, usage.output_tokens) == (100, 250)
+
+
+def test_from_config_reads_the_synthetic_settings(workdir, monkeypatch):
+    monkeypatch.setenv("IDEATION_SYNTHETIC_IDEAS", "7")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_DUPLICATE_RATE", "0.25")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_SEED", "9")
+    provider = SyntheticProvider.from_config(Config())
+    assert (provider.idea_count, provider.duplicate_rate, provider.seed) == (7, 0.25, 9)
+    assert provider.response() == SyntheticProvider(idea_count=7, duplicate_rate=0.25, seed=9).response()
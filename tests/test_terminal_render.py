@@ -0,0 +1,108 @@
+"""
+Tests for buffered terminal output, the idea table and number parsing
+"""
+
+import io
+import os
+import pydoc
+import sys
+
+import pytest
+
+import terminal_render
+from terminal_render import OutputBuffer, add_idea_details, add_idea_table, parse_numbers
+
+
+class CountingStdout(io.StringIO):
+    """A stdout that counts write calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.fixture(autouse=True)
+def small_terminal(monkeypatch):
+    monkeypatch.setattr(terminal_render, "terminal_size", lambda: os.terminal_size((60, 10)))
+
+
+def capture_stdout(monkeypatch):
+    """Swap in a counting stdout (inside the test, where pytest's own capture is active)."""
+    out = CountingStdout()
+    monkeypatch.setattr(sys, "stdout", out)
+    return out
+
+
+def ideas(count):
+    return [{"title": f"Idea {i} " + "long " * 20, "content": f"Content {i}", "score": 50.0 + i,
+             "rank": i if i <= 3 else None} for i in range(1, count + 1)]
+
+
+def test_flush_writes_everything_in_one_call(monkeypatch):
+    stdout = capture_stdout(monkeypatch)
+    out = OutputBuffer()
+    for i in range(100):
+        out.line(f"line {i}")
+    out.flush()
+    assert stdout.writes == 1
+    assert stdout.getvalue().count("\n") == 100
+    out.flush()
+    assert stdout.writes == 1
+
+
+def test_page_writes_directly_when_not_interactive(monkeypatch):
+    stdout = capture_stdout(monkeypatch)
+    monkeypatch.setattr(terminal_render, "is_interactive", lambda: False)
+    out = OutputBuffer()
+    for i in range(50):
+        out.line(f"line {i}")
+    out.page()
+    assert stdout.writes == 1 and out.lines == []
+
+
+def test_page_uses_the_pager_only_for_long_interactive_output(monkeypatch):
+    stdout = capture_stdout(monkeypatch)
+    paged = []
+    monkeypatch.setattr(terminal_render, "is_interactive", lambda: True)
+    monkeypatch.setattr(pydoc, "pager", paged.append)
+    out = OutputBuffer()
+    out.line("short")
+    out.page()
+    assert paged == [] and stdout.getvalue() == "short\n"
+
+    for i in range(20):
+        out.line(f"line {i}")
+    out.page()
+    assert len(paged) == 1 and paged[0].count("\n") == 20
+
+
+def test_table_has_one_line_per_idea_within_the_width():
+    out = OutputBuffer()
+    add_idea_table(out, ideas(12), start=5)
+    lines = out.text().splitlines()
+    assert len(lines) == 2 + 12
+    assert all(len(line) <= 60 for line in lines)
+    assert lines[2].split()[:3] == ["5", "51.0", "#1"]
+    assert lines[2].endswith("...")
+
+
+def test_details_mark_outline_only_ideas():
+    outline = dict(ideas(1)[0], expanded=False)
+    out = OutputBuffer()
+    add_idea_details(out, [outline], [7])
+    text = out.text()
+    assert "IDEA 7: Idea 1" in text and "Outline only" in text and "Rank: #1" in text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3, 7 9", [3, 7, 9]),
+    ("3-5", [3, 4, 5]),
+    ("2-4,3 x 0 99 -1", [2, 3, 4]),
+    ("", []),
+])
+def test_parse_numbers(text, expected):
+    assert parse_numbers(text, 1, 10) == expected
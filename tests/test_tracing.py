@@ -0,0 +1,122 @@
+"""
+Tests for nested spans, context propagation and the trace file formats
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tracing
+from tracing import Tracer
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Turn tracing on for one test, writing flat JSON lines."""
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(tracing, "_tracer", Tracer(str(path)))
+    return path
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_spans_are_noops_when_tracing_is_off(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    with tracing.span("phase", number=1) as span:
+        span.set_attribute("ideas", 3)
+        span.add_event("chunk")
+    assert not tracing.enabled()
+    assert tracing.current_span() is span
+    assert tracing.wrap(len) is len
+
+
+def test_child_spans_nest_and_are_written_when_the_trace_ends(trace_file):
+    with tracing.span("session") as root:
+        with tracing.span("llm_call", model="m") as child:
+            assert tracing.current_span() is child
+            child.add_attribute("output_tokens", 10)
+            child.add_attribute("output_tokens", 5)
+            child.add_event("first_token", offset=1)
+        assert not trace_file.exists()
+        assert tracing.current_span() is root
+
+    child_record, root_record = read_lines(trace_file)
+    assert child_record["trace_id"] == root_record["trace_id"]
+    assert child_record["parent_span_id"] == root_record["span_id"]
+    assert root_record["parent_span_id"] is None
+    assert child_record["attributes"] == {"model": "m", "output_tokens": 15}
+    assert child_record["events"][0]["name"] == "first_token"
+    assert child_record["events"][0]["attributes"] == {"offset": 1}
+    assert root_record["duration_ms"] >= child_record["duration_ms"]
+
+
+def test_an_escaping_exception_marks_the_span_as_an_error(trace_file):
+    with pytest.raises(RuntimeError):
+        with tracing.span("llm_call"):
+            raise RuntimeError("overloaded")
+
+    (record,) = read_lines(trace_file)
+    assert record["status"] == "error"
+    assert record["events"][0]["attributes"] == {"type": "RuntimeError", "message": "overloaded"}
+
+
+def test_events_beyond_the_cap_are_only_counted(trace_file, monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_EVENTS_PER_SPAN", 3)
+    with tracing.span("stream") as span:
+        for number in range(10):
+            span.add_event("chunk", number=number)
+
+    (record,) = read_lines(trace_file)
+    assert len(record["events"]) == 3 and record["dropped_events"] == 7
+
+
+def test_wrapped_work_on_pool_threads_nests_under_the_current_span(trace_file):
+    def judge(batch):
+        with tracing.span("judge_batch", batch=batch):
+            return batch
+
+    with tracing.span("judging") as parent:
+        work = tracing.wrap(judge)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            assert list(pool.map(work, range(3))) == [0, 1, 2]
+
+    records = read_lines(trace_file)
+    batches = [record for record in records if record["name"] == "judge_batch"]
+    assert len(batches) == 3
+    assert {record["parent_span_id"] for record in batches} == {parent.span_id}
+    assert all(record["thread"] != parent.thread for record in batches)
+
+
+def test_otlp_format_writes_one_typed_request_per_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    path = tracing.configure(str(tmp_path), "otlp")
+    try:
+        assert path.startswith(str(tmp_path / "traces")) and path.endswith(".otlp.jsonl")
+        with tracing.span("session", ideas=5, score=71.5, cached=True, model="m"):
+            with tracing.span("llm_call"):
+                pass
+    finally:
+        monkeypatch.setattr(tracing, "_tracer", None)
+
+    (request,) = read_lines(path)
+    resource_spans = request["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0] == {
+        "key": "service.name", "value": {"stringValue": tracing.SERVICE_NAME}
+    }
+    child, root = resource_spans["scopeSpans"][0]["spans"]
+    assert child["parentSpanId"] == root["spanId"] and root["parentSpanId"] == ""
+    values = {attribute["key"]: attribute["value"] for attribute in root["attributes"]}
+    assert values["ideas"] == {"intValue": "5"}
+    assert values["score"] == {"doubleValue": 71.5}
+    assert values["cached"] == {"boolValue": True}
+    assert values["model"] == {"stringValue": "m"}
+    assert root["status"] == {"code": 1}
+
+
+def test_unknown_trace_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown trace format"):
+        Tracer(str(tmp_path / "trace"), "zipkin")
@@ -0,0 +1,184 @@
+"""
+Tests for the warm daemon's request protocol and the thin client, over a real Unix socket
+"""
+
+import contextvars
+import io
+import json
+import shutil
+import sys
+import tempfile
+import threading
+
+import pytest
+
+import ideation_client
+import warm_daemon
+from config import Config
+from generation_pipeline import _RoutedStream
+from ideation_client import send_request
+from warm_daemon import WarmDaemon, _EventWriter
+
+
+PAYLOAD = {
+    "opportunity": {"description": "Users abandon onboarding"},
+    "criteria": {"weights": {"Impact": 5, "Effort": 3}},
+}
+
+
+@pytest.fixture
+def synthetic(workdir, monkeypatch):
+    monkeypatch.setenv("IDEATION_PROVIDER", "synthetic")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_IDEAS", "4")
+    monkeypatch.setenv("IDEATION_SYNTHETIC_WORDS", "40")
+    return workdir
+
+
+def route_output(monkeypatch):
+    """Install the routed stdout serve() uses (inside the test, where pytest's own capture is active)."""
+    monkeypatch.setattr(sys, "stdout", _RoutedStream(sys.stdout))
+
+
+def ask(daemon, request):
+    """Run one request through handle() in memory and return its events.
+
+    Runs in a copy of the context, as on a connection thread, so the
+    request's output capture does not outlive it.
+    """
+    wfile = io.BytesIO()
+    raw = request if isinstance(request, bytes) else json.dumps(request).encode("utf-8") + b"\n"
+    contextvars.copy_context().run(daemon.handle, io.BytesIO(raw), wfile)
+    return [json.loads(line) for line in wfile.getvalue().splitlines()]
+
+
+@pytest.fixture
+def served(synthetic, monkeypatch):
+    """A daemon answering on a Unix socket (short path: socket paths are length limited)."""
+    directory = tempfile.mkdtemp(prefix="wd", dir="/tmp")
+    socket_path = f"{directory}/d.sock"
+    monkeypatch.setenv("IDEATION_DAEMON_SOCKET", socket_path)
+    daemon = WarmDaemon(Config())
+    daemon._server = warm_daemon._Server(socket_path, daemon)
+    thread = threading.Thread(target=daemon._server.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon._server.shutdown()
+    daemon._server.server_close()
+    thread.join(timeout=5)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_run_streams_output_then_the_result(synthetic, monkeypatch):
+    route_output(monkeypatch)
+    daemon = WarmDaemon(Config(), socket_path="unused")
+    events = ask(daemon, {"command": "run", "name": "s1.json", "payload": PAYLOAD})
+
+    *output, result = events
+    assert output and all(event["event"] == "output" for event in output)
+    assert "Generating ideas using AI" in "".join(event["text"] for event in output)
+    assert result["event"] == "result"
+    assert result["session_id"] == "s1_d1" and result["ideas"] == 4
+    assert len(result["top_titles"]) == 3 and result["seconds"] > 0
+    assert (synthetic / result["filepath"]).exists()
+    assert (daemon.sessions_run, daemon.active) == (1, 0)
+
+
+def test_bad_requests_get_an_error_event(synthetic):
+    daemon = WarmDaemon(Config(), socket_path="unused")
+    assert ask(daemon, b"not json\n") == [
+        {"event": "error", "message": "requests must be one JSON object per line"}
+    ]
+    assert ask(daemon, b"[1, 2]\n")[0]["event"] == "error"
+    assert ask(daemon, {"command": "explode"}) == [{"event": "error", "message": "unknown command: explode"}]
+    (invalid,) = ask(daemon, {"command": "run", "payload": {"criteria": {}}})
+    assert invalid["message"] == (
+        "opportunity.description is required; criteria.weights must map criteria to 1-5 weights"
+    )
+    assert daemon.sessions_run == 0
+
+
+def test_a_failed_session_is_reported_and_counted(synthetic, monkeypatch):
+    monkeypatch.setattr(WarmDaemon, "_run_session", lambda self, session, session_id: 1 / 0)
+    daemon = WarmDaemon(Config(), socket_path="unused")
+    (error,) = ask(daemon, {"command": "run", "payload": PAYLOAD})
+    assert error == {"event": "error", "message": "ZeroDivisionError: division by zero"}
+    assert (daemon.sessions_run, daemon.active) == (1, 0)
+
+
+def test_event_writer_sends_whole_lines_and_flushes_before_events():
+    wfile = io.BytesIO()
+    writer = _EventWriter(wfile)
+    writer.write("partial ")
+    assert wfile.getvalue() == b""
+    writer.write("line\nnext")
+    writer.send({"event": "result"})
+    events = [json.loads(line) for line in wfile.getvalue().splitlines()]
+    assert events == [
+        {"event": "output", "text": "partial line\n"},
+        {"event": "output", "text": "next"},
+        {"event": "result"},
+    ]
+
+
+def test_event_writer_stops_when_the_client_goes_away():
+    class Gone(io.BytesIO):
+        def write(self, data):
+            raise BrokenPipeError()
+
+    writer = _EventWriter(Gone())
+    writer.write("line\n")
+    assert writer.closed
+    writer.send({"event": "result"})
+
+
+def test_client_runs_payloads_over_the_socket(served, tmp_path, capsys, monkeypatch):
+    route_output(monkeypatch)
+    paths = []
+    for number in range(2):
+        path = tmp_path / f"session{number}.json"
+        path.write_text(json.dumps(dict(PAYLOAD, opportunity={"description": f"Opportunity {number}"})))
+        paths.append(str(path))
+
+    assert ideation_client.main(["run", "--json", *paths]) == 0
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["session_id"] for result in results] == ["session0_d1", "session1_d2"]
+
+    assert ideation_client.main(["status"]) == 0
+    assert "provider synthetic, 2 session(s) run, 0 running" in capsys.readouterr().out
+
+
+def test_concurrent_sessions_each_get_their_own_output(served, monkeypatch):
+    route_output(monkeypatch)
+    results = {}
+
+    def run(number):
+        payload = dict(PAYLOAD, opportunity={"description": f"Opportunity {number}"})
+        events = list(send_request(served.socket_path, {"command": "run", "name": f"c{number}", "payload": payload}))
+        results[number] = events
+
+    threads = [threading.Thread(target=run, args=(number,)) for number in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for number, events in results.items():
+        assert events[-1]["event"] == "result"
+        assert events[-1]["session_id"].startswith(f"c{number}_d")
+        assert sum("Generating ideas using AI" in event.get("text", "") for event in events) == 1
+    # Numbered per request, so no two runs share a file
+    assert len({events[-1]["filepath"] for events in results.values()}) == 3
+    assert served.sessions_run == 3
+
+
+def test_a_second_daemon_will_not_start_and_stop_ends_serving(served, capsys):
+    assert WarmDaemon(Config()).serve() == 1
+    assert "already listening" in capsys.readouterr().out
+
+    assert ideation_client.main(["stop"]) == 0
+    assert "stopping" in capsys.readouterr().out
+
+
+def test_client_without_a_daemon_exits_with_its_own_status(workdir, capsys):
+    assert ideation_client.main(["--socket", str(workdir / "none.sock"), "status"]) == ideation_client.EXIT_NO_DAEMON
+    assert "No daemon at" in capsys.readouterr().err
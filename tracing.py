@@ -0,0 +1,259 @@
+"""
+Tracing - Nested timing spans for phases and LLM calls, exported to a local file
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+TRACE_FORMATS = ("jsonl", "otlp")
+
+# Streaming responses add an event per chunk; beyond this they are only counted
+MAX_EVENTS_PER_SPAN = 1000
+# Finished spans are written out in batches of this size (and when a trace ends)
+EXPORT_BATCH_SIZE = 256
+
+SERVICE_NAME = "ideation-agent"
+
+_current: contextvars.ContextVar = contextvars.ContextVar("ideation_span", default=None)
+
+
+class Span:
+    """One timed operation, with attributes and point-in-time events.
+
+    Used as a context manager: entering makes it the parent of spans
+    started inside the with-block, leaving ends it and hands it to the
+    exporter. An exception escaping the block marks the span as an error.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.dropped_events = 0
+        self.status = "ok"
+        self.parent: Optional[Span] = _current.get()
+        self.trace_id = self.parent.trace_id if self.parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.thread = threading.current_thread().name
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any):
+        """Set (or overwrite) an attribute."""
+        self.attributes[key] = value
+
+    def add_attribute(self, key: str, amount: float):
+        """Add to a numeric attribute, starting from zero."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def add_event(self, name: str, **attributes: Any):
+        """Record something that happened at this moment inside the span."""
+        if len(self.events) >= MAX_EVENTS_PER_SPAN:
+            self.dropped_events += 1
+            return
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.status = "error"
+            self.add_event("exception", type=exc_type.__name__, message=str(exc))
+        self.tracer.finish(self)
+        return False
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off, so call sites need no checks."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_attribute(self, key: str, amount: float):
+        pass
+
+    def add_event(self, name: str, **attributes: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects finished spans and appends them to a local trace file.
+
+    Two file formats are supported:
+      - jsonl: one flat JSON object per span, easy to grep or load into pandas
+      - otlp:  one OTLP/JSON ExportTraceServiceRequest per line, the format
+               of the OpenTelemetry Collector file exporter, which Jaeger,
+               Tempo and otel-desktop-viewer can import
+    """
+
+    def __init__(self, path: str, fmt: str = "jsonl"):
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format '{fmt}' (expected one of: {', '.join(TRACE_FORMATS)})")
+        self.path = path
+        self.format = fmt
+        self._lock = threading.Lock()
+        self._pending: List[Span] = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def finish(self, span: Span):
+        """Queue a finished span, writing the queue out when a trace completes."""
+        with self._lock:
+            self._pending.append(span)
+            if span.parent is None or len(self._pending) >= EXPORT_BATCH_SIZE:
+                self._write(self._pending)
+                self._pending = []
+
+    def flush(self):
+        """Write out every queued span."""
+        with self._lock:
+            if self._pending:
+                self._write(self._pending)
+                self._pending = []
+
+    def _write(self, spans: List[Span]):
+        """Append spans to the trace file in the configured format."""
+        if self.format == "otlp":
+            lines = [json.dumps(_otlp_request(spans))]
+        else:
+            lines = [json.dumps(_flat_record(span), default=str) for span in spans]
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _flat_record(span: Span) -> Dict[str, Any]:
+    """A span as one flat JSON object."""
+    return {
+        "trace_id": span.trace_id,
+        "span_id": span.span_id,
+        "parent_span_id": span.parent.span_id if span.parent else None,
+        "name": span.name,
+        "start": span.start_ns / 1e9,
+        "duration_ms": round((span.end_ns - span.start_ns) / 1e6, 3),
+        "status": span.status,
+        "thread": span.thread,
+        "attributes": span.attributes,
+        "events": [
+            {"name": event["name"], "offset_ms": round((event["time_ns"] - span.start_ns) / 1e6, 3),
+             **({"attributes": event["attributes"]} if event["attributes"] else {})}
+            for event in span.events
+        ],
+        "dropped_events": span.dropped_events,
+    }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """An attribute value in OTLP/JSON's typed form."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON carries 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Attributes as an OTLP/JSON key-value list."""
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_request(spans: List[Span]) -> Dict[str, Any]:
+    """Spans wrapped as an OTLP/JSON ExportTraceServiceRequest."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": [{
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent.span_id if span.parent else "",
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": _otlp_attributes({**span.attributes, "thread.name": span.thread}),
+                "events": [
+                    {"timeUnixNano": str(event["time_ns"]), "name": event["name"],
+                     "attributes": _otlp_attributes(event["attributes"])}
+                    for event in span.events
+                ],
+                "droppedEventsCount": span.dropped_events,
+                # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+                "status": {"code": 2 if span.status == "error" else 1},
+            } for span in spans],
+        }],
+    }]}
+
+
+# Process-wide tracer; None means tracing is off
+_tracer: Optional[Tracer] = None
+
+
+def configure(output_dir: str, fmt: str = "jsonl") -> str:
+    """Turn tracing on, writing to a new file under output_dir/traces/. Returns its path."""
+    global _tracer
+    extension = "otlp.jsonl" if fmt == "otlp" else "jsonl"
+    path = os.path.join(output_dir, "traces", f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}")
+    _tracer = Tracer(path, fmt)
+    atexit.register(_tracer.flush)
+    return path
+
+
+def enabled() -> bool:
+    """Whether spans are being recorded."""
+    return _tracer is not None
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Start a span as a child of the current one (a no-op when tracing is off)."""
+    if _tracer is None:
+        return _NOOP_SPAN
+    return Span(_tracer, name, attributes)
+
+
+def current_span() -> Any:
+    """The innermost active span, or a no-op span outside any."""
+    return _current.get() or _NOOP_SPAN
+
+
+def wrap(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Bind fn to the current span, so work it does on a pool thread nests under it."""
+    if _tracer is None:
+        return fn
+    context = contextvars.copy_context()
+
+    def run_in_context(*args: Any, **kwargs: Any) -> Any:
+        # Each call needs its own copy: one Context cannot be entered twice at once
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run_in_context
+
+
+def flush():
+    """Write out any spans still queued."""
+    if _tracer is not None:
+        _tracer.flush()
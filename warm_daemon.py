@@ -0,0 +1,274 @@
+"""
+Warm Daemon - Long-lived local server that keeps the agent loaded between runs
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import Config
+from budget_controller import BudgetController
+from client_pool import close_all, prewarm
+from generation_pipeline import _capture, _RoutedStream
+from ideation_client import default_socket_path
+from phase6_generation import IdeaGeneration
+from phase7_output import OutputGeneration
+from session_payload import normalize_session_payload, session_id_for, validate_session_payload
+import tracing
+
+
+# Longest request line accepted (a session payload with its context files)
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class _EventWriter:
+    """Sends a request's console output to its client, a line at a time."""
+
+    def __init__(self, wfile: Any):
+        self.wfile = wfile
+        self._buffer = ""
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._buffer += text
+            if "\n" in self._buffer:
+                lines, _, self._buffer = self._buffer.rpartition("\n")
+                self._send({"event": "output", "text": lines + "\n"})
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self._send({"event": "output", "text": self._buffer})
+                self._buffer = ""
+
+    def send(self, event: Dict[str, Any]):
+        """Send an event after any output still buffered."""
+        self.flush()
+        with self._lock:
+            self._send(event)
+
+    def _send(self, event: Dict[str, Any]):
+        if self.closed:
+            return
+        try:
+            self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError:
+            # The client went away; finish the session without an audience
+            self.closed = True
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One client connection: a single JSON request, answered with JSON events."""
+
+    def handle(self):
+        self.server.daemon.handle(self.rfile, self.wfile)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: "WarmDaemon"):
+        self.daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+class WarmDaemon:
+    """Serves session payloads from a process that stays loaded.
+
+    Each CLI run otherwise pays for interpreter start, SDK imports, .env
+    parsing and a new TLS connection. The daemon does that once: it loads
+    the configuration and phases 6-7, opens the provider connection, and
+    keeps the pooled client and the budget controller's learned statistics
+    across requests. Clients (ideation_client.py) connect to a Unix socket
+    that only the current user can use, send one payload per connection,
+    and get the session's console output streamed back before the result.
+    Sessions run concurrently, each on its own connection thread.
+
+    Settings are read when the daemon starts; restart it to pick up
+    changes to .env or the environment.
+    """
+
+    def __init__(self, config: Config, socket_path: Optional[str] = None):
+        self.config = config
+        self.socket_path = socket_path or default_socket_path()
+        self.started = time.time()
+        self.sessions_run = 0
+        self.active = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self.use_mock = False
+        # Shared, so what one session learns sizes the next one's request
+        self.budget = BudgetController(config)
+
+    def serve(self) -> int:
+        """Warm up and serve until stopped. Returns the exit status."""
+        if self._is_running():
+            print(f"A daemon is already listening on {self.socket_path}")
+            return 1
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Left behind by a daemon that died
+
+        self._warm_up()
+
+        # Only the owner may connect: payloads and results are private
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, self)
+        finally:
+            os.umask(old_umask)
+
+        streams = (sys.stdout, sys.stderr)
+        sys.stdout = _RoutedStream(sys.stdout)
+        sys.stderr = _RoutedStream(sys.stderr)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"✓ Daemon {os.getpid()} listening on {self.socket_path} (Ctrl+C to stop)")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            sys.stdout, sys.stderr = streams
+            close_all()
+        print(f"\nDaemon stopped after {self.sessions_run} session(s)")
+        return 0
+
+    def handle(self, rfile: Any, wfile: Any):
+        """Answer one request (on its connection's thread)."""
+        writer = _EventWriter(wfile)
+        try:
+            request = json.loads(rfile.readline(MAX_REQUEST_BYTES))
+            command = request.get("command")
+        except (ValueError, AttributeError):
+            writer.send({"event": "error", "message": "requests must be one JSON object per line"})
+            return
+
+        if command == "status":
+            writer.send(self.status())
+        elif command == "stop":
+            writer.send({"event": "stopping", "pid": os.getpid()})
+            # shutdown() waits for serve_forever, so it cannot run on a handler thread
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        elif command == "run":
+            self._handle_run(request, writer)
+        else:
+            writer.send({"event": "error", "message": f"unknown command: {command}"})
+
+    def status(self) -> Dict[str, Any]:
+        """The daemon's status event."""
+        return {
+            "event": "status",
+            "pid": os.getpid(),
+            "uptime_seconds": time.time() - self.started,
+            "provider": "mock" if self.use_mock else self.config.get_model_provider(),
+            "sessions_run": self.sessions_run,
+            "active": self.active,
+        }
+
+    def _handle_run(self, request: Dict[str, Any], writer: _EventWriter):
+        """Generate and save one payload's ideas, streaming its output to the client."""
+        payload = request.get("payload")
+        problems = validate_session_payload(payload)
+        if problems:
+            writer.send({"event": "error", "message": "; ".join(problems)})
+            return
+
+        _capture.set(writer)
+        with self._lock:
+            self.active += 1
+            self.requests += 1
+            # Numbered, so concurrent runs of one payload get separate files
+            session_id = f"{session_id_for(request.get('name') or 'session')}_d{self.requests}"
+        start = time.perf_counter()
+        try:
+            with tracing.span("daemon.session", session_id=session_id):
+                result = self._run_session(normalize_session_payload(payload), session_id)
+        except Exception as e:
+            writer.send({"event": "error", "message": f"{type(e).__name__}: {str(e)}"})
+            return
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.sessions_run += 1
+
+        result["seconds"] = time.perf_counter() - start
+        writer.send(result)
+
+    def _run_session(self, session: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+        """Phases 6-7 for one session. Returns the result event."""
+        generator = IdeaGeneration(self.config, use_mock=self.use_mock)
+        generator.budget = self.budget
+        try:
+            ideas = generator.execute(
+                session["opportunity"],
+                session["context"],
+                session["criteria"],
+                session["competitive_insights"],
+                session["example_ideas"]
+            )
+
+            output = OutputGeneration(
+                self.config, expander=generator.expander, usage=generator.usage, fingerprint=generator.fingerprint
+            )
+            output._expand_outlines(ideas)
+            filepath = output.save(
+                ideas,
+                session["opportunity"],
+                session["context"],
+                session["criteria"],
+                session_id=session_id,
+                source="daemon"
+            )
+        finally:
+            # The daemon outlives its sessions; their expansion threads must not
+            generator.close()
+        print(generator.ledger.summary())
+        if not filepath:
+            raise RuntimeError("ideas could not be saved")
+
+        ranked = sorted(ideas, key=lambda idea: (idea.get("rank") or len(ideas) + 1, -idea["score"]))
+        return {
+            "event": "result",
+            "session_id": session_id,
+            "filepath": os.path.abspath(filepath),
+            "ideas": len(ideas),
+            "top_titles": [idea["title"] for idea in ranked[:3]],
+        }
+
+    def _warm_up(self):
+        """Load what every session needs: provider check, SDK and connection."""
+        provider = self.config.get_model_provider()
+        if provider != "synthetic" and not self.config.has_api_key():
+            print("WARNING: No API key found for Anthropic or OpenAI; sessions will get mock ideas.")
+            self.use_mock = True
+            return
+
+        print(f"✓ Provider: {provider}")
+        thread = prewarm(self.config)
+        if thread is not None:
+            thread.join()
+            print("✓ Provider connection open")
+
+    def _is_running(self) -> bool:
+        """Whether another daemon is already answering on the socket."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()